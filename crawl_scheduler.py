@@ -0,0 +1,379 @@
+import asyncio
+import heapq
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+
+class TokenBucket:
+    """Корзина токенов: не более rate запросов в секунду с запасом capacity"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Ждет, пока в корзине появится токен, и забирает его"""
+        if self.rate <= 0:
+            return  # Без ограничений
+
+        # Лок выстраивает ожидающих в очередь, чтобы никто не обогнал
+        async with self.lock:
+            self.refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.refill()
+            self.tokens -= 1
+
+
+class HostRateLimiter:
+    """Планировщик вежливости: отдельная корзина токенов на каждый хост"""
+
+    def __init__(self, requests_per_second: float, burst: float = 1.0):
+        self.default_rate = requests_per_second
+        self.burst = burst
+        self.host_rates: Dict[str, float] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(url).netloc.lower().replace('www.', '')
+
+    def set_host_rate(self, host: str, rate: float):
+        """Задает собственную скорость для хоста (например, из robots.txt)"""
+        host = host.lower().replace('www.', '')
+        self.host_rates[host] = rate
+        if host in self.buckets:
+            self.buckets[host].rate = rate
+
+    def get_host_rate(self, host: str) -> float:
+        return self.host_rates.get(host, self.default_rate)
+
+    def configure_from_robots(self, url: str, robots_parser: RobotFileParser, user_agent: str) -> Optional[float]:
+        """Учитывает Crawl-delay и Request-rate из robots.txt для хоста url"""
+        limits = []
+
+        crawl_delay = robots_parser.crawl_delay(user_agent)
+        if crawl_delay:
+            limits.append(1.0 / float(crawl_delay))
+
+        request_rate = robots_parser.request_rate(user_agent)
+        if request_rate and request_rate.requests and request_rate.seconds:
+            limits.append(request_rate.requests / request_rate.seconds)
+
+        if not limits:
+            return None
+
+        # robots.txt может только замедлить сканирование, но не ускорить его
+        if self.default_rate > 0:
+            limits.append(self.default_rate)
+        rate = min(limits)
+        self.set_host_rate(self.get_host(url), rate)
+        return rate
+
+    async def acquire(self, url: str):
+        """Ждет своей очереди на запрос к хосту url"""
+        host = self.get_host(url)
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.get_host_rate(host), self.burst)
+            self.buckets[host] = bucket
+        await bucket.acquire()
+
+
+class AdaptiveConcurrencyController:
+    """AIMD-регулятор числа одновременных загрузок по задержкам и доле ошибок"""
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int,
+                 latency_limit: float, error_threshold: float = 0.1,
+                 window: int = 50, adaptive: bool = True):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial, self.min_limit), self.max_limit)
+        self.latency_limit = latency_limit
+        self.error_threshold = error_threshold
+        self.adaptive = adaptive
+        self.decrease_factor = 0.5
+
+        # Скользящее окно последних ответов
+        self.latencies = deque(maxlen=window)
+        self.failures = deque(maxlen=window)
+        self.samples_since_change = 0
+
+        self.active = 0
+        self.waiters: deque = deque()
+
+    async def acquire(self):
+        """Ждет свободного слота для загрузки"""
+        while self.active >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self.wake_waiters()
+
+    def wake_waiters(self):
+        free_slots = self.limit - self.active
+        while self.waiters and free_slots > 0:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        values: List[float] = sorted(self.latencies)
+        return values[int(q * (len(values) - 1))]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(0.5)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(0.95)
+
+    @property
+    def error_ratio(self) -> float:
+        if not self.failures:
+            return 0.0
+        return sum(self.failures) / len(self.failures)
+
+    def record(self, latency: float, failed: bool = False):
+        """Учитывает очередной ответ (failed - таймаут или 5xx) и при необходимости меняет лимит"""
+        self.latencies.append(latency)
+        self.failures.append(failed)
+        self.samples_since_change += 1
+
+        # Решение принимаем не чаще одного раза на "поколение" запросов
+        if not self.adaptive or self.samples_since_change < self.limit:
+            return
+        self.samples_since_change = 0
+
+        if self.error_ratio > self.error_threshold or self.p95 > self.latency_limit:
+            # Мультипликативное уменьшение: сервер не справляется
+            self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+            # Старые плохие замеры не должны вызывать повторное снижение
+            self.latencies.clear()
+            self.failures.clear()
+        elif self.limit < self.max_limit:
+            # Аддитивное увеличение
+            self.limit += 1
+            self.wake_waiters()
+
+
+class SpillSegment:
+    """Сегмент очереди на диске: строки JSON дописываются в конец и читаются по порядку"""
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        self.writer = open(path, 'a', encoding='utf-8')
+        self.reader = None
+        self.written = 0
+        self.read = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.written - self.read
+
+    @property
+    def is_full(self) -> bool:
+        return self.written >= self.capacity
+
+    def append(self, item: Tuple):
+        self.writer.write(json.dumps(item, ensure_ascii=False) + '\n')
+        self.written += 1
+
+    def pop_batch(self, count: int) -> List[Tuple]:
+        self.writer.flush()
+        if self.reader is None:
+            self.reader = open(self.path, 'r', encoding='utf-8')
+        items = []
+        while len(items) < count and self.read < self.written:
+            items.append(tuple(json.loads(self.reader.readline())))
+            self.read += 1
+        return items
+
+    def remove(self):
+        self.writer.close()
+        if self.reader:
+            self.reader.close()
+        os.remove(self.path)
+
+
+class SpillingFrontier:
+    """Очередь сканирования с ограниченным окном в памяти и сбросом излишка на диск.
+
+    Элементы (глубина, порядковый номер, URL, источник) выдаются по возрастанию
+    глубины. Если в памяти уже memory_limit элементов, новые дописываются в
+    сегменты на диске отдельно по каждой глубине и подгружаются обратно пакетами.
+    Интерфейс совпадает с asyncio.PriorityQueue: get, put_nowait, task_done, join.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None, memory_limit: int = 10000,
+                 spill_limit: int = 1_000_000, segment_size: int = 10000, producers: int = 1):
+        self.memory_limit = max(1, memory_limit)
+        self.spill_limit = spill_limit
+        self.segment_size = segment_size
+        # Сколько производителей может ждать места одновременно: последний не блокируется никогда,
+        # иначе все воркеры встали бы в ожидание и очередь перестала бы разбираться
+        self.producers = producers
+        self.spill_dir = spill_dir
+        self.own_spill_dir = False
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self.heap: List[Tuple] = []
+        self.spilled: Dict[int, deque] = {}  # глубина -> сегменты на диске
+        self.spilled_count = 0
+        self.segments_created = 0
+
+        self.getters: deque = deque()
+        self.room_waiters: deque = deque()
+        self.unfinished_tasks = 0
+        self.finished = asyncio.Event()
+        self.finished.set()
+
+    def qsize(self) -> int:
+        return len(self.heap) + self.spilled_count
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def has_room(self) -> bool:
+        return self.spill_limit <= 0 or self.spilled_count < self.spill_limit
+
+    def put_nowait(self, item: Tuple):
+        depth = item[0]
+        # В память кладем, только если на диске нет элементов той же или меньшей глубины,
+        # иначе новый URL обогнал бы сброшенные раньше
+        if len(self.heap) < self.memory_limit and not any(d <= depth for d in self.spilled):
+            heapq.heappush(self.heap, item)
+        else:
+            self.spill(item)
+
+        self.unfinished_tasks += 1
+        self.finished.clear()
+        self.wakeup_next(self.getters)
+
+    async def wait_for_room(self):
+        """Ждет, пока на диске освободится место (ограничение для производителей)"""
+        while not self.has_room() and len(self.room_waiters) < self.producers - 1:
+            waiter = asyncio.get_running_loop().create_future()
+            self.room_waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self.room_waiters:
+                    self.room_waiters.remove(waiter)
+
+    async def get(self) -> Tuple:
+        while self.empty():
+            getter = asyncio.get_running_loop().create_future()
+            self.getters.append(getter)
+            try:
+                await getter
+            finally:
+                if getter in self.getters:
+                    self.getters.remove(getter)
+
+        if len(self.heap) <= self.memory_limit // 2 and self.spilled_count:
+            self.refill()
+        if self.spilled and (not self.heap or min(self.spilled) < self.heap[0][0]):
+            # На диске лежат URL меньшей глубины, чем любой в памяти
+            item = self.pop_spilled(min(self.spilled), 1)[0]
+        else:
+            item = heapq.heappop(self.heap)
+
+        if self.has_room():
+            # Будим всех ожидающих: каждый сам перепроверит, есть ли место
+            while self.room_waiters:
+                self.wakeup_next(self.room_waiters)
+        return item
+
+    def task_done(self):
+        if self.unfinished_tasks <= 0:
+            raise ValueError('task_done() called too many times')
+        self.unfinished_tasks -= 1
+        if self.unfinished_tasks == 0:
+            self.finished.set()
+
+    async def join(self):
+        await self.finished.wait()
+
+    @staticmethod
+    def wakeup_next(waiters: deque):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def spill(self, item: Tuple):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='seo_frontier_')
+            self.own_spill_dir = True
+
+        segments = self.spilled.setdefault(item[0], deque())
+        if not segments or segments[-1].is_full:
+            self.segments_created += 1
+            path = os.path.join(self.spill_dir, f'depth{item[0]}_{self.segments_created}.jsonl')
+            segments.append(SpillSegment(path, self.segment_size))
+        segments[-1].append(item)
+        self.spilled_count += 1
+
+    def pop_spilled(self, depth: int, count: int) -> List[Tuple]:
+        """Забирает до count элементов глубины depth из самого старого сегмента"""
+        segments = self.spilled[depth]
+        segment = segments[0]
+        items = segment.pop_batch(count)
+        self.spilled_count -= len(items)
+        if segment.remaining == 0:
+            # Прочитанный сегмент больше не нужен
+            segments.popleft()
+            segment.remove()
+            if not segments:
+                del self.spilled[depth]
+        return items
+
+    def refill(self):
+        """Подгружает с диска элементы наименьшей глубины до заполнения окна в памяти"""
+        while self.spilled_count and len(self.heap) < self.memory_limit:
+            for item in self.pop_spilled(min(self.spilled), self.memory_limit - len(self.heap)):
+                heapq.heappush(self.heap, item)
+
+    def close(self):
+        """Удаляет сегменты на диске"""
+        for segments in self.spilled.values():
+            for segment in segments:
+                segment.remove()
+        self.spilled.clear()
+        self.spilled_count = 0
+        if self.own_spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            # Если очередь снова переполнится, будет создан новый временный каталог
+            self.spill_dir = None
+            self.own_spill_dir = False
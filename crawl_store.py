@@ -0,0 +1,190 @@
+import json
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class RecrawlCache:
+    """Локальное хранилище валидаторов (ETag, Last-Modified, хеш тела) и результатов анализа страниц"""
+
+    def __init__(self, path: str, commit_every: int = 100):
+        self.path = path
+        self.commit_every = commit_every
+        self.pending_writes = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                page_data TEXT NOT NULL,
+                updated_at REAL NOT NULL DEFAULT (julianday('now'))
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Возвращает сохраненные валидаторы и данные страницы или None"""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, body_hash, page_data FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body_hash, page_data = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': body_hash,
+            'page': json.loads(page_data),
+        }
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], body_hash: str, page: Dict):
+        """Сохраняет валидаторы и данные страницы (запись фиксируется пакетами)"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, body_hash, page_data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, body_hash, json.dumps(page, ensure_ascii=False))
+        )
+        self.pending_writes += 1
+        if self.pending_writes >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending_writes = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+class CrawlCheckpoint:
+    """Контрольная точка сканирования: очередь, посещенные URL, таблица URL, данные страниц и ошибки.
+
+    Все таблицы, кроме очереди, только дописываются. Граф ссылок отдельно не
+    хранится, он восстанавливается по исходящим ссылкам страниц; таблица URL
+    сохраняется, чтобы после продолжения у URL были прежние id.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY, depth INTEGER NOT NULL, seq INTEGER NOT NULL, source TEXT
+            );
+            CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, page_data TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS urls (id INTEGER PRIMARY KEY, url TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS records (
+                seq INTEGER PRIMARY KEY, type TEXT NOT NULL, url TEXT NOT NULL, data TEXT NOT NULL
+            );
+            DROP TABLE IF EXISTS links;
+        """)
+        self.conn.commit()
+
+    def reset(self):
+        """Очищает контрольную точку перед новым сканированием"""
+        with self.conn:
+            for table in ('meta', 'frontier', 'visited', 'urls', 'pages', 'records'):
+                self.conn.execute(f"DELETE FROM {table}")
+
+    def save(self, enqueued: List[Tuple[str, int, int, Optional[str]]], done: List[str],
+             pages: List[Tuple[str, Dict]], records: List[Tuple[str, str, Dict]], meta: Dict,
+             urls: Iterable[Tuple[int, str]] = ()):
+        """Дописывает изменения с прошлой контрольной точки одной транзакцией.
+
+        records - новые записи (тип, URL, данные): 404, ошибки, X-Robots-Tag и редиректы;
+        urls - новые строки таблицы URL (id, URL).
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO frontier (url, depth, seq, source) VALUES (?, ?, ?, ?)", enqueued
+            )
+            # Из очереди удаляем только полностью обработанные URL
+            self.conn.executemany("DELETE FROM frontier WHERE url = ?", [(url,) for url in done])
+            self.conn.executemany("INSERT OR IGNORE INTO visited (url) VALUES (?)", [(url,) for url in done])
+
+            self.conn.executemany("INSERT OR REPLACE INTO urls (id, url) VALUES (?, ?)", urls)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages (url, page_data) VALUES (?, ?)",
+                [(url, json.dumps(page, ensure_ascii=False)) for url, page in pages]
+            )
+            self.conn.executemany(
+                "INSERT INTO records (type, url, data) VALUES (?, ?, ?)",
+                [(record_type, url, json.dumps(data, ensure_ascii=False)) for record_type, url, data in records]
+            )
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in meta.items()]
+            )
+
+    def load_meta(self) -> Dict:
+        return {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM meta")}
+
+    def load_frontier(self) -> List[Tuple[int, int, str, Optional[str]]]:
+        """Очередь в формате элементов фронтира: (глубина, порядковый номер, URL, источник)"""
+        return list(self.conn.execute("SELECT depth, seq, url, source FROM frontier ORDER BY seq"))
+
+    def iter_visited(self) -> Iterator[str]:
+        for (url,) in self.conn.execute("SELECT url FROM visited"):
+            yield url
+
+    def iter_urls(self) -> Iterator[str]:
+        """URL в порядке id"""
+        for (url,) in self.conn.execute("SELECT url FROM urls ORDER BY id"):
+            yield url
+
+    def iter_pages(self) -> Iterator[Tuple[str, Dict]]:
+        for url, page_data in self.conn.execute("SELECT url, page_data FROM pages"):
+            yield url, json.loads(page_data)
+
+    def iter_records(self) -> Iterator[Tuple[str, str, Dict]]:
+        """Записи в порядке сохранения; для редиректа действует последняя запись URL"""
+        for record_type, url, data in self.conn.execute("SELECT type, url, data FROM records ORDER BY seq"):
+            yield record_type, url, json.loads(data)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class AutosaveLog:
+    """Журнал автосохранения в формате JSONL: каждая запись дописывается в конец файла один раз.
+
+    Записи имеют вид {"type": ..., "url": ..., "data": ...}, где type - 'page',
+    'not_found', 'error' или 'redirect'. При повторной записи страницы
+    действует последняя версия.
+    """
+
+    def __init__(self, path: str, reset: bool = False):
+        self.path = path
+        self.file = open(path, 'w' if reset else 'a', encoding='utf-8')
+
+    def append(self, records: Iterable[Tuple[str, str, Dict]]) -> int:
+        """Дописывает записи (тип, URL, данные) и сбрасывает их на диск, возвращает их число"""
+        count = 0
+        for record_type, url, data in records:
+            self.file.write(json.dumps({'type': record_type, 'url': url, 'data': data}, ensure_ascii=False))
+            self.file.write('\n')
+            count += 1
+        self.file.flush()
+        return count
+
+    @staticmethod
+    def iter_records(path: str) -> Iterator[Tuple[str, str, Dict]]:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Последняя строка могла оборваться при аварийном завершении
+                    continue
+                yield record['type'], record['url'], record['data']
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,408 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+from near_duplicates import simhash
+
+try:
+    from lxml import etree
+except ImportError:  # lxml - необязательная зависимость
+    etree = None
+
+# Теги, текст которых учитывается при подсчете слов и хеше контента
+TEXT_CONTAINER_TAGS = frozenset(['p', 'div', 'span', 'article', 'section', 'main'])
+
+# Строки внутри этих тегов BeautifulSoup не включает в get_text()
+SKIP_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+# Навигация повторяется на всех страницах и не считается контентом
+NON_CONTENT_TAGS = SKIP_TEXT_TAGS | {'nav'}
+
+WORD_RE = re.compile(r'\w+')
+
+# Ссылки, которые не ведут на страницы
+SKIP_LINK_PREFIXES = ('#', 'mailto:', 'tel:', 'javascript:', 'data:')
+
+# Теги без закрывающего тега
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+
+
+@dataclass
+class ExtractedPage:
+    """Сырые SEO-данные страницы, общие для всех бэкендов разбора HTML"""
+    title: str = ""
+    meta_description: str = ""
+    h1: List[str] = field(default_factory=list)
+    h2: List[str] = field(default_factory=list)
+    canonical: str = ""
+    robots_meta: str = ""
+    text_content: str = ""
+    images: List[Dict] = field(default_factory=list)  # src еще не приведен к абсолютному URL
+    schema_org: List[str] = field(default_factory=list)
+    open_graph: Dict[str, str] = field(default_factory=dict)
+    twitter_cards: Dict[str, str] = field(default_factory=dict)
+    hreflang: Dict[str, str] = field(default_factory=dict)
+    links: List[str] = field(default_factory=list)  # href всех <a> как есть
+    # Заполняются в analyze_html
+    word_count: int = 0
+    content_length: int = 0
+    content_hash: str = ""
+    simhash: str = ""  # 64-битный SimHash текста в hex для поиска почти дубликатов
+
+
+def extract_with_bs4(html: str) -> ExtractedPage:
+    """Извлечение через полное DOM-дерево BeautifulSoup"""
+    soup = BeautifulSoup(html, 'html.parser')
+    page = ExtractedPage()
+
+    if soup.title:
+        page.title = soup.title.string.strip() if soup.title.string else ""
+
+    meta_desc = soup.find('meta', {'name': 'description'})
+    if meta_desc and meta_desc.get('content'):
+        page.meta_description = meta_desc['content'].strip()
+
+    page.h1 = [h1.get_text(strip=True) for h1 in soup.find_all('h1')]
+    page.h2 = [h2.get_text(strip=True) for h2 in soup.find_all('h2')]
+
+    canonical = soup.find('link', {'rel': 'canonical'})
+    page.canonical = canonical.get('href', '') if canonical else ""
+
+    robots_meta = soup.find('meta', {'name': 'robots'})
+    page.robots_meta = robots_meta.get('content', '') if robots_meta else ""
+
+    page.text_content = ' '.join(iter_content_strings(soup))
+
+    for img in soup.find_all('img'):
+        img_data = {
+            'src': img.get('src', ''),
+            'alt': img.get('alt', ''),
+            'title': img.get('title', ''),
+        }
+        if img_data['src']:
+            page.images.append(img_data)
+
+    schema_tags = soup.find_all('script', {'type': 'application/ld+json'})
+    page.schema_org = [tag.string for tag in schema_tags if tag.string]
+
+    for og in soup.find_all('meta', attrs={'property': re.compile('^og:')}):
+        page.open_graph[og['property']] = og.get('content', '')
+
+    for twitter in soup.find_all('meta', attrs={'name': re.compile('^twitter:')}):
+        page.twitter_cards[twitter['name']] = twitter.get('content', '')
+
+    for hreflang in soup.find_all('link', {'rel': 'alternate', 'hreflang': True}):
+        page.hreflang[hreflang['hreflang']] = hreflang.get('href', '')
+
+    page.links = [link['href'].strip() for link in soup.find_all('a', href=True)]
+
+    return page
+
+
+def iter_content_strings(soup: BeautifulSoup):
+    """Текстовые узлы контента за один обход дерева.
+
+    Узел учитывается один раз, если он лежит внутри хотя бы одного тега из
+    TEXT_CONTAINER_TAGS и вне NON_CONTENT_TAGS, поэтому вложенные блоки
+    не копируют текст в каждого предка.
+    """
+    stack = [(soup, False)]
+    while stack:
+        node, in_container = stack.pop()
+        if isinstance(node, NavigableString):
+            text = node.strip()
+            if text:
+                yield text
+            continue
+        for child in reversed(node.contents):
+            if isinstance(child, Tag):
+                if child.name not in NON_CONTENT_TAGS:
+                    stack.append((child, in_container or child.name in TEXT_CONTAINER_TAGS))
+            elif in_container and type(child) in (NavigableString, CData):
+                stack.append((child, True))
+
+
+class _OpenElement:
+    """Открытый элемент, за которым следит потоковый извлекатель"""
+    __slots__ = ('tag', 'kind', 'index', 'parts', 'children', 'string')
+
+    def __init__(self, tag: str, kind: str = None, index: int = -1):
+        self.tag = tag
+        self.kind = kind
+        self.index = index
+        self.parts: List[str] = []
+        self.children = 0
+        self.string: Optional[str] = None  # Аналог .string BeautifulSoup (внутри <title>)
+
+
+class SEOExtractionHandler:
+    """Собирает SEO-данные из потока событий start/end/data, не строя DOM.
+
+    Вложенность элементов воспроизводит BeautifulSoup: закрывающий тег
+    закрывает ближайший открытый элемент с тем же именем и все, что открыто
+    после него. Методы совпадают с интерфейсом target-парсера lxml.
+    """
+
+    def __init__(self):
+        self.page = ExtractedPage()
+        self.stack: List[_OpenElement] = []
+        self.pending: List[str] = []
+        self.skip_depth = 0
+        self.container_depth = 0
+        self.nav_depth = 0
+        self.headings: List[_OpenElement] = []
+        self.text_parts: List[str] = []
+        self.title_element: _OpenElement = None
+        self.title_seen = False
+        self.meta_description_seen = False
+        self.robots_seen = False
+        self.canonical_seen = False
+
+    def start(self, tag: str, attrs: Dict[str, str]):
+        self.flush()
+        tag = tag.lower()
+        self.add_title_child(None)
+
+        if tag == 'meta':
+            self.handle_meta(attrs)
+        elif tag == 'link':
+            self.handle_link(attrs)
+        elif tag == 'img':
+            src = attrs.get('src') or ''
+            if src:
+                self.page.images.append({
+                    'src': src,
+                    'alt': attrs.get('alt') or '',
+                    'title': attrs.get('title') or '',
+                })
+        elif tag == 'a' and 'href' in attrs:
+            self.page.links.append((attrs['href'] or '').strip())
+
+        if tag in VOID_TAGS:
+            return
+
+        if tag in ('h1', 'h2'):
+            headings = self.page.h1 if tag == 'h1' else self.page.h2
+            element = _OpenElement(tag, 'text', len(headings))
+            headings.append('')
+            self.headings.append(element)
+            self.stack.append(element)
+        elif tag in TEXT_CONTAINER_TAGS:
+            self.stack.append(_OpenElement(tag, 'container'))
+            self.container_depth += 1
+        elif tag == 'nav':
+            self.stack.append(_OpenElement(tag, 'nav'))
+            self.nav_depth += 1
+        elif tag == 'title':
+            element = _OpenElement(tag, 'title' if not self.title_seen else None)
+            if not self.title_seen:
+                self.title_seen = True
+                self.title_element = element
+            self.stack.append(element)
+        elif tag in SKIP_TEXT_TAGS:
+            kind = 'ldjson' if tag == 'script' and attrs.get('type') == 'application/ld+json' else 'skip'
+            self.stack.append(_OpenElement(tag, kind))
+            self.skip_depth += 1
+        else:
+            # Остальные теги тоже отслеживаем: их закрытие закрывает вложенные элементы
+            self.stack.append(_OpenElement(tag))
+
+    def handle_meta(self, attrs: Dict[str, str]):
+        name = attrs.get('name')
+        prop = attrs.get('property')
+        content = attrs.get('content') or ''
+
+        if name == 'description' and not self.meta_description_seen:
+            self.meta_description_seen = True
+            self.page.meta_description = content.strip()
+        elif name == 'robots' and not self.robots_seen:
+            self.robots_seen = True
+            self.page.robots_meta = content
+
+        if prop is not None and prop.startswith('og:'):
+            self.page.open_graph[prop] = content
+        if name is not None and name.startswith('twitter:'):
+            self.page.twitter_cards[name] = content
+
+    def handle_link(self, attrs: Dict[str, str]):
+        rel = (attrs.get('rel') or '').split()
+        if 'canonical' in rel and not self.canonical_seen:
+            self.canonical_seen = True
+            self.page.canonical = attrs.get('href') or ''
+        if 'alternate' in rel and 'hreflang' in attrs:
+            self.page.hreflang[attrs['hreflang'] or ''] = attrs.get('href') or ''
+
+    def end(self, tag: str):
+        self.flush()
+        tag = tag.lower()
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag == tag:
+                while len(self.stack) > i:
+                    self.close_element(self.stack.pop())
+                return
+
+    def data(self, data: str):
+        self.pending.append(data)
+
+    def comment(self, text: str):
+        self.flush()
+        # Комментарий в BeautifulSoup - тоже строка, .string его возвращает
+        self.add_title_child(text)
+
+    def add_title_child(self, string: Optional[str]):
+        """Учитывает дочерний узел открытого элемента внутри <title> для расчета .string"""
+        if self.title_element is not None:
+            parent = self.stack[-1]
+            parent.children += 1
+            parent.string = string
+
+    def flush(self):
+        """Обрабатывает накопленный текстовый узел целиком, как это делает BeautifulSoup"""
+        if not self.pending:
+            return
+        text = ''.join(self.pending)
+        self.pending = []
+
+        self.add_title_child(text)
+
+        top = self.stack[-1] if self.stack else None
+        if top is not None and top.kind == 'ldjson':
+            top.parts.append(text)
+
+        if self.skip_depth:
+            return
+        stripped = text.strip()
+        if stripped:
+            for element in self.headings:
+                element.parts.append(stripped)
+            if self.container_depth and not self.nav_depth:
+                self.text_parts.append(stripped)
+
+    def close_element(self, element: _OpenElement):
+        if self.title_element is not None and element is not self.title_element:
+            # .string тега с единственным дочерним тегом - .string этого тега
+            self.stack[-1].string = element.string if element.children == 1 else None
+
+        if element.kind == 'text':
+            headings = self.page.h1 if element.tag == 'h1' else self.page.h2
+            headings[element.index] = ''.join(element.parts)
+            self.headings.pop()
+        elif element.kind == 'container':
+            self.container_depth -= 1
+        elif element.kind == 'nav':
+            self.nav_depth -= 1
+        elif element.kind == 'title':
+            # Аналог soup.title.string: единственная строка, в том числе через цепочку единственных тегов
+            if element.children == 1 and element.string:
+                self.page.title = element.string.strip()
+            self.title_element = None
+        elif element.kind == 'ldjson':
+            self.skip_depth -= 1
+            if element.parts:
+                self.page.schema_org.append(''.join(element.parts))
+        elif element.kind == 'skip':
+            self.skip_depth -= 1
+
+    def close(self) -> ExtractedPage:
+        self.flush()
+        while self.stack:
+            self.close_element(self.stack.pop())
+        self.page.text_content = ' '.join(self.text_parts)
+        return self.page
+
+
+class _StdlibSEOParser(HTMLParser):
+    """Передает события html.parser в SEOExtractionHandler"""
+
+    def __init__(self, handler: SEOExtractionHandler):
+        super().__init__(convert_charrefs=True)
+        self.handler = handler
+
+    @staticmethod
+    def attrs_to_dict(attrs) -> Dict[str, str]:
+        return {name: (value if value is not None else '') for name, value in attrs}
+
+    def handle_starttag(self, tag, attrs):
+        self.handler.start(tag, self.attrs_to_dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handler.start(tag, self.attrs_to_dict(attrs))
+        self.handler.end(tag)
+
+    def handle_endtag(self, tag):
+        self.handler.end(tag)
+
+    def handle_data(self, data):
+        self.handler.data(data)
+
+    def handle_comment(self, data):
+        self.handler.comment(data)
+
+
+def extract_with_stdlib(html: str) -> ExtractedPage:
+    """Потоковое извлечение на стандартном html.parser без построения DOM"""
+    handler = SEOExtractionHandler()
+    parser = _StdlibSEOParser(handler)
+    parser.feed(html)
+    parser.close()
+    return handler.close()
+
+
+def extract_with_lxml(html: str) -> ExtractedPage:
+    """Потоковое извлечение через target-интерфейс парсера lxml"""
+    handler = SEOExtractionHandler()
+    parser = etree.HTMLParser(target=handler)
+    parser.feed(html)
+    return parser.close()
+
+
+EXTRACTORS: Dict[str, Callable[[str], ExtractedPage]] = {
+    'bs4': extract_with_bs4,
+    'stdlib': extract_with_stdlib,
+    'lxml': extract_with_lxml,
+}
+
+
+def get_extractor(name: str) -> Callable[[str], ExtractedPage]:
+    """Возвращает функцию извлечения по имени бэкенда"""
+    if name not in EXTRACTORS:
+        raise ValueError(f"Неизвестный бэкенд разбора HTML: {name}")
+    # Без установленного lxml используем стандартный потоковый парсер
+    if name == 'lxml' and etree is None:
+        return extract_with_stdlib
+    return EXTRACTORS[name]
+
+
+def analyze_html(url: str, body: bytes, encoding: str, backend: str) -> ExtractedPage:
+    """Полный разбор страницы для процесса-воркера: на вход сырые байты, на выход компактный результат"""
+    try:
+        html = body.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        html = body.decode('utf-8', errors='replace')
+
+    page = get_extractor(backend)(html)
+
+    # Подсчет слов, размер и хеш контента считаем здесь, чтобы не передавать текст обратно
+    words = WORD_RE.findall(page.text_content)
+    page.word_count = len(words)
+    page.content_length = len(html)
+    page.content_hash = hashlib.md5(page.text_content.encode('utf-8')).hexdigest()
+    if words:
+        page.simhash = f"{simhash([word.lower() for word in words]):016x}"
+    page.text_content = ""
+
+    for img_data in page.images:
+        img_data['src'] = urljoin(url, img_data['src'])
+    page.links = [
+        urljoin(url, href) for href in page.links
+        if href and not href.startswith(SKIP_LINK_PREFIXES)
+    ]
+    return page
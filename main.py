@@ -23,6 +23,8 @@ import requests
 import ssl
 from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
+from crawl_scheduler import HostRateLimiter
+from pagerank import build_csr, power_iteration
 
 @dataclass
 class PageSEOData:
@@ -79,6 +81,7 @@ class SEOFrogScanner:
         self.total_scanned = 0
         self.content_hashes = defaultdict(list)
         self.robots_parser = None
+        self.rate_limiter = None  # Ограничение скорости запросов по хостам
         
         # Инициалиация анимации лягушки
         self.current_frame = 0
@@ -118,7 +121,10 @@ class SEOFrogScanner:
             'main_domain_only': True,  # Сканировать только основной домен (без поддоменов)
             'calculate_pagerank': True,  # Рассчитывать внутренний PageRank
             'pagerank_damping': 0.85,  # Коэффициент затухания для PageRank
-            'pagerank_iterations': 10,  # Количество итераций для расчета PageRank
+            'pagerank_iterations': 10,  # Максимальное количество итераций для расчета PageRank
+            'pagerank_tolerance': 1e-6,  # Порог сходимости PageRank (L1-норма изменения)
+            'host_requests_per_second': 5.0,  # Запросов в секунду на хост (0 - без ограничений)
+            'host_burst': 1,  # Сколько запросов к хосту можно отправить подряд без паузы
         }
 
         # Модифицируем структуру для хранения ошибок
@@ -162,6 +168,17 @@ class SEOFrogScanner:
             return True
         return self.robots_parser.can_fetch(self.headers['User-Agent'], url)
 
+    def init_rate_limiter(self):
+        """Создает планировщик вежливости с учетом Crawl-delay/Request-rate из robots.txt"""
+        self.rate_limiter = HostRateLimiter(
+            self.config['host_requests_per_second'],
+            self.config['host_burst']
+        )
+        if self.config['follow_robots_txt'] and self.robots_parser:
+            self.rate_limiter.configure_from_robots(
+                self.start_url, self.robots_parser, self.headers['User-Agent']
+            )
+
     def get_main_domain(self, url: str) -> str:
         """Извлекает основной домен из URL (без поддоменов)"""
         parsed = urlparse(url)
@@ -194,56 +211,30 @@ class SEOFrogScanner:
         
         self.add_log("Начинаем расчет внутреннего PageRank...", "info")
         
-        # Инициализируем PageRank для всех страниц
+        # Граф ссылок между найденными страницами в CSR-виде
         urls = list(self.pages_data.keys())
-        pagerank = {url: 1.0 / len(urls) for url in urls}
-        
-        # Создаем матрицу переходов
-        transition_matrix = {}
-        for url in urls:
-            page_data = self.pages_data[url]
-            outlinks = [link for link in page_data.outlinks if link in self.pages_data]
-            
-            if outlinks:
-                # Равномерно распределяем вес между исходящими ссылками
-                weight_per_link = 1.0 / len(outlinks)
-                transition_matrix[url] = {outlink: weight_per_link for outlink in outlinks}
-            else:
-                # Если нет исходящих ссылок, распределяем вес между всеми страницами
-                transition_matrix[url] = {other_url: 1.0 / len(urls) for other_url in urls}
+        position = {url: i for i, url in enumerate(urls)}
+        offsets, targets = build_csr(
+            ([position[link] for link in self.pages_data[url].outlinks if link in position] for url in urls),
+            len(urls)
+        )
         
         # Итеративный расчет PageRank
-        damping_factor = self.config['pagerank_damping']
+        # PR(p) = (1-d)/N + d * (sum(PR(i)/C(i)) + ранг страниц без ссылок / N)
         iterations = self.config['pagerank_iterations']
         
-        for iteration in range(iterations):
-            new_pagerank = {}
-            
-            for url in urls:
-                # Формула PageRank: PR(p) = (1-d)/N + d * sum(PR(i)/C(i))
-                # где d - коэффициент затухания, N - количество страниц, C(i) - количество исходящих ссылок
-                
-                # Базовая вероятность (случайный переход)
-                base_prob = (1 - damping_factor) / len(urls)
-                
-                # Вероятность перехода по ссылкам
-                link_prob = 0.0
-                for source_url, transitions in transition_matrix.items():
-                    if url in transitions:
-                        link_prob += pagerank[source_url] * transitions[url]
-                
-                new_pagerank[url] = base_prob + damping_factor * link_prob
-            
-            # Нормализация
-            total_rank = sum(new_pagerank.values())
-            if total_rank > 0:
-                for url in urls:
-                    new_pagerank[url] /= total_rank
-            
-            pagerank = new_pagerank
-            
-            if (iteration + 1) % 5 == 0:
-                self.add_log(f"PageRank итерация {iteration + 1}/{iterations}", "info")
+        def log_progress(iteration: int, delta: float):
+            if iteration % 5 == 0:
+                self.add_log(f"PageRank итерация {iteration}/{iterations}", "info")
+        
+        result = power_iteration(
+            offsets, targets,
+            damping=self.config['pagerank_damping'],
+            max_iterations=iterations,
+            tolerance=self.config['pagerank_tolerance'],
+            progress=log_progress
+        )
+        pagerank = dict(zip(urls, result.ranks.tolist()))
         
         # Обновляем PageRank в данных страниц
         for url, rank in pagerank.items():
@@ -541,9 +532,9 @@ class SEOFrogScanner:
     
     async def scan_site(self, session: aiohttp.ClientSession, live: Live):
         """Основной метод сканирования сайта"""
+        self.init_rate_limiter()
+
         async def process_url(url: str, depth: int = 0, source_url: str = None):
-            await asyncio.sleep(0.5)  # Задержка между запросами
-            
             if depth > self.config['max_depth'] or url in self.visited_urls:
                 return
 
@@ -573,6 +564,9 @@ class SEOFrogScanner:
 
             self.current_url = clean_url
             self.visited_urls.add(clean_url)
+
+            # Задержка только перед реальным запросом, с учетом скорости для хоста
+            await self.rate_limiter.acquire(clean_url)
             
             try:
                 async with session.get(clean_url, headers=self.headers, timeout=30, allow_redirects=True) as response:
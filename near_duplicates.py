@@ -0,0 +1,101 @@
+import hashlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Sequence
+
+import numpy as np
+
+FINGERPRINT_BITS = 64
+
+
+def simhash(words: Sequence[str], shingle_size: int = 2) -> int:
+    """64-битный SimHash текста по шинглам из shingle_size слов.
+
+    Похожие тексты дают отпечатки с малым расстоянием Хэмминга: смена цены
+    или даты меняет лишь несколько шинглов и несколько бит отпечатка.
+    """
+    if not words:
+        return 0
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    # Стабильный хеш (не hash()), чтобы отпечатки совпадали между процессами и запусками
+    hashes = np.frombuffer(
+        b''.join(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles),
+        dtype='<u8'
+    )
+    # Каждый шингл голосует +1/-1 за каждый бит, знак суммы дает бит отпечатка
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    fingerprint = 0
+    for bit in np.flatnonzero(votes > 0).tolist():
+        fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class SimHashIndex:
+    """LSH-индекс отпечатков SimHash для поиска почти дубликатов без попарного сравнения.
+
+    64 бита делятся на max_distance + 1 полос: если отпечатки отличаются не
+    больше чем в max_distance битах, хотя бы одна полоса у них совпадает
+    (принцип Дирихле). Сравниваются только отпечатки из общих корзин.
+    """
+
+    def __init__(self, max_distance: int = 4):
+        self.max_distance = max_distance
+        num_bands = max_distance + 1
+        width = FINGERPRINT_BITS // num_bands
+        self.bands = [
+            (i * width, FINGERPRINT_BITS if i == num_bands - 1 else (i + 1) * width)
+            for i in range(num_bands)
+        ]
+        self.buckets: List[Dict[int, List[int]]] = [defaultdict(list) for _ in self.bands]
+        self.members: Dict[int, List[Hashable]] = {}  # отпечаток -> страницы с ним
+        self.parent: Dict[int, int] = {}  # система непересекающихся множеств по отпечаткам
+
+    def band_keys(self, fingerprint: int) -> List[int]:
+        return [(fingerprint >> start) & ((1 << (end - start)) - 1) for start, end in self.bands]
+
+    def add(self, key: Hashable, fingerprint: int) -> List[Hashable]:
+        """Добавляет страницу и возвращает уже известные страницы, похожие на нее"""
+        matches = list(self.members.get(fingerprint, []))
+        if fingerprint in self.members:
+            self.members[fingerprint].append(key)
+            return matches
+
+        self.members[fingerprint] = [key]
+        self.parent[fingerprint] = fingerprint
+        for band, band_key in zip(self.buckets, self.band_keys(fingerprint)):
+            bucket = band[band_key]
+            for candidate in bucket:
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    matches.extend(self.members[candidate])
+                    self.union(candidate, fingerprint)
+            bucket.append(fingerprint)
+        return list(dict.fromkeys(matches))
+
+    def find(self, fingerprint: int) -> int:
+        root = fingerprint
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Сжатие путей
+        while self.parent[fingerprint] != root:
+            self.parent[fingerprint], fingerprint = root, self.parent[fingerprint]
+        return root
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+    def clusters(self) -> List[List[Hashable]]:
+        """Группы похожих страниц (из двух и более) в порядке добавления"""
+        groups: Dict[int, List[Hashable]] = defaultdict(list)
+        for fingerprint, keys in self.members.items():
+            groups[self.find(fingerprint)].extend(keys)
+        return [keys for keys in groups.values() if len(keys) > 1]
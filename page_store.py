@@ -0,0 +1,294 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from visited_store import ScalableBloomFilter
+
+# Обход базы идет пакетами по rowid, без долгоживущего курсора
+BATCH_SIZE = 1000
+
+# Номер seq (он же rowid) задается при первом добавлении URL и при обновлении не меняется
+UPSERT_PAGE = (
+    "INSERT INTO pages (seq, url, status_code, page_rank, data) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(url) DO UPDATE SET "
+    "status_code = excluded.status_code, page_rank = excluded.page_rank, data = excluded.data"
+)
+
+
+def remove_database(path: str):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+class PageStore:
+    """Данные страниц в SQLite с LRU-кэшем последних страниц в памяти.
+
+    Интерфейс как у словаря URL -> страница, порядок обхода - порядок
+    первого добавления URL (номер seq, а не порядок записи в базу).
+    Объект, полученный через store[url], можно менять на месте:
+    при вытеснении из кэша измененная страница записывается в базу (записи
+    копятся и фиксируются пакетами). Обход items()/values() читает базу
+    пакетами; страницы не из кэша отдаются копиями, поэтому их изменения
+    нужно сохранять присваиванием store[url] = page.
+    """
+
+    def __init__(self, path: str, from_record: Callable[[Dict], Any], cache_size: int = 10000,
+                 commit_every: int = 1000):
+        self.path = path
+        self.from_record = from_record
+        self.cache_size = max(1, cache_size)
+        self.commit_every = commit_every
+        self.cache: OrderedDict = OrderedDict()  # URL -> (страница, JSON при загрузке или None, seq)
+        self.pending: Dict[str, Tuple[int, int, float, str]] = {}  # Записи (seq, ...), ожидающие фиксации
+        self.count = 0
+        # Известные URL: новый URL обычно отсекается фильтром без запроса к базе
+        self.known = ScalableBloomFilter()
+        self.snapshots = 0
+
+        # Хранилище пересоздается для каждого сканирования
+        remove_database(path)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("""
+            CREATE TABLE pages (
+                seq INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                status_code INTEGER NOT NULL,
+                page_rank REAL NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def encode(page) -> Tuple[int, float, str]:
+        record = asdict(page)
+        return record.get('status_code', 0), record.get('page_rank', 0.0), json.dumps(record, ensure_ascii=False)
+
+    def check_open(self):
+        if self.conn is None:
+            raise RuntimeError(f"Хранилище страниц {self.path} закрыто")
+
+    def __getitem__(self, url: str):
+        self.check_open()
+        entry = self.cache.get(url)
+        if entry is not None:
+            self.cache.move_to_end(url)
+            return entry[0]
+
+        row = self.stored_row(url)
+        if row is None:
+            raise KeyError(url)
+        seq, text = row
+        page = self.from_record(json.loads(text))
+        self.cache_put(url, page, text, seq)
+        return page
+
+    def __setitem__(self, url: str, page):
+        self.check_open()
+        entry = self.cache.get(url)
+        if entry is not None:
+            seq = entry[2]
+        else:
+            row = self.stored_row(url) if url in self.known else None
+            if row is None:
+                self.count += 1
+                seq = self.count
+                self.known.add(url)
+            else:
+                seq = row[0]
+        # Новая или замененная страница будет записана при вытеснении или flush()
+        self.cache_put(url, page, None, seq)
+
+    def __contains__(self, url: str) -> bool:
+        self.check_open()
+        return url in self.cache or (url in self.known and self.stored_row(url) is not None)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def get(self, url: str, default=None):
+        try:
+            return self[url]
+        except KeyError:
+            return default
+
+    def stored_row(self, url: str) -> Optional[Tuple[int, str]]:
+        """(seq, JSON) записанной страницы или None"""
+        if url in self.pending:
+            seq, _, _, text = self.pending[url]
+            return seq, text
+        return self.conn.execute("SELECT seq, data FROM pages WHERE url = ?", (url,)).fetchone()
+
+    def cache_put(self, url: str, page, text: Optional[str], seq: int):
+        self.cache[url] = (page, text, seq)
+        self.cache.move_to_end(url)
+        while len(self.cache) > self.cache_size:
+            evicted_url, (evicted, saved, evicted_seq) = self.cache.popitem(last=False)
+            self.write_back(evicted_url, evicted, saved, evicted_seq)
+
+    def write_back(self, url: str, page, saved: Optional[str], seq: int) -> str:
+        """Ставит страницу в очередь записи, если она изменилась с момента загрузки"""
+        status_code, page_rank, text = self.encode(page)
+        if text != saved:
+            self.pending[url] = (seq, status_code, page_rank, text)
+            if len(self.pending) >= self.commit_every:
+                self.commit()
+        return text
+
+    def commit(self):
+        if self.pending:
+            self.conn.executemany(
+                UPSERT_PAGE,
+                [(seq, url, status_code, page_rank, text)
+                 for url, (seq, status_code, page_rank, text) in self.pending.items()]
+            )
+            self.pending = {}
+        self.conn.commit()
+
+    def flush(self):
+        """Записывает в базу все измененные страницы из кэша, не вытесняя их"""
+        self.check_open()
+        for url, (page, saved, seq) in list(self.cache.items()):
+            self.cache[url] = (page, self.write_back(url, page, saved, seq), seq)
+        self.commit()
+
+    def iter_rows(self, columns: str) -> Iterator[Tuple]:
+        self.flush()
+        last_seq = 0
+        while True:
+            rows = self.conn.execute(
+                f"SELECT seq, {columns} FROM pages WHERE seq > ? ORDER BY seq LIMIT ?",
+                (last_seq, BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                return
+            last_seq = rows[-1][0]
+            for row in rows:
+                yield row[1:]
+
+    def keys(self) -> Iterator[str]:
+        for (url,) in self.iter_rows("url"):
+            yield url
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for url, text in self.iter_rows("url, data"):
+            entry = self.cache.get(url)
+            if entry is not None:
+                yield url, entry[0]
+                continue
+            if url in self.pending:
+                text = self.pending[url][3]
+            yield url, self.from_record(json.loads(text))
+
+    def values(self) -> Iterator[Any]:
+        for _, page in self.items():
+            yield page
+
+    def snapshot(self, from_record: Callable[[Dict], Any] = None) -> 'PageStoreReader':
+        """Копия базы на текущий момент для чтения из других потоков (онлайн-бэкап SQLite)"""
+        self.flush()
+        self.snapshots += 1
+        path = f"{self.path}.snapshot-{self.snapshots}"
+        remove_database(path)
+        target = sqlite3.connect(path)
+        self.conn.backup(target)
+        target.close()
+        return PageStoreReader(path, from_record or self.from_record, self.cache_size)
+
+    def close(self):
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+        self.cache.clear()
+
+
+class PageStoreReader:
+    """Только чтение копии PageStore; у каждого потока свое соединение и свой LRU-кэш"""
+
+    def __init__(self, path: str, from_record: Callable[[Dict], Any], cache_size: int = 10000):
+        self.path = path
+        self.from_record = from_record
+        self.cache_size = max(1, cache_size)
+        self.local = threading.local()
+        self.connections: List[sqlite3.Connection] = []
+        self.lock = threading.Lock()
+        self.count = self.connection().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.local.conn = conn
+            self.local.cache = OrderedDict()
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def __getitem__(self, url: str):
+        conn = self.connection()
+        cache = self.local.cache
+        page = cache.get(url)
+        if page is not None:
+            cache.move_to_end(url)
+            return page
+        row = conn.execute("SELECT data FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            raise KeyError(url)
+        page = cache[url] = self.from_record(json.loads(row[0]))
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return page
+
+    def __contains__(self, url: str) -> bool:
+        return self.connection().execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        for url, _ in self.items():
+            yield url
+
+    def get(self, url: str, default=None):
+        try:
+            return self[url]
+        except KeyError:
+            return default
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        conn = self.connection()
+        last_rowid = 0
+        while True:
+            rows = conn.execute(
+                "SELECT rowid, url, data FROM pages WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            for _, url, text in rows:
+                yield url, self.from_record(json.loads(text))
+
+    def values(self) -> Iterator[Any]:
+        for _, page in self.items():
+            yield page
+
+    def close(self, remove: bool = True):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        if remove:
+            remove_database(self.path)
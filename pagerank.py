@@ -0,0 +1,152 @@
+import os
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class PageRankResult:
+    """Результат расчета: вектор рангов (сумма равна 1) и сведения о сходимости"""
+    ranks: np.ndarray
+    iterations: int
+    delta: float
+    converged: bool
+
+
+def build_csr(adjacency: Iterable[Iterable[int]], num_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Строит CSR-представление графа (offsets, targets) из списков исходящих ссылок.
+
+    Исходящие ссылки узла i - targets[offsets[i]:offsets[i + 1]]. Повторные
+    ссылки на одну и ту же страницу учитываются один раз.
+    """
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    chunks = []
+    for node, links in enumerate(adjacency):
+        unique_links = np.unique(np.fromiter(links, dtype=np.int64))
+        offsets[node + 1] = len(unique_links)
+        chunks.append(unique_links)
+    np.cumsum(offsets, out=offsets)
+    targets = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+    return offsets, targets
+
+
+def power_iteration(offsets: np.ndarray, targets: np.ndarray, damping: float = 0.85,
+                    max_iterations: int = 100, tolerance: float = 1e-6,
+                    initial: Optional[np.ndarray] = None,
+                    progress: Optional[Callable[[int, float], None]] = None,
+                    block_edges: int = 10_000_000) -> PageRankResult:
+    """PageRank степенным методом по CSR-графу.
+
+    Ранг страниц без исходящих ссылок (висячих узлов) равномерно распределяется
+    по всем страницам, поэтому сумма рангов остается равной 1. Расчет
+    останавливается, когда L1-норма изменения вектора меньше tolerance.
+    Ребра читаются блоками не больше block_edges, поэтому targets может быть
+    np.memmap файла на диске - в памяти держатся только векторы по узлам.
+    """
+    num_nodes = len(offsets) - 1
+    if num_nodes <= 0:
+        return PageRankResult(np.zeros(0), 0, 0.0, True)
+
+    offsets = np.asarray(offsets)
+    out_degree = np.diff(offsets)
+    dangling = out_degree == 0
+    inverse_degree = np.zeros(num_nodes)
+    inverse_degree[~dangling] = 1.0 / out_degree[~dangling]
+    blocks = edge_blocks(offsets, block_edges)
+
+    if initial is not None and len(initial) == num_nodes and initial.sum() > 0:
+        ranks = initial / initial.sum()
+    else:
+        ranks = np.full(num_nodes, 1.0 / num_nodes)
+
+    delta = 0.0
+    for iteration in range(1, max_iterations + 1):
+        shares = ranks * inverse_degree
+        new_ranks = np.zeros(num_nodes)
+        for start, end in blocks:
+            block_targets = np.asarray(targets[offsets[start]:offsets[end]])
+            # Ранг каждого источника блока, повторенный по числу его ребер
+            edge_shares = np.repeat(shares[start:end], out_degree[start:end])
+            new_ranks += np.bincount(block_targets, weights=edge_shares, minlength=num_nodes)
+        dangling_rank = ranks[dangling].sum()
+        new_ranks = damping * (new_ranks + dangling_rank / num_nodes) + (1 - damping) / num_nodes
+
+        delta = float(np.abs(new_ranks - ranks).sum())
+        ranks = new_ranks
+        if progress:
+            progress(iteration, delta)
+        if delta < tolerance:
+            return PageRankResult(ranks, iteration, delta, True)
+
+    return PageRankResult(ranks, max_iterations, delta, False)
+
+
+def edge_blocks(offsets: np.ndarray, block_edges: int) -> List[Tuple[int, int]]:
+    """Делит узлы на диапазоны [start, end), в каждом не больше block_edges ребер (или один узел)"""
+    num_nodes = len(offsets) - 1
+    blocks = []
+    start = 0
+    while start < num_nodes:
+        end = int(np.searchsorted(offsets, offsets[start] + block_edges, side='right')) - 1
+        end = min(max(end, start + 1), num_nodes)
+        blocks.append((start, end))
+        start = end
+    return blocks
+
+
+class CsrGraphWriter:
+    """Потоковая запись графа на диск: offsets.npy, targets.bin (uint32) и urls.txt.
+
+    Узлы добавляются по порядку, ребра сразу дописываются в файл, поэтому
+    граф любого размера записывается без сборки в памяти.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.targets_file = open(os.path.join(directory, 'targets.bin'), 'wb')
+        self.urls_file = open(os.path.join(directory, 'urls.txt'), 'w', encoding='utf-8')
+        self.offsets = array('q', [0])
+
+    def add_node(self, url: str, targets: np.ndarray):
+        """Добавляет узел с исходящими ссылками targets (позиции узлов в порядке добавления)"""
+        self.targets_file.write(np.asarray(targets, dtype=np.uint32).tobytes())
+        self.urls_file.write(url + '\n')
+        self.offsets.append(self.offsets[-1] + len(targets))
+
+    def close(self):
+        self.targets_file.close()
+        self.urls_file.close()
+        np.save(os.path.join(self.directory, 'offsets.npy'), np.frombuffer(self.offsets, dtype=np.int64))
+
+
+def open_csr_graph(directory: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Открывает записанный граф: offsets и targets, отображенные в память"""
+    offsets = np.load(os.path.join(directory, 'offsets.npy'), mmap_mode='r')
+    targets_path = os.path.join(directory, 'targets.bin')
+    if os.path.getsize(targets_path) == 0:
+        targets = np.zeros(0, dtype=np.uint32)
+    else:
+        targets = np.memmap(targets_path, dtype=np.uint32, mode='r')
+    return offsets, targets
+
+
+def read_graph_urls(directory: str) -> List[str]:
+    """URL узлов записанного графа (нужны только для вывода, не для расчета)"""
+    with open(os.path.join(directory, 'urls.txt'), encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+if __name__ == "__main__":
+    # Пересчет PageRank по сохраненному графу без повторного сканирования
+    import sys
+
+    graph_dir = sys.argv[1] if len(sys.argv) > 1 else 'seo_link_graph'
+    offsets, targets = open_csr_graph(graph_dir)
+    result = power_iteration(offsets, targets)
+    urls = read_graph_urls(graph_dir)
+    print(f"{len(urls)} страниц, {len(targets)} ссылок, итераций: {result.iterations}")
+    for position in np.argsort(-result.ranks)[:10]:
+        print(f"{result.ranks[position] * len(urls):.4f}  {urls[position]}")
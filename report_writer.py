@@ -0,0 +1,95 @@
+import csv
+import os
+from typing import Dict, Iterable, List, Optional
+
+from openpyxl import Workbook
+
+# Максимум строк на листе Excel (включая заголовок)
+EXCEL_MAX_ROWS = 1_048_576
+
+REPORT_FORMATS = ('xlsx', 'csv')
+
+
+class ReportWriter:
+    """Потоковая запись отчета построчно: xlsx в write-only режиме openpyxl или CSV.
+
+    Строки не накапливаются в памяти. Когда лист (или CSV-файл) доходит до
+    max_rows строк, запись продолжается на новом листе или в новом файле
+    name_2.csv, name_3.csv... с повтором заголовка.
+    """
+
+    def __init__(self, path: str, columns: List[str], report_format: str = 'xlsx',
+                 max_rows: int = EXCEL_MAX_ROWS):
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат отчета: {report_format}")
+        self.path = path
+        self.columns = list(columns)
+        self.report_format = report_format
+        self.max_rows = max_rows
+        self.rows_in_part = 0
+        self.parts = 0
+        self.files: List[str] = []
+        self.workbook: Optional[Workbook] = None
+        self.sheet = None
+        self.csv_file = None
+        self.csv_writer = None
+        self.start_part()
+
+    def start_part(self):
+        """Начинает новый лист или CSV-файл и пишет в него заголовок"""
+        self.parts += 1
+        if self.report_format == 'xlsx':
+            if self.workbook is None:
+                self.workbook = Workbook(write_only=True)
+                self.files.append(self.path)
+            title = 'Отчет' if self.parts == 1 else f'Отчет {self.parts}'
+            self.sheet = self.workbook.create_sheet(title)
+            self.sheet.append(self.columns)
+        else:
+            if self.csv_file:
+                self.csv_file.close()
+            root, ext = os.path.splitext(self.path)
+            path = self.path if self.parts == 1 else f"{root}_{self.parts}{ext}"
+            # utf-8-sig, чтобы Excel правильно открывал кириллицу
+            self.csv_file = open(path, 'w', encoding='utf-8-sig', newline='')
+            self.csv_writer = csv.writer(self.csv_file)
+            self.csv_writer.writerow(self.columns)
+            self.files.append(path)
+        self.rows_in_part = 1
+
+    def write_row(self, row: Dict):
+        if self.rows_in_part >= self.max_rows:
+            self.start_part()
+        values = [row.get(column) for column in self.columns]
+        if self.report_format == 'xlsx':
+            self.sheet.append(values)
+        else:
+            self.csv_writer.writerow(values)
+        self.rows_in_part += 1
+
+    def close(self) -> List[str]:
+        """Завершает запись и возвращает список созданных файлов"""
+        if self.workbook is not None:
+            self.workbook.save(self.path)
+            self.workbook = None
+        if self.csv_file:
+            self.csv_file.close()
+            self.csv_file = None
+        return self.files
+
+
+def write_report(path: str, rows: Iterable[Dict], report_format: str = 'xlsx',
+                 max_rows: int = EXCEL_MAX_ROWS) -> List[str]:
+    """Пишет строки-словари в отчет по мере их генерации, колонки берутся из первой строки.
+
+    Если строк нет, файл не создается. Возвращает список созданных файлов.
+    """
+    writer = None
+    try:
+        for row in rows:
+            if writer is None:
+                writer = ReportWriter(path, list(row), report_format, max_rows)
+            writer.write_row(row)
+    finally:
+        files = writer.close() if writer else []
+    return files
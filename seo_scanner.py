@@ -1,8 +1,8 @@
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
+import copy
 from urllib.parse import urljoin, urlparse, parse_qs
-import pandas as pd
+import numpy as np
 from rich.console import Console
 from rich.live import Live
 from rich.panel import Panel
@@ -11,57 +11,140 @@ from rich.table import Table
 from rich.text import Text
 from rich import box
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn, TimeRemainingColumn
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, fields
+import sys
 import time
-from typing import Set, List, Dict
-from collections import defaultdict
-import re
+from typing import Set, List, Dict, Tuple, Iterator, Callable, NamedTuple, Mapping, Sequence
+from collections import defaultdict, deque
+from itertools import islice
 from urllib.robotparser import RobotFileParser
 import hashlib
 from PIL import Image
 from io import BytesIO
 import requests
 import ssl
-from concurrent.futures import ThreadPoolExecutor
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import os
+from crawl_scheduler import HostRateLimiter, AdaptiveConcurrencyController, SpillingFrontier
+from html_extractors import analyze_html
+from crawl_store import RecrawlCache, CrawlCheckpoint, AutosaveLog
+from report_writer import write_report, EXCEL_MAX_ROWS
+from sitemap_writer import SitemapWriter, SITEMAP_MAX_URLS
+from url_graph import UrlTable, UrlIdSet, LinkGraph, InboundIndex
+from visited_store import DiskUrlStore, DiskUrlList
+from near_duplicates import SimHashIndex, hamming_distance
+from pagerank import power_iteration, CsrGraphWriter, open_csr_graph
+from page_store import PageStore, PageStoreReader
+
+class ImageData(NamedTuple):
+    """Изображение страницы"""
+    src: str
+    alt: str = ""
+    title: str = ""
+
+
+def as_pairs(value) -> Tuple[Tuple[str, str], ...]:
+    """Словарь (или пары из JSON) в кортеж пар ключ-значение"""
+    if not value:
+        return ()
+    items = value.items() if isinstance(value, dict) else value
+    return tuple((key, item) for key, item in items)
 
-@dataclass
+
+@dataclass(slots=True)
 class PageSEOData:
+    """Данные страницы. Запись без __dict__, коллекции хранятся кортежами:
+    пустые не занимают памяти (общий экземпляр ()), URL ссылок - общие строки из UrlTable."""
     url: str
     status_code: int
     content_type: str
     title: str = ""
     meta_description: str = ""
-    h1: List[str] = None
-    h2: List[str] = None
+    h1: Tuple[str, ...] = ()
+    h2: Tuple[str, ...] = ()
     canonical: str = ""
     robots_meta: str = ""
     word_count: int = 0
     content_length: int = 0
     response_time: float = 0
     redirect_url: str = ""
-    images: List[Dict] = None
-    inlinks: List[str] = None
-    outlinks: List[str] = None
-    hreflang: Dict[str, str] = None
-    schema_org: List[str] = None
-    open_graph: Dict[str, str] = None
-    twitter_cards: Dict[str, str] = None
+    images: Tuple[ImageData, ...] = ()
+    inlinks: Tuple[str, ...] = ()  # Внешние ссылки
+    outlinks: Tuple[str, ...] = ()  # Внутренние ссылки
+    hreflang: Tuple[Tuple[str, str], ...] = ()  # Пары (язык, URL)
+    schema_org: Tuple[str, ...] = ()
+    open_graph: Tuple[Tuple[str, str], ...] = ()  # Пары (свойство, значение)
+    twitter_cards: Tuple[Tuple[str, str], ...] = ()
     duplicate_content: bool = False
     content_hash: str = ""
+    simhash: str = ""  # Отпечаток SimHash текста (hex) для поиска почти дубликатов
+    near_duplicate: bool = False  # Текст почти совпадает с уже просканированной страницей
     page_rank: float = 1.0
     internal_links_count: int = 0  # Количество внутренних ссылок НА эту страницу
+    truncated: bool = False  # Тело страницы обрезано по лимиту max_page_bytes
     
     def __post_init__(self):
-        self.h1 = self.h1 or []
-        self.h2 = self.h2 or []
-        self.images = self.images or []
-        self.inlinks = self.inlinks or []
-        self.outlinks = self.outlinks or []
-        self.hreflang = self.hreflang or {}
-        self.schema_org = self.schema_org or []
-        self.open_graph = self.open_graph or {}
-        self.twitter_cards = self.twitter_cards or {}
+        # Принимаем и списки/словари (извлекатели HTML, JSON контрольных точек и кэша)
+        self.content_type = sys.intern(self.content_type)
+        self.h1 = tuple(self.h1 or ())
+        self.h2 = tuple(self.h2 or ())
+        self.images = tuple(
+            img if isinstance(img, ImageData) else ImageData(**img) if isinstance(img, dict) else ImageData(*img)
+            for img in self.images or ()
+        )
+        self.inlinks = tuple(self.inlinks or ())
+        self.outlinks = tuple(self.outlinks or ())
+        self.hreflang = as_pairs(self.hreflang)
+        self.schema_org = tuple(self.schema_org or ())
+        self.open_graph = as_pairs(self.open_graph)
+        self.twitter_cards = as_pairs(self.twitter_cards)
+
+
+PAGE_FIELDS = frozenset(f.name for f in fields(PageSEOData))
+
+
+def page_from_record(record: Dict) -> PageSEOData:
+    """Страница из сохраненного словаря полей (поля прошлых версий пропускаются)"""
+    return PageSEOData(**{k: v for k, v in record.items() if k in PAGE_FIELDS})
+
+@dataclass(frozen=True)
+class ExportSnapshot:
+    """Неизменяемый срез данных сканирования, по которому отчеты пишутся в фоновых потоках"""
+    pages: Mapping[str, PageSEOData]  # Копии страниц или копия хранилища страниц на момент среза
+    urls: Sequence[str]  # URL по id из таблицы URL (список или DiskUrlList)
+    link_sources: np.ndarray  # Граф внутренних ссылок в CSR-виде по id URL
+    link_offsets: np.ndarray
+    link_targets: np.ndarray
+    ranks_by_id: np.ndarray  # PageRank по id URL (0 для URL без данных страницы)
+    duplicates: List[Dict]  # Готовые строки отчета по дубликатам
+    redirects: List[Dict]
+    not_found_urls: List[Dict]
+    error_urls: List[Dict]
+    blocked_urls: List[Dict]
+    error_sources: Dict[str, List[str]]
+    timestamp: str  # Метка файлов автосохранения ('' - итоговые отчеты)
+
+    def links_by_target_rank(self, chunk_size: int = 65536) -> Iterator[Tuple[int, int]]:
+        """Ребра (источник, цель) по убыванию PageRank цели, ребра одной цели - подряд.
+
+        Память O(ребер): на время сортировки нужны ключи (4 байта на ребро) и
+        массив порядка (8 байт на ребро). Источник ребра ищется по offsets
+        для каждого пакета, без массива источников на все ребра.
+        """
+        # Место цели в порядке убывания PageRank (O(URL)), ключ сортировки ребра - место его цели
+        rank_order = np.argsort(-self.ranks_by_id, kind='stable')
+        rank_position = np.empty(len(rank_order), dtype=np.uint32)
+        rank_position[rank_order] = np.arange(len(rank_order), dtype=np.uint32)
+        del rank_order
+        keys = rank_position[self.link_targets]
+        del rank_position
+        order = np.argsort(keys, kind='stable')
+        del keys
+        for start in range(0, len(order), chunk_size):
+            chunk = order[start:start + chunk_size]
+            rows = np.searchsorted(self.link_offsets, chunk, side='right') - 1
+            yield from zip(self.link_sources[rows].tolist(), self.link_targets[chunk].tolist())
+
 
 class SEOFrogScanner:
     def __init__(self, start_url: str):
@@ -75,23 +158,67 @@ class SEOFrogScanner:
         self.domain = parsed.netloc.lower().replace('www.', '')
         self.main_domain = self.get_main_domain(start_url)
         
-        self.visited_urls: Set[str] = set()
-        self.pages_data: Dict[str, PageSEOData] = {}
+        self.url_table = UrlTable()  # Каждый внутренний URL хранится один раз и имеет id
+        self.visited_urls = UrlIdSet(self.url_table)
+        self.page_ids = UrlIdSet(self.url_table)  # id URL, для которых есть данные в pages_data
+        self.pages_data: Dict[str, PageSEOData] = {}  # Или PageStore при page_store = 'disk'
         self.console = Console()
         self.status_counts = defaultdict(int)
         self.current_url = ""
         self.total_scanned = 0
         self.content_hashes = defaultdict(list)
+        self.simhash_index: SimHashIndex = None  # LSH-индекс отпечатков для почти дубликатов
         self.robots_parser = None
-        self.internal_links_graph = defaultdict(set)  # Граф внутренних ссылок
+        self.internal_links_graph = LinkGraph()  # Граф внутренних ссылок по id URL
+        self.pending_inlinks = InboundIndex()  # Ссылки на еще не загруженные URL: цель -> источники
+        self.pagerank_by_id: np.ndarray = None  # Последний вектор PageRank по id URL для теплого старта
+        self.pagerank_executor: ThreadPoolExecutor = None  # Фоновый пересчет PageRank во время сканирования
+        self.live_pagerank_future = None
+        self.live_pagerank_snapshot = None  # URL и id страниц, по которым запущен фоновый расчет
+        self.live_pagerank_pages = 0  # Число страниц при последнем фоновом расчете
+
+        # Очередь сканирования
+        self.frontier: SpillingFrontier = None
+        self.frontier_seq = 0
+        self.scheduled_urls = UrlIdSet(self.url_table)  # Все URL, когда-либо поставленные в очередь
+        self.url_store: DiskUrlStore = None  # Файл множеств URL при visited_store = 'disk'
+        self.in_flight_urls: Set[str] = set()  # URL, которые загружаются прямо сейчас
+        self.rate_limiter: HostRateLimiter = None  # Ограничение скорости запросов по хостам
+        self.concurrency: AdaptiveConcurrencyController = None  # Регулятор числа одновременных загрузок
+        self.analysis_executor: ProcessPoolExecutor = None  # Пул процессов для разбора HTML
+        self.recrawl_cache: RecrawlCache = None  # Валидаторы и данные страниц прошлых сканирований
+        self.unchanged_pages = 0  # Страниц, взятых из кэша без повторного анализа
+
+        # Контрольные точки для продолжения прерванного сканирования
+        self.resume = False
+        self.checkpoint: CrawlCheckpoint = None
+        self.last_checkpoint_time = 0
+        self.checkpoint_enqueued = []  # Поставлены в очередь с прошлой контрольной точки
+        self.checkpoint_done = []  # Полностью обработаны с прошлой контрольной точки
+        self.checkpoint_pages = []  # Новые страницы с прошлой контрольной точки
+        self.checkpoint_marks = {'not_found': 0, 'error': 0, 'blocked': 0, 'redirect': 0}  # Сколько записей уже в контрольной точке
+        self.checkpoint_url_count = 0  # Сколько URL таблицы уже в контрольной точке
         
         # Настройки автосохранения и прогресса
         self.save_interval = 500  # Сохранять каждые 500 ссылок
         self.last_save_count = 0
+        self.autosave_log: AutosaveLog = None  # Журнал автосохранения, только дописывается
+        self.autosave_pages = []  # Страницы, еще не записанные в журнал
+        self.autosave_marks = {'not_found': 0, 'error': 0, 'blocked': 0, 'redirect': 0}  # Сколько записей каждого типа уже в журнале
+        self.export_task: asyncio.Task = None  # Фоновая запись xlsx-отчетов при автосохранении
+        self.export_executor: ThreadPoolExecutor = None  # Потоки записи отчетов, общие для всех экспортов
+        self.export_snapshots = 0  # Номер файла ребер среза отчетов в каталоге графа
         self.estimated_total_urls = 0  # Оценка общего количества URL
+        # Накопительные итоги по страницам, чтобы панель статистики не перебирала все страницы
+        self.page_totals = {'issues': 0, 'duplicates': 0, 'near_duplicates': 0, 'content_length': 0, 'response_time': 0.0}
+        self.recent_pages = deque(maxlen=5)  # Последние проанализированные URL
+        self.top_pagerank_pages: List[str] = []  # Топ-10 по последнему расчету PageRank
+        self.first_pages: List[str] = []  # Первые 10 страниц: топ до первого расчета PageRank
         self.scan_start_time = None
         self.progress_data = {
             'scanned': 0,
+            'queued': 0,
+            'discovered': 0,
             'found': 0,
             'errors': 0,
             'start_time': None,
@@ -127,6 +254,9 @@ class SEOFrogScanner:
             'max_depth': 10,
             'respect_canonical': True,
             'find_duplicates': True,
+            'find_near_duplicates': True,  # Искать почти дубликаты по SimHash (отличаются ценой, датой и т.п.)
+            'near_duplicate_threshold': 4,  # Максимум отличающихся бит из 64 у почти дубликатов (больше - мягче, но медленнее)
+            'duplicates_report_mode': 'exact',  # Отчет по дубликатам: 'exact' (группы по точному хешу) или 'clusters' (группы похожих по SimHash)
             'check_schema': True,
             'check_social_tags': True,
             'check_hreflang': True,
@@ -136,12 +266,53 @@ class SEOFrogScanner:
             'main_domain_only': True,
             'calculate_pagerank': True,
             'pagerank_damping': 0.85,
-            'pagerank_iterations': 20,  # Увеличено для лучшей точности
+            'pagerank_iterations': 100,  # Максимум итераций, расчет останавливается раньше при сходимости
+            'pagerank_tolerance': 1e-6,  # Порог сходимости PageRank по L1-норме изменения вектора
+            'pagerank_graph_dir': None,  # Каталог для ребер графа на диске: PageRank и отчеты читают их из файлов (None - в памяти)
+            'pagerank_block_edges': 10_000_000,  # Ребер графа в памяти за один проход блока
+            'live_pagerank_interval': 500,  # Пересчитывать PageRank во время сканирования каждые N новых страниц (0 - отключить)
+            'live_pagerank_iterations': 5,  # Итераций фонового пересчета (продолжает с прошлого вектора)
+            'html_parser': 'stdlib',  # Бэкенд разбора HTML: 'stdlib', 'lxml' или 'bs4'
+            'max_page_bytes': 5 * 1024 * 1024,  # Максимальный размер загружаемой страницы (0 - без ограничений)
+            'respect_x_robots_tag': True,  # Не загружать страницы с X-Robots-Tag: noindex, nofollow
+            'incremental_recrawl': True,  # Условные запросы (ETag/Last-Modified) и повторное использование анализа
+            'recrawl_cache_file': 'seo_crawl_cache.db',
+            'checkpoint_file': 'seo_crawl_checkpoint.db',  # Файл контрольных точек для --resume
+            'checkpoint_interval': 30,  # Секунд между контрольными точками (0 - отключить)
+            'page_store': 'memory',  # Данные страниц: 'memory' или 'disk' (SQLite с LRU-кэшем) для больших сайтов
+            'page_store_file': 'seo_pages.db',  # Его можно открыть после сканирования и делать SQL-запросы
+            'page_cache_size': 10000,  # Страниц в памяти при page_store = 'disk'
+            'autosave_file': 'seo_autosave.jsonl',  # Журнал автосохранения, отчеты из него: --export-autosave
+            'autosave_reports': False,  # При автосохранении также писать xlsx-отчеты в фоне
+            'export_workers': 4,  # Потоков для параллельной записи отчетов
+            'report_format': 'xlsx',  # Формат отчетов: 'xlsx' или 'csv'
+            'report_max_rows': EXCEL_MAX_ROWS,  # Строк на листе xlsx или в CSV-файле, дальше новый лист/файл
+            'sitemap_file': 'sitemap.xml',  # Индекс sitemap, рядом файлы sitemap-1.xml.gz, sitemap-2.xml.gz...
+            'sitemap_gzip': True,
+            'sitemap_max_urls': SITEMAP_MAX_URLS,  # URL в одном файле sitemap (лимит протокола - 50 000)
+            'frontier_memory_limit': 10000,  # URL очереди в памяти, остальные сбрасываются на диск
+            'frontier_spill_limit': 1_000_000,  # URL очереди на диске, после которых воркеры ждут (0 - без ограничений)
+            'frontier_spill_dir': None,  # Каталог сегментов очереди (None - временный каталог)
+            'visited_store': 'memory',  # Множества URL: 'memory' или 'disk' (фильтр Блума + SQLite) для очень больших сайтов
+            'visited_store_file': 'seo_crawl_urls.db',
+            'expected_urls': 100_000,  # Ожидаемое число URL: начальная емкость фильтров Блума (дальше растут)
+            'visited_cache_size': 100_000,  # URL таблицы URL -> id в памяти при visited_store = 'disk'
+            'visited_bloom_error_rate': 0.01,  # Доля ложных срабатываний фильтра (проверяются по диску)
+            'analysis_workers': os.cpu_count() or 1,  # Процессов для разбора HTML (0 - в основном процессе)
+            'concurrency': 10,  # Начальное число одновременных загрузок
+            'adaptive_concurrency': True,  # Подстраивать число загрузок под задержки и ошибки
+            'min_concurrency': 2,
+            'max_concurrency': 20,
+            'adaptive_latency_p95': 5,  # Порог p95 времени ответа (сек), выше которого снижаем нагрузку
+            'adaptive_error_threshold': 0.1,  # Допустимая доля таймаутов и 5xx ответов
+            'host_requests_per_second': 5.0,  # Запросов в секунду на хост (0 - без ограничений)
+            'host_burst': 1,  # Сколько запросов к хосту можно отправить подряд без паузы
         }
 
         # Структуры для хранения ошибок
         self.not_found_urls = []
         self.error_urls = []
+        self.blocked_urls = []  # Страницы, пропущенные из-за X-Robots-Tag
         self.error_sources = defaultdict(list)
         self.redirects = {}
 
@@ -207,106 +378,210 @@ class SEOFrogScanner:
 
     def build_internal_links_graph(self):
         """Строит граф внутренних ссылок для расчета PageRank"""
-        self.internal_links_graph = defaultdict(set)
+        self.internal_links_graph = LinkGraph()
+        self.pending_inlinks = InboundIndex()
         
-        # Сбрасываем счетчики входящих ссылок
-        for page_data in self.pages_data.values():
+        # Сбрасываем счетчики входящих ссылок (присваивание сохраняет страницу и в PageStore)
+        for url, page_data in self.pages_data.items():
             page_data.internal_links_count = 0
+            self.pages_data[url] = page_data
         
-        for url, page_data in self.pages_data.items():
-            # Добавляем все исходящие внутренние ссылки
-            for outlink in page_data.outlinks:
-                normalized_outlink = self.normalize_url(outlink)
-                if normalized_outlink in self.pages_data:
-                    self.internal_links_graph[url].add(normalized_outlink)
-                    # Увеличиваем счетчик входящих ссылок
-                    self.pages_data[normalized_outlink].internal_links_count += 1
+        for url in self.pages_data:
+            self.link_page(url, self.pages_data[url])
 
-    def update_internal_links_for_page(self, page_url: str, page_data: PageSEOData):
-        """Обновляет граф внутренних ссылок для конкретной страницы"""
+    def link_page(self, page_url: str, page_data: PageSEOData) -> Tuple[int, int]:
+        """Добавляет страницу в граф ссылок, возвращает число исходящих и входящих ссылок.
+
+        Стоимость пропорциональна числу ссылок самой страницы: ссылки на еще не
+        загруженные URL ждут в обратном индексе, пока их цель не станет страницей.
+        """
         outgoing_count = 0
-        incoming_count = 0
+        page_id = self.url_table.id_of(page_url)
         
-        # Добавляем исходящие ссылки от этой страницы
+        # Добавляем исходящие ссылки от этой страницы (outlinks уже нормализованы в analyze_page)
+        linked_ids = set()
         for outlink in page_data.outlinks:
-            normalized_outlink = self.normalize_url(outlink)
-            if normalized_outlink in self.pages_data:
-                self.internal_links_graph[page_url].add(normalized_outlink)
+            target_id = self.url_table.id_of(outlink)
+            if self.page_ids.has_id(target_id):
+                if target_id not in linked_ids:
+                    linked_ids.add(target_id)
+                    self.internal_links_graph.add_edge(page_id, target_id)
                 # Увеличиваем счетчик входящих ссылок
-                self.pages_data[normalized_outlink].internal_links_count += 1
+                target = page_data if target_id == page_id else self.pages_data[outlink]
+                target.internal_links_count += 1
                 outgoing_count += 1
+            else:
+                self.pending_inlinks.add(target_id, page_id)
         
-        # Проверяем, есть ли ссылки НА эту страницу от других уже проанализированных страниц
-        for other_url, other_data in self.pages_data.items():
-            if other_url != page_url:
-                for outlink in other_data.outlinks:
-                    normalized_outlink = self.normalize_url(outlink)
-                    if normalized_outlink == page_url:
-                        self.internal_links_graph[other_url].add(page_url)
-                        page_data.internal_links_count += 1
-                        incoming_count += 1
+        # Ссылки НА эту страницу от уже проанализированных страниц
+        sources = self.pending_inlinks.pop(page_id)
+        for source_id in set(sources):
+            self.internal_links_graph.add_edge(source_id, page_id)
+        page_data.internal_links_count += len(sources)
+        # PageStore мог вытеснить страницу из кэша, пока загружались цели ссылок
+        self.pages_data[page_url] = page_data
+        
+        return outgoing_count, len(sources)
+
+    def update_internal_links_for_page(self, page_url: str, page_data: PageSEOData):
+        """Обновляет граф внутренних ссылок для конкретной страницы"""
+        outgoing_count, incoming_count = self.link_page(page_url, page_data)
         
         # Отладочная информация (только для первых нескольких страниц)
         if len(self.pages_data) <= 10:
             short_url = self.get_short_url(page_url)
             self.add_log(f"🔗 {short_url}: {outgoing_count} исходящих, {incoming_count} входящих", "info")
 
+    def get_page_positions(self, urls: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """id URL страниц и отображение id URL -> позиция страницы в векторе PageRank"""
+        page_ids = np.fromiter((self.url_table.id_of(url) for url in urls), dtype=np.int64, count=len(urls))
+        position = np.full(len(self.url_table), -1, dtype=np.int64)
+        position[page_ids] = np.arange(len(urls))
+        return page_ids, position
+
+    def get_warm_start(self, page_ids: np.ndarray):
+        """Начальный вектор из прошлого расчета; новым страницам достается средний ранг"""
+        if self.pagerank_by_id is None:
+            return None
+        ranks = np.zeros(len(page_ids))
+        known = page_ids < len(self.pagerank_by_id)
+        ranks[known] = self.pagerank_by_id[page_ids[known]]
+        missing = ranks == 0
+        if missing.all():
+            return None
+        ranks[missing] = ranks[~missing].mean()
+        return ranks
+
+    def remember_pagerank(self, page_ids: np.ndarray, ranks: np.ndarray):
+        self.pagerank_by_id = np.zeros(len(self.url_table))
+        self.pagerank_by_id[page_ids] = ranks
+        top_count = min(10, len(ranks))
+        top_positions = np.argpartition(-ranks, top_count - 1)[:top_count]
+        top_ids = page_ids[top_positions[np.argsort(-ranks[top_positions])]]
+        self.top_pagerank_pages = [self.url_table.url_of(url_id) for url_id in top_ids.tolist()]
+
+    def schedule_live_pagerank(self):
+        """Во время сканирования пересчитывает PageRank несколькими итерациями в фоне"""
+        interval = self.config['live_pagerank_interval']
+        if not self.config['calculate_pagerank'] or interval <= 0:
+            return
+
+        if self.live_pagerank_future is not None:
+            if not self.live_pagerank_future.done():
+                return
+            self.apply_live_pagerank()
+
+        # Снимок графа стоит O(страниц + ссылок), поэтому на больших сайтах
+        # пересчитываем не чаще, чем при росте числа страниц на 10%
+        threshold = max(interval, len(self.pages_data) // 10)
+        if len(self.pages_data) - self.live_pagerank_pages < threshold:
+            return
+        self.live_pagerank_pages = len(self.pages_data)
+
+        # Снимок - копия графа по позициям страниц; с pagerank_graph_dir она пишется на диск, а не в RAM
+        urls = list(self.pages_data.keys())
+        page_ids, position = self.get_page_positions(urls)
+        graph_dir = self.config['pagerank_graph_dir']
+        if graph_dir:
+            # Прошлый фоновый расчет уже завершен, его файлы можно перезаписать
+            offsets, targets = self.save_link_graph(urls, page_ids, position, os.path.join(graph_dir, 'live'))
+        else:
+            offsets, target_ids = self.internal_links_graph.to_csr(page_ids.tolist())
+            targets = position[target_ids]
+        if self.pagerank_executor is None:
+            self.pagerank_executor = ThreadPoolExecutor(max_workers=1)
+        self.live_pagerank_snapshot = (urls, page_ids)
+        self.live_pagerank_future = self.pagerank_executor.submit(
+            power_iteration, offsets, targets,
+            damping=self.config['pagerank_damping'],
+            max_iterations=self.config['live_pagerank_iterations'],
+            tolerance=self.config['pagerank_tolerance'],
+            initial=self.get_warm_start(page_ids),
+            block_edges=self.config['pagerank_block_edges']
+        )
+
+    def apply_live_pagerank(self):
+        """Переносит результат фонового расчета в данные страниц"""
+        future = self.live_pagerank_future
+        self.live_pagerank_future = None
+        try:
+            result = future.result()
+        except Exception as e:
+            self.log_error(f"Ошибка фонового расчета PageRank: {str(e)}")
+            return
+
+        urls, page_ids = self.live_pagerank_snapshot
+        self.remember_pagerank(page_ids, result.ranks)
+        for url, rank in zip(urls, (result.ranks * len(urls)).tolist()):
+            self.pages_data[url].page_rank = rank
+
+    def finish_live_pagerank(self):
+        """Дожидается фонового расчета и останавливает его пул"""
+        if self.live_pagerank_future is not None:
+            self.apply_live_pagerank()
+        if self.pagerank_executor:
+            self.pagerank_executor.shutdown(wait=True)
+            self.pagerank_executor = None
+
+    def save_link_graph(self, urls: List[str], page_ids: np.ndarray, position: np.ndarray,
+                        graph_dir: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Записывает граф страниц на диск по одному узлу и возвращает offsets и targets, отображенные в память"""
+        writer = CsrGraphWriter(graph_dir)
+        for url, source_id in zip(urls, page_ids.tolist()):
+            target_ids = np.frombuffer(self.internal_links_graph.targets(source_id), dtype=np.uint32)
+            writer.add_node(url, position[target_ids])
+        writer.close()
+        return open_csr_graph(graph_dir)
+
     def calculate_internal_pagerank(self):
         """Улучшенный расчет внутреннего PageRank"""
         if not self.config['calculate_pagerank'] or not self.pages_data:
             return
 
-        self.add_log("Строим граф внутренних ссылок...", "info")
-        self.build_internal_links_graph()
-        
+        # Граф уже построен: во время сканирования он дополняется в link_page, а после
+        # load_checkpoint и export_autosave перестраивается целиком; вторая копия не нужна
         self.add_log("Начинаем расчет внутреннего PageRank...", "info")
         
+        # Результат фонового расчета во время сканирования - стартовая точка для итоговых итераций
+        self.finish_live_pagerank()
+        
         urls = list(self.pages_data.keys())
         n_pages = len(urls)
         
-        # Инициализируем PageRank равномерно
-        pagerank = {url: 1.0 / n_pages for url in urls}
-        damping_factor = self.config['pagerank_damping']
-        iterations = self.config['pagerank_iterations']
-        
-        # Итеративный расчет PageRank
-        for iteration in range(iterations):
-            new_pagerank = {}
-            
-            for target_url in urls:
-                # Базовая вероятность (random surfer model)
-                base_rank = (1 - damping_factor) / n_pages
-                
-                # Ранг от входящих ссылок
-                incoming_rank = 0.0
-                
-                for source_url in urls:
-                    if target_url in self.internal_links_graph[source_url]:
-                        # Количество исходящих ссылок с исходной страницы
-                        outgoing_count = len(self.internal_links_graph[source_url])
-                        if outgoing_count > 0:
-                            # Передаем часть PageRank пропорционально
-                            incoming_rank += pagerank[source_url] / outgoing_count
-                
-                new_pagerank[target_url] = base_rank + damping_factor * incoming_rank
-            
-            # Проверяем сходимость
-            max_diff = max(abs(new_pagerank[url] - pagerank[url]) for url in urls)
-            pagerank = new_pagerank
-            
-            if (iteration + 1) % 5 == 0:
-                self.add_log(f"PageRank итерация {iteration + 1}/{iterations}, сходимость: {max_diff:.6f}", "info")
-            
-            # Если достигнута сходимость, можно остановиться
-            if max_diff < 1e-6:
-                self.add_log(f"PageRank сошелся на итерации {iteration + 1}", "success")
-                break
+        # Граф в CSR-виде по позициям страниц в векторе PageRank
+        page_ids, position = self.get_page_positions(urls)
+        graph_dir = self.config['pagerank_graph_dir']
+        if graph_dir:
+            offsets, targets = self.save_link_graph(urls, page_ids, position, graph_dir)
+            self.add_log(f"💾 Граф ссылок сохранен в {graph_dir} ({len(targets)} связей)", "info")
+        else:
+            offsets, target_ids = self.internal_links_graph.to_csr(page_ids.tolist())
+            targets = position[target_ids]
+        
+        max_iterations = self.config['pagerank_iterations']
+        
+        def log_progress(iteration: int, delta: float):
+            if iteration % 5 == 0:
+                self.add_log(f"PageRank итерация {iteration}/{max_iterations}, сходимость: {delta:.6f}", "info")
+        
+        result = power_iteration(
+            offsets, targets,
+            damping=self.config['pagerank_damping'],
+            max_iterations=max_iterations,
+            tolerance=self.config['pagerank_tolerance'],
+            initial=self.get_warm_start(page_ids),
+            progress=log_progress,
+            block_edges=self.config['pagerank_block_edges']
+        )
+        self.remember_pagerank(page_ids, result.ranks)
+        if result.converged:
+            self.add_log(f"PageRank сошелся на итерации {result.iterations}", "success")
+        else:
+            self.add_log(f"PageRank не сошелся за {max_iterations} итераций (изменение {result.delta:.6f})", "warning")
         
-        # Нормализуем результаты
-        total_rank = sum(pagerank.values())
-        if total_rank > 0:
-            for url in urls:
-                pagerank[url] = (pagerank[url] / total_rank) * n_pages
+        # Нормализуем результаты: средний PageRank страницы равен 1
+        ranks = (result.ranks * n_pages).tolist()
+        pagerank = dict(zip(urls, ranks))
         
         # Обновляем данные страниц
         for url, rank in pagerank.items():
@@ -322,7 +597,7 @@ class SEOFrogScanner:
             self.add_log(f"  {i+1}. {short_url}: {rank:.4f} ({incoming_links} входящих)", "info")
         
         # Отладочная информация о графе
-        total_links = sum(len(links) for links in self.internal_links_graph.values())
+        total_links = len(self.internal_links_graph)
         self.add_log(f"📊 Граф внутренних ссылок: {len(self.pages_data)} страниц, {total_links} связей", "info")
         
         return pagerank
@@ -339,11 +614,10 @@ class SEOFrogScanner:
         else:
             return f".../{path_parts[-1]}"
 
-    async def analyze_page(self, session: aiohttp.ClientSession, url: str, html: str, response) -> PageSEOData:
-        """Анализ страницы и сбор SEO-данных"""
+    async def analyze_page(self, session: aiohttp.ClientSession, url: str, body: bytes, response) -> PageSEOData:
+        """Анализ страницы за один проход: SEO-данные и ссылки для сканирования (outlinks)"""
         start_time = time.time()
-        soup = BeautifulSoup(html, 'html.parser')
-        
+
         # Базовые данные
         page_data = PageSEOData(
             url=url,
@@ -353,86 +627,65 @@ class SEOFrogScanner:
         )
 
         try:
+            # Разбор HTML выполняется в пуле процессов, чтобы не блокировать цикл событий
+            args = (url, body, response.charset, self.config['html_parser'])
+            if self.analysis_executor:
+                loop = asyncio.get_running_loop()
+                extracted = await loop.run_in_executor(self.analysis_executor, analyze_html, *args)
+            else:
+                extracted = analyze_html(*args)
+
             # Title и Meta Description
-            if soup.title:
-                page_data.title = soup.title.string.strip() if soup.title.string else ""
-            
-            meta_desc = soup.find('meta', {'name': 'description'})
-            if meta_desc and meta_desc.get('content'):
-                page_data.meta_description = meta_desc['content'].strip()
+            page_data.title = extracted.title
+            page_data.meta_description = extracted.meta_description
 
             # Заголовки
-            page_data.h1 = [h1.get_text(strip=True) for h1 in soup.find_all('h1')]
-            page_data.h2 = [h2.get_text(strip=True) for h2 in soup.find_all('h2')]
+            page_data.h1 = tuple(extracted.h1)
+            page_data.h2 = tuple(extracted.h2)
 
             # Canonical и Robots meta
-            canonical = soup.find('link', {'rel': 'canonical'})
-            page_data.canonical = canonical['href'] if canonical else ""
-            
-            robots_meta = soup.find('meta', {'name': 'robots'})
-            page_data.robots_meta = robots_meta['content'] if robots_meta else ""
+            page_data.canonical = extracted.canonical
+            page_data.robots_meta = extracted.robots_meta
 
             # Подсчет слов и размер контента
-            text_elements = []
-            for tag in ['p', 'div', 'span', 'article', 'section', 'main']:
-                text_elements.extend([elem.get_text(strip=True) for elem in soup.find_all(tag)])
-            text_content = ' '.join(text_elements)
-            page_data.word_count = len(re.findall(r'\w+', text_content))
-            page_data.content_length = len(html)
+            page_data.word_count = extracted.word_count
+            page_data.content_length = extracted.content_length
 
             # Хеш контента для поиска дубликатов
-            content_hash = hashlib.md5(text_content.encode('utf-8')).hexdigest()
-            page_data.content_hash = content_hash
-            if content_hash in self.content_hashes and self.content_hashes[content_hash]:
-                page_data.duplicate_content = True
-            self.content_hashes[content_hash].append(url)
+            page_data.content_hash = extracted.content_hash
+            page_data.simhash = extracted.simhash
+            self.register_content_hash(url, page_data)
 
             # Анализ изображений
             if self.config['check_images']:
-                for img in soup.find_all('img'):
-                    img_data = {
-                        'src': img.get('src', ''),
-                        'alt': img.get('alt', ''),
-                        'title': img.get('title', ''),
-                    }
-                    if img_data['src']:
-                        img_data['src'] = urljoin(url, img_data['src'])
-                        page_data.images.append(img_data)
+                page_data.images = tuple(ImageData(**img) for img in extracted.images)
 
             # Schema.org
             if self.config['check_schema']:
-                schema_tags = soup.find_all('script', {'type': 'application/ld+json'})
-                page_data.schema_org = [tag.string for tag in schema_tags if tag.string]
+                page_data.schema_org = tuple(extracted.schema_org)
 
-            # Open Graph
+            # Open Graph и Twitter Cards
             if self.config['check_social_tags']:
-                for og in soup.find_all('meta', attrs={'property': re.compile('^og:')}):
-                    page_data.open_graph[og['property']] = og.get('content', '')
-
-            # Twitter Cards
-            if self.config['check_social_tags']:
-                for twitter in soup.find_all('meta', attrs={'name': re.compile('^twitter:')}):
-                    page_data.twitter_cards[twitter['name']] = twitter.get('content', '')
+                page_data.open_graph = as_pairs(extracted.open_graph)
+                page_data.twitter_cards = as_pairs(extracted.twitter_cards)
 
             # Hreflang
             if self.config['check_hreflang']:
-                for hreflang in soup.find_all('link', {'rel': 'alternate', 'hreflang': True}):
-                    page_data.hreflang[hreflang['hreflang']] = hreflang['href']
-
-            # Улучшенный сбор ссылок
-            for link in soup.find_all('a', href=True):
-                href = link['href'].strip()
-                if not href or href.startswith(('#', 'mailto:', 'tel:', 'javascript:', 'data:')):
-                    continue
-                
-                full_url = urljoin(url, href)
+                page_data.hreflang = as_pairs(extracted.hreflang)
+
+            # Ссылки уже приведены к абсолютному виду в воркере
+            outlinks = []
+            inlinks = []
+            for full_url in extracted.links:
                 normalized_url = self.normalize_url(full_url)
-                
+
                 # Проверяем, является ли ссылка внутренней
                 if self.is_main_domain_only(normalized_url):
-                    page_data.outlinks.append(normalized_url)
+                    outlinks.append(self.url_table.intern(normalized_url))
                 else:
-                    page_data.inlinks.append(normalized_url)
+                    inlinks.append(normalized_url)
+            page_data.outlinks = tuple(outlinks)
+            page_data.inlinks = tuple(inlinks)
 
         except Exception as e:
             self.log_error(f"Ошибка при анализе {url}: {str(e)}")
@@ -465,6 +718,50 @@ class SEOFrogScanner:
             return True
         return self.robots_parser.can_fetch(self.headers['User-Agent'], url)
 
+    def init_rate_limiter(self):
+        """Создает планировщик вежливости с учетом Crawl-delay/Request-rate из robots.txt"""
+        self.rate_limiter = HostRateLimiter(
+            self.config['host_requests_per_second'],
+            self.config['host_burst']
+        )
+        if self.config['follow_robots_txt'] and self.robots_parser:
+            rate = self.rate_limiter.configure_from_robots(
+                self.start_url, self.robots_parser, self.headers['User-Agent']
+            )
+            if rate is not None:
+                self.add_log(f"robots.txt: не более {rate:.2f} запросов/сек", "info")
+
+    def init_analysis_executor(self):
+        """Создает пул процессов для разбора HTML"""
+        if self.config['analysis_workers'] > 0:
+            self.analysis_executor = ProcessPoolExecutor(max_workers=self.config['analysis_workers'])
+
+    def shutdown_analysis_executor(self):
+        if self.analysis_executor:
+            self.analysis_executor.shutdown(wait=True, cancel_futures=True)
+            self.analysis_executor = None
+
+    def get_max_concurrency(self) -> int:
+        """Максимальное число одновременных загрузок (и воркеров)"""
+        if self.config['adaptive_concurrency']:
+            return max(1, self.config['max_concurrency'])
+        return max(1, self.config['concurrency'])
+
+    def init_concurrency_controller(self):
+        """Создает AIMD-регулятор одновременных загрузок"""
+        if self.config['adaptive_concurrency']:
+            min_limit = self.config['min_concurrency']
+        else:
+            min_limit = self.config['concurrency']
+        self.concurrency = AdaptiveConcurrencyController(
+            initial=self.config['concurrency'],
+            min_limit=min_limit,
+            max_limit=self.get_max_concurrency(),
+            latency_limit=self.config['adaptive_latency_p95'],
+            error_threshold=self.config['adaptive_error_threshold'],
+            adaptive=self.config['adaptive_concurrency']
+        )
+
     def generate_seo_table(self) -> Table:
         """Создание таблицы с SEO-данными"""
         table = Table(box=box.ROUNDED, title="🔍 SEO Анализ последних страниц")
@@ -476,7 +773,8 @@ class SEOFrogScanner:
         table.add_column("Проблемы", style="red")
 
         # Показываем последние 5 проанализированных страниц
-        for url, data in list(self.pages_data.items())[-5:]:
+        for url in self.recent_pages:
+            data = self.pages_data[url]
             issues = []
             
             if not data.title:
@@ -496,6 +794,8 @@ class SEOFrogScanner:
 
             if data.duplicate_content:
                 issues.append("Дубликат")
+            elif data.near_duplicate:
+                issues.append("Почти дубликат")
 
             if data.word_count < self.config['min_word_count']:
                 issues.append("Мало текста")
@@ -519,8 +819,8 @@ class SEOFrogScanner:
         table.add_column("Значение", justify="right")
 
         total_pages = len(self.pages_data)
-        issues_count = sum(1 for data in self.pages_data.values() if not data.title or not data.meta_description or not data.h1)
-        duplicate_count = sum(1 for data in self.pages_data.values() if data.duplicate_content)
+        issues_count = self.page_totals['issues']
+        duplicate_count = self.page_totals['duplicates']
         
         table.add_row("Всего страниц", str(total_pages))
         table.add_row("Основной домен", f"[blue]{self.main_domain}[/blue]")
@@ -528,14 +828,18 @@ class SEOFrogScanner:
         table.add_row("404 ошибки", f"[red]{len(self.not_found_urls)}[/red]")
         table.add_row("Редиректы", f"[yellow]{len(self.redirects)}[/yellow]")
         table.add_row("Дубликаты", f"[yellow]{duplicate_count}[/yellow]")
+        if self.config['find_near_duplicates']:
+            table.add_row("Почти дубликаты", f"[yellow]{self.page_totals['near_duplicates']}[/yellow]")
+        if self.config['incremental_recrawl']:
+            table.add_row("Без изменений", f"[green]{self.unchanged_pages}[/green]")
         
         # Статистика по кодам ответа
         for status, count in sorted(self.status_counts.items()):
             color = self.get_status_color(status)
             table.add_row(f"Статус {status}", f"[{color}]{count}[/{color}]")
         
-        table.add_row("Средний размер", f"{sum(d.content_length for d in self.pages_data.values()) // (total_pages or 1)} бай")
-        table.add_row("Среднее время ответа", f"{sum(d.response_time for d in self.pages_data.values()) / (total_pages or 1):.2f} сек")
+        table.add_row("Средний размер", f"{self.page_totals['content_length'] // (total_pages or 1)} бай")
+        table.add_row("Среднее время ответа", f"{self.page_totals['response_time'] / (total_pages or 1):.2f} сек")
         
         return table
 
@@ -548,14 +852,11 @@ class SEOFrogScanner:
         table.add_column("Входящие", justify="center")
         table.add_column("Исходящие", justify="center")
 
-        # Сортируем страницы по PageRank
-        sorted_pages = sorted(
-            self.pages_data.items(), 
-            key=lambda x: x[1].page_rank, 
-            reverse=True
-        )[:10]
+        # Топ обновляется при каждом расчете PageRank, до первого расчета - первые страницы
+        top_urls = self.top_pagerank_pages or self.first_pages
 
-        for i, (url, data) in enumerate(sorted_pages, 1):
+        for i, url in enumerate(top_urls, 1):
+            data = self.pages_data[url]
             short_url = self.get_short_url(url)
             
             table.add_row(
@@ -614,7 +915,7 @@ class SEOFrogScanner:
         )
         
         # Добавляем таблицу PageRank, если есть данные
-        if self.pages_data and any(data.page_rank > 0 for data in self.pages_data.values()):
+        if self.pages_data:
             pagerank_layout = Layout()
             pagerank_layout.split_column(
                 main_layout,
@@ -641,12 +942,21 @@ class SEOFrogScanner:
                 
                 progress_percent = min(100, (self.progress_data['scanned'] / max(1, self.estimated_total_urls)) * 100)
                 
+                concurrency_info = ""
+                if self.concurrency:
+                    concurrency_info = (
+                        f" | ⚙️ Потоков: {self.concurrency.active}/{self.concurrency.limit} "
+                        f"(p50 {self.concurrency.p50:.2f}с, p95 {self.concurrency.p95:.2f}с)"
+                    )
+
                 progress_content = Panel(
                     f"📊 Прогресс: {self.progress_data['scanned']}/{self.estimated_total_urls} ({progress_percent:.1f}%)\n"
                     f"⏱️ Прошло времени: {elapsed_time:.0f}с | "
                     f"⏳ Осталось: {estimated_remaining:.0f}с | "
                     f"📈 Найдено: {self.progress_data['found']} | "
-                    f"❌ Ошибок: {self.progress_data['errors']}",
+                    f"🗂️ В очереди: {self.progress_data['queued']} | "
+                    f"❌ Ошибок: {self.progress_data['errors']}"
+                    f"{concurrency_info}",
                     title="🔄 Статус сканирования",
                     border_style="green"
                 )
@@ -683,146 +993,687 @@ class SEOFrogScanner:
 
         return layout
     
+    def enqueue_url(self, url: str, depth: int, source_url: str = None) -> bool:
+        """Ставит URL в очередь сканирования, если он ещё не был запланирован"""
+        if depth > self.config['max_depth']:
+            return False
+
+        normalized_url = self.normalize_url(url)
+
+        # Проверяем принадлежность к основному домену
+        if not self.is_main_domain_only(normalized_url):
+            return False
+
+        # Один и тот же URL никогда не планируется дважды
+        if normalized_url in self.scheduled_urls or normalized_url in self.visited_urls:
+            return False
+
+        self.scheduled_urls.add(normalized_url)
+        self.frontier_seq += 1
+        # Приоритет по глубине дает обход в ширину (BFS)
+        self.frontier.put_nowait((depth, self.frontier_seq, normalized_url, source_url))
+        if self.checkpoint:
+            self.checkpoint_enqueued.append((normalized_url, depth, self.frontier_seq, source_url))
+        return True
+
+    async def crawl_worker(self, session: aiohttp.ClientSession, live: Live):
+        """Долгоживущий воркер: берет URL из общей очереди и обрабатывает их"""
+        while True:
+            # Очередь переполнена - не загружаем новые страницы, пока ее не разберут
+            await self.frontier.wait_for_room()
+            depth, _, url, source_url = await self.frontier.get()
+            self.in_flight_urls.add(url)
+            try:
+                links = await self.process_url(session, live, url, depth, source_url)
+                for next_url in links:
+                    self.enqueue_url(next_url, depth + 1, url)
+            except Exception as e:
+                self.log_error(f"Ошибка воркера при обработке {url}: {str(e)}")
+            finally:
+                self.in_flight_urls.discard(url)
+                self.frontier.task_done()
+
+            # Прерванная загрузка останется в очереди контрольной точки
+            if self.checkpoint:
+                self.checkpoint_done.append(url)
+
+            # Обновляем прогресс после каждой страницы
+            self.schedule_live_pagerank()
+            self.estimate_total_urls()
+            live.update(self.generate_display())
+
+            if self.checkpoint and time.time() - self.last_checkpoint_time >= self.config['checkpoint_interval']:
+                self.save_checkpoint()
+
+    async def process_url(self, session: aiohttp.ClientSession, live: Live, normalized_url: str,
+                          depth: int = 0, source_url: str = None) -> Set[str]:
+        """Загружает и анализирует одну страницу, возвращает найденные ссылки"""
+        links = set()
+        if normalized_url in self.visited_urls:
+            return links
+
+        self.current_url = normalized_url
+        self.visited_urls.add(normalized_url)
+
+        # Условный запрос, если страница уже сканировалась раньше
+        cached = self.recrawl_cache.get(normalized_url) if self.recrawl_cache else None
+        request_headers = self.get_conditional_headers(cached)
+
+        await self.concurrency.acquire()
+        fetch_start = time.time()
+        latency_recorded = False
+
+        try:
+            # Токен хоста берем уже со слотом, прямо перед запросом: иначе воркеры копят токены,
+            # пока регулятор их сдерживает, и потом идут к хосту подряд без паузы Crawl-delay
+            await self.rate_limiter.acquire(normalized_url)
+            fetch_start = time.time()
+            async with session.get(normalized_url, headers=request_headers, timeout=30, allow_redirects=True) as response:
+                self.concurrency.record(time.time() - fetch_start, response.status >= 500)
+                latency_recorded = True
+                self.status_counts[response.status] += 1
+
+                # Обработка редиректов
+                if response.history:
+                    redirect_chain = ' -> '.join([str(r.status) for r in response.history] + [str(response.status)])
+                    self.add_log(f"Редирект: {self.get_short_url(normalized_url)} ({redirect_chain})", "warning")
+                    self.redirects[normalized_url] = {
+                        'from': normalized_url,
+                        'to': str(response.url),
+                        'chain': redirect_chain
+                    }
+
+                # Страница не изменилась с прошлого сканирования
+                if response.status == 304 and cached:
+                    page_data = self.restore_cached_page(normalized_url, cached)
+                    await self.add_page(normalized_url, page_data)
+                    return self.get_crawlable_links(page_data)
+
+                # Обработка ошибок
+                if response.status == 404:
+                    error_msg = f"404: {normalized_url} (источник: {source_url or 'Начальная страница'})"
+                    self.log_error(error_msg)
+                    self.add_log(f"404: {self.get_short_url(normalized_url)}", "error")
+                    self.not_found_urls.append({'url': normalized_url, 'source': source_url or 'Начальная страница'})
+                    self.error_sources[normalized_url].append(source_url or 'Начальная страница')
+                    return links
+                elif response.status >= 400:
+                    error_msg = f"Ошибка {response.status}: {normalized_url} (источник: {source_url or 'Начальная страница'})"
+                    self.log_error(error_msg)
+                    self.add_log(f"Ошибка {response.status}: {self.get_short_url(normalized_url)}", "error")
+                    self.error_urls.append({
+                        'url': normalized_url,
+                        'status': response.status,
+                        'source': source_url or 'Начальная страница'
+                    })
+                    self.error_sources[normalized_url].append(source_url or 'Начальная страница')
+                    return links
+                else:
+                    self.add_log(f"Сканируем: {self.get_short_url(normalized_url)}", "info")
+
+                # Проверяем content-type
+                content_type = response.headers.get('content-type', '').lower()
+                if 'text/html' not in content_type:
+                    return links
+
+                # Страницы, закрытые заголовком X-Robots-Tag, не загружаем вовсе
+                if self.config['respect_x_robots_tag'] and self.is_blocked_by_x_robots_tag(response):
+                    self.log_error(f"X-Robots-Tag, страница пропущена: {normalized_url} (источник: {source_url or 'Начальная страница'})")
+                    self.add_log(f"X-Robots-Tag, пропускаем: {self.get_short_url(normalized_url)}", "warning")
+                    self.blocked_urls.append({
+                        'url': normalized_url,
+                        'x_robots_tag': ', '.join(response.headers.getall('X-Robots-Tag', [])),
+                        'source': source_url or 'Начальная страница'
+                    })
+                    return links
+
+                body, truncated = await self.read_body(response)
+                if truncated:
+                    self.log_error(f"Страница обрезана до {len(body)} байт: {normalized_url}")
+
+                # Тело не изменилось - повторный разбор не нужен
+                body_hash = hashlib.md5(body).hexdigest()
+                etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+                if cached and cached['body_hash'] == body_hash:
+                    page_data = self.restore_cached_page(normalized_url, cached)
+                    # Сервер мог сменить валидаторы при том же теле: без обновления он не ответит 304
+                    if (etag, last_modified) != (cached['etag'], cached['last_modified']):
+                        self.recrawl_cache.put(normalized_url, etag, last_modified, body_hash, cached['page'])
+                else:
+                    # Анализируем страницу
+                    page_data = await self.analyze_page(session, normalized_url, body, response)
+                    page_data.truncated = truncated
+                    if self.recrawl_cache:
+                        self.recrawl_cache.put(normalized_url, etag, last_modified, body_hash, asdict(page_data))
+
+                await self.add_page(normalized_url, page_data)
+
+                # Ссылки для дальнейшего сканирования берем из уже разобранной страницы
+                links = self.get_crawlable_links(page_data)
+
+        except asyncio.TimeoutError:
+            if not latency_recorded:
+                self.concurrency.record(time.time() - fetch_start, True)
+            error_msg = f"Таймаут: {normalized_url}"
+            self.log_error(error_msg)
+            self.add_log(f"Таймаут: {self.get_short_url(normalized_url)}", "error")
+        except Exception as e:
+            if not latency_recorded:
+                self.concurrency.record(time.time() - fetch_start, True)
+            error_msg = f"Ошибка при обработке {normalized_url}: {str(e)}"
+            self.log_error(error_msg)
+            self.add_log(f"Ошибка: {self.get_short_url(normalized_url)}", "error")
+        finally:
+            self.concurrency.release()
+
+        return links
+
+    async def add_page(self, url: str, page_data: PageSEOData):
+        """Регистрирует проанализированную страницу"""
+        self.pages_data[url] = page_data
+        self.page_ids.add(url)
+        self.count_page(url, page_data)
+        self.total_scanned += 1
+        self.autosave_pages.append(url)
+        if self.checkpoint:
+            self.checkpoint_pages.append(url)
+
+        # Обновляем граф внутренних ссылок для новой страницы
+        self.update_internal_links_for_page(url, page_data)
+
+        # Проверяем автосохранение
+        await self.auto_save_check()
+
+    def count_page(self, url: str, page_data: PageSEOData):
+        """Добавляет страницу в накопительные итоги панели статистики"""
+        if not page_data.title or not page_data.meta_description or not page_data.h1:
+            self.page_totals['issues'] += 1
+        if page_data.duplicate_content:
+            self.page_totals['duplicates'] += 1
+        if page_data.near_duplicate:
+            self.page_totals['near_duplicates'] += 1
+        self.page_totals['content_length'] += page_data.content_length
+        self.page_totals['response_time'] += page_data.response_time
+        self.recent_pages.append(url)
+        if len(self.first_pages) < 10:
+            self.first_pages.append(url)
+
+    def get_conditional_headers(self, cached: Dict) -> Dict[str, str]:
+        """Заголовки запроса с If-None-Match / If-Modified-Since из сохраненных валидаторов"""
+        if not cached:
+            return self.headers
+        headers = dict(self.headers)
+        if cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+
+    def restore_cached_page(self, url: str, cached: Dict) -> PageSEOData:
+        """Восстанавливает результат анализа неизмененной страницы из кэша"""
+        page_data = self.restore_page_data(cached['page'])
+
+        # Поля, которые зависят от текущего сканирования, считаем заново
+        page_data.page_rank = 1.0
+        page_data.internal_links_count = 0
+        page_data.duplicate_content = False
+        page_data.near_duplicate = False
+        self.register_content_hash(url, page_data)
+
+        self.unchanged_pages += 1
+        self.add_log(f"Не изменилась: {self.get_short_url(url)}", "info")
+        return page_data
+
+    def register_content_hash(self, url: str, page_data: PageSEOData):
+        """Учитывает хеш контента страницы для поиска дубликатов"""
+        content_hash = page_data.content_hash
+        if content_hash in self.content_hashes and self.content_hashes[content_hash]:
+            page_data.duplicate_content = True
+        self.content_hashes[content_hash].append(url)
+
+        # Почти дубликаты ищутся через LSH-корзины, без сравнения со всеми страницами
+        if self.config['find_near_duplicates'] and page_data.simhash:
+            if self.simhash_index is None:
+                self.simhash_index = SimHashIndex(self.config['near_duplicate_threshold'])
+            similar_urls = self.simhash_index.add(url, int(page_data.simhash, 16))
+            page_data.near_duplicate = bool(similar_urls) and not page_data.duplicate_content
+
+    async def read_body(self, response) -> Tuple[bytes, bool]:
+        """Потоковое чтение тела ответа с ограничением размера; возвращает (тело, обрезано ли)"""
+        max_bytes = self.config['max_page_bytes']
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                # Прерываем загрузку, остаток страницы не скачиваем
+                return b''.join(chunks)[:max_bytes], True
+        return b''.join(chunks), False
+
+    def is_blocked_by_x_robots_tag(self, response) -> bool:
+        """Проверяет, запрещает ли X-Robots-Tag и индексацию, и переход по ссылкам"""
+        # Директивы, которые содержат двоеточие, но не являются именем робота
+        value_directives = ('unavailable_after', 'max-snippet', 'max-image-preview', 'max-video-preview')
+
+        for value in response.headers.getall('X-Robots-Tag', []):
+            value = value.strip().lower()
+            prefix, _, rest = value.partition(':')
+            if rest and prefix.strip() not in value_directives:
+                # Правило для конкретного робота, например "googlebot: noindex"
+                continue
+            directives = {d.strip() for d in value.split(',')}
+            if 'none' in directives or {'noindex', 'nofollow'} <= directives:
+                return True
+        return False
+
+    def save_checkpoint(self):
+        """Сохраняет изменения очереди, посещенных URL и страниц с прошлой контрольной точки"""
+        first_id = self.checkpoint_url_count
+        new_urls = list(enumerate(self.url_table.iter_from(first_id), first_id))
+        self.checkpoint_url_count += len(new_urls)
+        self.checkpoint.save(
+            self.checkpoint_enqueued,
+            self.checkpoint_done,
+            [(url, asdict(self.pages_data[url])) for url in self.checkpoint_pages],
+            self.collect_new_records(self.checkpoint_marks),
+            {
+                'start_url': self.start_url,
+                'frontier_seq': self.frontier_seq,
+                'total_scanned': self.total_scanned,
+                'unchanged_pages': self.unchanged_pages,
+                'status_counts': self.status_counts,
+            },
+            new_urls
+        )
+        self.checkpoint_enqueued = []
+        self.checkpoint_done = []
+        self.checkpoint_pages = []
+        self.last_checkpoint_time = time.time()
+
+    def load_checkpoint(self) -> List[Tuple[int, int, str, str]]:
+        """Восстанавливает состояние прерванного сканирования, возвращает оставшуюся очередь"""
+        meta = self.checkpoint.load_meta()
+        if meta.get('start_url') != self.start_url:
+            self.add_log("Контрольная точка не найдена, начинаем сканирование заново", "warning")
+            self.checkpoint.reset()
+            return []
+
+        self.frontier_seq = meta['frontier_seq']
+        self.total_scanned = meta['total_scanned']
+        self.unchanged_pages = meta['unchanged_pages']
+        self.status_counts = defaultdict(int, {int(k): v for k, v in meta['status_counts'].items()})
+        for record_type, url, data in self.checkpoint.iter_records():
+            if record_type == 'not_found':
+                self.not_found_urls.append(data)
+            elif record_type == 'error':
+                self.error_urls.append(data)
+            elif record_type == 'blocked':
+                self.blocked_urls.append(data)
+            else:
+                self.redirects[url] = data
+        for error in self.not_found_urls + self.error_urls:
+            self.error_sources[error['url']].append(error['source'])
+        self.checkpoint_marks = {
+            'not_found': len(self.not_found_urls),
+            'error': len(self.error_urls),
+            'blocked': len(self.blocked_urls),
+            'redirect': len(self.redirects),
+        }
+
+        # Таблица URL восстанавливается первой, чтобы id совпали с прерванным сканированием
+        for url in self.checkpoint.iter_urls():
+            self.url_table.id_of(url)
+        self.checkpoint_url_count = len(self.url_table)
+        self.visited_urls.update(self.checkpoint.iter_visited())
+        for url, page in self.checkpoint.iter_pages():
+            self.restore_page(url, page)
+
+        # Граф внутренних ссылок восстанавливаем по сохраненным исходящим ссылкам
+        self.build_internal_links_graph()
+        self.last_save_count = len(self.pages_data)
+
+        frontier_rows = self.checkpoint.load_frontier()
+        self.add_log(
+            f"Продолжаем сканирование: {len(self.pages_data)} страниц, {len(frontier_rows)} URL в очереди",
+            "success"
+        )
+        return frontier_rows
+
+    def restore_page(self, url: str, page: Dict):
+        """Добавляет страницу из сохраненного словаря полей (контрольная точка или журнал автосохранения)"""
+        page_data = self.restore_page_data(page)
+        page_data.duplicate_content = False
+        page_data.near_duplicate = False
+        self.register_content_hash(url, page_data)
+        self.pages_data[url] = page_data
+        self.page_ids.add(url)
+        self.count_page(url, page_data)
+
+    def restore_page_data(self, record: Dict) -> PageSEOData:
+        """Страница из сохраненного словаря полей; ссылки берутся из общей таблицы URL"""
+        page_data = page_from_record(record)
+        page_data.outlinks = tuple(self.url_table.intern(link) for link in page_data.outlinks)
+        return page_data
+
+    def init_page_store(self):
+        """Переносит данные страниц в SQLite при page_store = 'disk'"""
+        if self.config['page_store'] != 'disk' or isinstance(self.pages_data, PageStore):
+            return
+        store = PageStore(
+            self.config['page_store_file'],
+            self.restore_page_data,
+            cache_size=self.config['page_cache_size']
+        )
+        for url, page_data in self.pages_data.items():
+            store[url] = page_data
+        self.pages_data = store
+
+    def close_page_store(self):
+        if isinstance(self.pages_data, PageStore):
+            self.pages_data.close()
+
+    def close(self):
+        """Закрывает файлы хранилищ на диске; после этого данные страниц недоступны"""
+        self.close_page_store()
+        self.close_url_sets()
+
+    def init_url_sets(self):
+        """Создает множества посещенных и запланированных URL в памяти или на диске"""
+        if self.config['visited_store'] != 'disk':
+            self.visited_urls = UrlIdSet(self.url_table)
+            self.scheduled_urls = UrlIdSet(self.url_table)
+            return
+
+        self.close_url_sets()
+        self.url_store = DiskUrlStore(self.config['visited_store_file'])
+        # Таблица URL -> id тоже на диске, в памяти только последние URL
+        self.url_table = self.url_store.url_table(self.config['visited_cache_size'])
+        self.page_ids = UrlIdSet(self.url_table)
+        capacity = self.config['expected_urls']
+        error_rate = self.config['visited_bloom_error_rate']
+        self.visited_urls = self.url_store.url_set('visited', capacity, error_rate)
+        self.scheduled_urls = self.url_store.url_set('scheduled', capacity, error_rate)
+
+    def close_url_sets(self):
+        if self.url_store:
+            self.url_store.close()
+            self.url_store = None
+
+    def get_crawlable_links(self, page_data: PageSEOData) -> Set[str]:
+        """Ссылки страницы, которые можно поставить в очередь сканирования"""
+        # outlinks уже нормализованы и отфильтрованы по основному домену в analyze_page
+        return {
+            link for link in set(page_data.outlinks)
+            if link not in self.visited_urls and self.can_fetch(link)
+        }
+
     async def scan_site(self, session: aiohttp.ClientSession, live: Live):
         """Основной метод сканирования сайта"""
         # Инициализация прогресса
         self.progress_data['start_time'] = time.time()
         self.estimate_total_urls()
+        self.init_rate_limiter()
+        self.init_concurrency_controller()
+        self.init_analysis_executor()
+        self.init_url_sets()
+        self.init_page_store()
+        if self.config['incremental_recrawl']:
+            self.recrawl_cache = RecrawlCache(self.config['recrawl_cache_file'])
+
+        # Контрольные точки для продолжения после сбоя или Ctrl-C
+        frontier_rows = []
+        if self.config['checkpoint_interval'] > 0:
+            self.checkpoint = CrawlCheckpoint(self.config['checkpoint_file'])
+            if self.resume:
+                frontier_rows = self.load_checkpoint()
+            else:
+                self.checkpoint.reset()
+            self.last_checkpoint_time = time.time()
+
+        # Журнал автосохранения пишется заново, восстановленные страницы попадают в него сразу
+        self.autosave_log = AutosaveLog(self.config['autosave_file'], reset=True)
+        self.autosave_pages = list(self.pages_data)
+        self.write_autosave()
+
+        # Общая очередь сканирования (фронтир) с упорядочиванием по глубине
+        self.frontier = SpillingFrontier(
+            spill_dir=self.config['frontier_spill_dir'],
+            memory_limit=self.config['frontier_memory_limit'],
+            spill_limit=self.config['frontier_spill_limit'],
+            producers=self.get_max_concurrency()
+        )
+        if self.visited_urls:
+            for depth, seq, url, source_url in frontier_rows:
+                self.scheduled_urls.add(url)
+                self.frontier.put_nowait((depth, seq, url, source_url))
+        else:
+            self.enqueue_url(self.start_url, 0)
+
+        # Пул долгоживущих воркеров вместо рекурсии
+        workers = [
+            asyncio.create_task(self.crawl_worker(session, live))
+            for _ in range(self.get_max_concurrency())
+        ]
+
+        try:
+            await self.frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.shutdown_analysis_executor()
+            self.frontier.close()
+            if self.checkpoint:
+                self.save_checkpoint()
+                self.checkpoint.close()
+                self.checkpoint = None
+            if self.recrawl_cache:
+                self.recrawl_cache.close()
+                self.recrawl_cache = None
+            if self.autosave_log:
+                self.write_autosave()
+                self.autosave_log.close()
+                self.autosave_log = None
+            if self.url_store:
+                # Таблица URL на диске еще нужна для PageRank и отчетов
+                self.url_store.commit()
+
+    def get_exact_duplicates(self) -> List[Dict]:
+        """Строки отчета по страницам с одинаковым хешем контента"""
+        duplicates_data = []
+        group_id = 1
         
-        async def process_url(url: str, depth: int = 0, source_url: str = None):
-            await asyncio.sleep(0.3)  # Уменьшенная задержка
-            
-            if depth > self.config['max_depth'] or url in self.visited_urls:
-                return
+        for content_hash, urls in self.content_hashes.items():
+            if len(urls) > 1:
+                for url in urls:
+                    duplicates_data.append({
+                        'URL': url,
+                        'Группа дубликатов': group_id,
+                        'Хеш контента': content_hash,
+                        'Заголовок': self.pages_data[url].title if url in self.pages_data else '',
+                        'Количество слов': self.pages_data[url].word_count if url in self.pages_data else 0,
+                        'Всего в группе': len(urls)
+                    })
+                group_id += 1
+        return duplicates_data
 
-            # Нормализация URL
-            normalized_url = self.normalize_url(url)
-            
-            # Проверяем принадлежность к основному домену
-            if not self.is_main_domain_only(normalized_url):
-                return
-            
-            if normalized_url in self.visited_urls:
-                return
+    def get_near_duplicate_clusters(self) -> List[Dict]:
+        """Строки отчета по группам похожих страниц (SimHash), включая точные дубликаты.
 
-            self.current_url = normalized_url
-            self.visited_urls.add(normalized_url)
-            
-            try:
-                async with session.get(normalized_url, headers=self.headers, timeout=30, allow_redirects=True) as response:
-                    self.status_counts[response.status] += 1
-                    
-                    # Обработка редиректов
-                    if response.history:
-                        redirect_chain = ' -> '.join([str(r.status) for r in response.history] + [str(response.status)])
-                        self.add_log(f"Редирект: {self.get_short_url(normalized_url)} ({redirect_chain})", "warning")
-                        self.redirects[normalized_url] = {
-                            'from': normalized_url,
-                            'to': str(response.url),
-                            'chain': redirect_chain
-                        }
-
-                    # Обработка ошибок
-                    if response.status == 404:
-                        error_msg = f"404: {normalized_url} (источник: {source_url or 'Начальная страница'})"
-                        self.log_error(error_msg)
-                        self.add_log(f"404: {self.get_short_url(normalized_url)}", "error")
-                        self.not_found_urls.append({'url': normalized_url, 'source': source_url or 'Начальная страница'})
-                        self.error_sources[normalized_url].append(source_url or 'Начальная страница')
-                        self.estimate_total_urls()  # Обновляем прогресс
-                        return
-                    elif response.status >= 400:
-                        error_msg = f"Ошибка {response.status}: {normalized_url} (источник: {source_url or 'Начальная страница'})"
-                        self.log_error(error_msg)
-                        self.add_log(f"Ошибка {response.status}: {self.get_short_url(normalized_url)}", "error")
-                        self.error_urls.append({
-                            'url': normalized_url, 
-                            'status': response.status, 
-                            'source': source_url or 'Начальная страница'
-                        })
-                        self.error_sources[normalized_url].append(source_url or 'Начальная страница')
-                        self.estimate_total_urls()  # Обновляем прогресс
-                        return
-                    else:
-                        self.add_log(f"Сканируем: {self.get_short_url(normalized_url)}", "info")
-
-                    # Проверяем content-type
-                    content_type = response.headers.get('content-type', '').lower()
-                    if 'text/html' not in content_type:
-                        return
-
-                    html = await response.text()
-                    
-                    # Анализируем страницу
-                    page_data = await self.analyze_page(session, normalized_url, html, response)
-                    self.pages_data[normalized_url] = page_data
-                    self.total_scanned += 1
-                    
-                    # Обновляем граф внутренних ссылок для новой страницы
-                    self.update_internal_links_for_page(normalized_url, page_data)
-                    
-                    # Обновляем прогресс и проверяем автосохранение
-                    self.estimate_total_urls()
-                    await self.auto_save_check()
-                    
-                    # Обновляем отображение
-                    live.update(self.generate_display())
-                    
-                    # Собираем ссылки для дальнейшего сканирования
-                    soup = BeautifulSoup(html, 'html.parser')
-                    links = set()
-                    
-                    # Ищем все ссылки
-                    for link in soup.find_all('a', href=True):
-                        href = link.get('href', '').strip()
-                        if href and not href.startswith(('#', 'mailto:', 'tel:', 'javascript:', 'data:')):
-                            full_url = urljoin(normalized_url, href)
-                            normalized_link = self.normalize_url(full_url)
-                            if (self.is_main_domain_only(normalized_link) and 
-                                self.can_fetch(normalized_link) and 
-                                normalized_link not in self.visited_urls):
-                                links.add(normalized_link)
-                    
-                    # Обрабатываем ссылки небольшими группами
-                    tasks = []
-                    for next_url in links:
-                        tasks.append(process_url(next_url, depth + 1, normalized_url))
-                    
-                    if tasks:
-                        # Ограничиваем количество одновременных запросов
-                        for i in range(0, len(tasks), 3):
-                            batch = tasks[i:i+3]
-                            await asyncio.gather(*batch, return_exceptions=True)
-                            
-                            # Обновляем прогресс после каждой группы
-                            self.estimate_total_urls()
-                            live.update(self.generate_display())
-                        
-            except asyncio.TimeoutError:
-                error_msg = f"Таймаут: {normalized_url}"
-                self.log_error(error_msg)
-                self.add_log(f"Таймаут: {self.get_short_url(normalized_url)}", "error")
-                self.estimate_total_urls()  # Обновляем прогресс
-            except Exception as e:
-                error_msg = f"Ошибка при обработке {normalized_url}: {str(e)}"
-                self.log_error(error_msg)
-                self.add_log(f"Ошибка: {self.get_short_url(normalized_url)}", "error")
-                self.estimate_total_urls()  # Обновляем прогресс
+        У страниц без текста нет отпечатка, они группируются по точному хешу.
+        """
+        duplicates_data = []
         
-        # Начинаем сканирование с начального URL
-        await process_url(self.start_url)
+        clusters = [[url for url in urls if url in self.pages_data] for urls in self.simhash_index.clusters()]
+        clusters = [urls for urls in clusters if len(urls) > 1]
+        for group_id, urls in enumerate(clusters, 1):
+            # Сходство считаем относительно первой страницы группы
+            base_fingerprint = int(self.pages_data[urls[0]].simhash, 16)
+            for url in urls:
+                data = self.pages_data[url]
+                distance = hamming_distance(base_fingerprint, int(data.simhash, 16))
+                duplicates_data.append({
+                    'URL': url,
+                    'Группа дубликатов': group_id,
+                    'Сходство с первой страницей, %': round((1 - distance / 64) * 100, 1),
+                    'Точный дубликат': 'Да' if data.duplicate_content else 'Нет',
+                    'SimHash': data.simhash,
+                    'Хеш контента': data.content_hash,
+                    'Заголовок': data.title,
+                    'Количество слов': data.word_count,
+                    'Всего в группе': len(urls)
+                })
+
+        group_id = len(clusters)
+        for content_hash, urls in self.content_hashes.items():
+            urls = [url for url in urls if url in self.pages_data and not self.pages_data[url].simhash]
+            if len(urls) < 2:
+                continue
+            group_id += 1
+            for url in urls:
+                data = self.pages_data[url]
+                duplicates_data.append({
+                    'URL': url,
+                    'Группа дубликатов': group_id,
+                    'Сходство с первой страницей, %': 100.0,
+                    'Точный дубликат': 'Да' if data.duplicate_content else 'Нет',
+                    'SimHash': '',
+                    'Хеш контента': content_hash,
+                    'Заголовок': data.title,
+                    'Количество слов': data.word_count,
+                    'Всего в группе': len(urls)
+                })
+        return duplicates_data
+
+    def take_export_snapshot(self, is_autosave: bool = False) -> ExportSnapshot:
+        """Неизменяемый срез данных для отчетов: дальше сканирование может менять свои структуры"""
+        if self.config['duplicates_report_mode'] == 'clusters' and self.simhash_index:
+            duplicates = self.get_near_duplicate_clusters()
+        else:
+            duplicates = self.get_exact_duplicates()
+
+        # С каталогом графа ребра среза пишутся в файл, иначе это копия графа в памяти
+        links_path = None
+        if self.config['pagerank_graph_dir']:
+            os.makedirs(self.config['pagerank_graph_dir'], exist_ok=True)
+            self.export_snapshots += 1
+            links_path = os.path.join(self.config['pagerank_graph_dir'], f'export-{self.export_snapshots}.bin')
+        link_sources = list(self.internal_links_graph.sources())
+        link_offsets, link_targets = self.internal_links_graph.to_csr(link_sources, links_path)
+        ranks_by_id = np.zeros(len(self.url_table))
+        for url, data in self.pages_data.items():
+            ranks_by_id[self.url_table.get_id(url)] = data.page_rank
+        return ExportSnapshot(
+            pages=self.copy_pages(),
+            urls=self.url_table.snapshot(),
+            link_sources=np.array(link_sources, dtype=np.uint32),
+            link_offsets=link_offsets,
+            link_targets=link_targets,
+            ranks_by_id=ranks_by_id,
+            duplicates=duplicates,
+            redirects=list(self.redirects.values()),
+            not_found_urls=list(self.not_found_urls),
+            error_urls=list(self.error_urls),
+            blocked_urls=list(self.blocked_urls),
+            error_sources={url: list(sources) for url, sources in self.error_sources.items()},
+            timestamp=time.strftime("%Y%m%d_%H%M%S") if is_autosave else ""
+        )
+
+    def copy_pages(self) -> Mapping[str, PageSEOData]:
+        """Копии страниц для среза; хранилище на диске копируется бэкапом SQLite"""
+        if isinstance(self.pages_data, PageStore):
+            # Потоки отчетов не должны создавать строки в таблице URL сканера
+            return self.pages_data.snapshot(from_record=page_from_record)
+        return {url: copy.copy(data) for url, data in self.pages_data.items()}
+
+    def report_filename(self, snapshot: ExportSnapshot, name: str) -> str:
+        extension = self.config['report_format']
+        if snapshot.timestamp:
+            return f'seo_отчет_{name}_autosave_{snapshot.timestamp}.{extension}'
+        return f'seo_отчет_{name}.{extension}'
+
+    async def export_results(self, is_autosave: bool = False) -> List[str]:
+        """Экспорт результатов: отчеты пишутся параллельно в потоках, цикл событий не блокируется.
+
+        Возвращает список созданных файлов.
+        """
+        # Итоговый экспорт дожидается фонового, чтобы они не писали файлы одновременно
+        if not is_autosave and self.export_task and not self.export_task.done():
+            await self.export_task
 
-    async def export_results(self, is_autosave: bool = False):
-        """Экспорт результатов в различные форматы"""
         if is_autosave:
             self.add_log(f"🔄 Автосохранение результатов ({len(self.pages_data)} страниц)...", "info")
         else:
             self.add_log("Экспортируем результаты...", "info")
-        
-        # Основной отчет
-        main_data = []
-        for url, data in self.pages_data.items():
-            main_data.append({
+
+        snapshot = self.take_export_snapshot(is_autosave)
+        reports = [
+            ('основной', self.iter_main_rows),
+            ('изображения', self.iter_image_rows),
+            ('дубликаты', self.iter_duplicate_rows),
+            ('pagerank', self.iter_pagerank_rows),
+            ('внутренние_ссылки', self.iter_internal_link_rows),
+            ('редиректы', self.iter_redirect_rows),
+            ('ошибки', self.iter_error_rows),
+        ]
+        if not is_autosave:
+            reports.append(('структура_сайта', self.iter_structure_rows))
+
+        # Пул создается один раз: выход из with ждал бы потоки и блокировал цикл событий при отмене
+        if self.export_executor is None:
+            self.export_executor = ThreadPoolExecutor(max_workers=self.config['export_workers'])
+        loop = asyncio.get_running_loop()
+        jobs = [
+            loop.run_in_executor(self.export_executor, self.write_report_file, snapshot, name, iter_rows)
+            for name, iter_rows in reports
+        ]
+        names = [name for name, _ in reports]
+        if not is_autosave:
+            jobs.append(loop.run_in_executor(self.export_executor, self.export_to_xml, snapshot))
+            names.append('sitemap')
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        if isinstance(snapshot.pages, PageStoreReader):
+            snapshot.pages.close()
+        if isinstance(snapshot.urls, DiskUrlList):
+            snapshot.urls.close()
+        if isinstance(snapshot.link_targets, np.memmap):
+            os.remove(snapshot.link_targets.filename)
+
+        files = []
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                self.log_error(f"Ошибка экспорта отчета {name}: {result}")
+                self.add_log(f"❌ Ошибка экспорта отчета: {name}", "error")
+                continue
+            files.extend(result)
+            if name != 'sitemap' and len(result) > 1:
+                self.add_log(f"Отчет {name} разбит на части: {len(result)}", "warning")
+
+        if is_autosave:
+            self.cleanup_old_autosaves()
+        return files
+
+    def shutdown_export_executor(self):
+        """Останавливает пул записи отчетов, не дожидаясь потоков прерванного экспорта"""
+        if self.export_executor:
+            self.export_executor.shutdown(wait=False, cancel_futures=True)
+            self.export_executor = None
+
+    def write_report_file(self, snapshot: ExportSnapshot, name: str,
+                          iter_rows: Callable[[ExportSnapshot], Iterator[Dict]]) -> List[str]:
+        """Потоково пишет строки отчета в файл, возвращает список созданных файлов"""
+        return write_report(
+            self.report_filename(snapshot, name),
+            iter_rows(snapshot),
+            self.config['report_format'],
+            self.config['report_max_rows']
+        )
+
+    def iter_main_rows(self, snapshot: ExportSnapshot) -> Iterator[Dict]:
+        """Основной отчет"""
+        for url, data in snapshot.pages.items():
+            yield {
                 'URL': url,
                 'Статус': data.status_code,
                 'Заголовок': data.title,
@@ -832,6 +1683,7 @@ class SEOFrogScanner:
                 'Время ответа (сек)': f"{data.response_time:.2f}",
                 'Размер страницы (байт)': data.content_length,
                 'Дубликат': 'Да' if data.duplicate_content else 'Нет',
+                'Почти дубликат': 'Да' if data.near_duplicate else 'Нет',
                 'PageRank': f"{data.page_rank:.6f}",
                 'Входящие внутренние ссылки': data.internal_links_count,
                 'Исходящие внутренние ссылки': len(data.outlinks),
@@ -843,230 +1695,163 @@ class SEOFrogScanner:
                 'Open Graph': len(data.open_graph),
                 'Twitter Cards': len(data.twitter_cards),
                 'Hreflang': len(data.hreflang),
+                'Обрезана': 'Да' if data.truncated else 'Нет',
                 'Проблемы': self.get_page_issues(data)
-            })
+            }
 
-        if main_data:
-            df_main = pd.DataFrame(main_data)
-            
-            # Для автосохранения используем временные файлы
-            if is_autosave:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = f'seo_отчет_основной_autosave_{timestamp}.xlsx'
-            else:
-                filename = 'seo_отчет_основной.xlsx'
-            
-            df_main.to_excel(filename, index=False)
-
-        # Отчет по изображениям
-        images_data = []
-        for url, data in self.pages_data.items():
+    def iter_image_rows(self, snapshot: ExportSnapshot) -> Iterator[Dict]:
+        """Отчет по изображениям"""
+        for url, data in snapshot.pages.items():
             for img in data.images:
-                images_data.append({
+                yield {
                     'URL страницы': url,
-                    'URL изображения': img['src'],
-                    'Alt текст': img['alt'],
-                    'Title': img['title'],
-                    'Есть Alt': 'Да' if img['alt'] else 'Нет'
-                })
-
-        if images_data:
-            df_images = pd.DataFrame(images_data)
-            if is_autosave:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = f'seo_отчет_изображения_autosave_{timestamp}.xlsx'
-            else:
-                filename = 'seo_отчет_изображения.xlsx'
-            df_images.to_excel(filename, index=False)
-
-        # Отчет по дубликатам
-        duplicates_data = []
-        duplicate_groups = {}
-        group_id = 1
-        
-        for content_hash, urls in self.content_hashes.items():
-            if len(urls) > 1:
-                duplicate_groups[content_hash] = group_id
-                for url in urls:
-                    duplicates_data.append({
-                        'URL': url,
-                        'Группа дубликатов': group_id,
-                        'Хеш контента': content_hash,
-                        'Заголовок': self.pages_data[url].title if url in self.pages_data else '',
-                        'Количество слов': self.pages_data[url].word_count if url in self.pages_data else 0,
-                        'Всего в группе': len(urls)
-                    })
-                group_id += 1
-
-        if duplicates_data:
-            df_duplicates = pd.DataFrame(duplicates_data)
-            df_duplicates = df_duplicates.sort_values(['Группа дубликатов', 'URL'])
-            if is_autosave:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = f'seo_отчет_дубликаты_autosave_{timestamp}.xlsx'
-            else:
-                filename = 'seo_отчет_дубликаты.xlsx'
-            df_duplicates.to_excel(filename, index=False)
-
-        # Отчет по PageRank
-        if self.config['calculate_pagerank'] and self.pages_data:
-            pagerank_data = []
-            sorted_pages = sorted(
-                self.pages_data.items(), 
-                key=lambda x: x[1].page_rank, 
-                reverse=True
-            )
-            
-            for rank_position, (url, data) in enumerate(sorted_pages, 1):
-                pagerank_data.append({
-                    'Позиция': rank_position,
-                    'URL': url,
-                    'PageRank': data.page_rank,
-                    'Входящие внутренние ссылки': data.internal_links_count,
-                    'Исходящие внутренние ссылки': len(data.outlinks),
-                    'Внешние ссылки': len(data.inlinks),
-                    'Заголовок': data.title,
-                    'Статус': data.status_code,
-                    'Количество слов': data.word_count,
-                    'Время ответа (сек)': f"{data.response_time:.2f}"
-                })
-            
-            if pagerank_data:
-                df_pagerank = pd.DataFrame(pagerank_data)
-                if is_autosave:
-                    timestamp = time.strftime("%Y%m%d_%H%M%S")
-                    filename = f'seo_отчет_pagerank_autosave_{timestamp}.xlsx'
-                else:
-                    filename = 'seo_отчет_pagerank.xlsx'
-                df_pagerank.to_excel(filename, index=False)
-
-        # Отчет по внутренним ссылкам
-        internal_links_data = []
-        for source_url, target_urls in self.internal_links_graph.items():
-            for target_url in target_urls:
-                internal_links_data.append({
-                    'Источник': source_url,
-                    'Цель': target_url,
-                    'PageRank источника': self.pages_data[source_url].page_rank if source_url in self.pages_data else 0,
-                    'PageRank цели': self.pages_data[target_url].page_rank if target_url in self.pages_data else 0,
-                    'Заголовок источника': self.pages_data[source_url].title if source_url in self.pages_data else '',
-                    'Заголовок цели': self.pages_data[target_url].title if target_url in self.pages_data else ''
-                })
-
-        if internal_links_data:
-            df_internal_links = pd.DataFrame(internal_links_data)
-            df_internal_links = df_internal_links.sort_values('PageRank цели', ascending=False)
-            if is_autosave:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = f'seo_отчет_внутренние_ссылки_autosave_{timestamp}.xlsx'
-            else:
-                filename = 'seo_отчет_внутренние_ссылки.xlsx'
-            df_internal_links.to_excel(filename, index=False)
-
-        # Отчет по редиректам
-        if self.redirects:
-            redirects_data = []
-            for redirect_data in self.redirects.values():
-                redirects_data.append({
-                    'С URL': redirect_data['from'],
-                    'На URL': redirect_data['to'],
-                    'Цепочка редиректов': redirect_data['chain']
-                })
-            df_redirects = pd.DataFrame(redirects_data)
-            if is_autosave:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = f'seo_отчет_редиректы_autosave_{timestamp}.xlsx'
-            else:
-                filename = 'seo_отчет_редиректы.xlsx'
-            df_redirects.to_excel(filename, index=False)
+                    'URL изображения': img.src,
+                    'Alt текст': img.alt,
+                    'Title': img.title,
+                    'Есть Alt': 'Да' if img.alt else 'Нет'
+                }
+
+    def iter_duplicate_rows(self, snapshot: ExportSnapshot) -> Iterator[Dict]:
+        """Отчет по дубликатам"""
+        yield from sorted(snapshot.duplicates, key=lambda row: (row['Группа дубликатов'], row['URL']))
+
+    def iter_pagerank_rows(self, snapshot: ExportSnapshot) -> Iterator[Dict]:
+        """Отчет по PageRank"""
+        if not self.config['calculate_pagerank']:
+            return
+        # Сортируются только пары (PageRank, URL), страницы читаются по одной
+        pages = snapshot.pages
+        sorted_urls = sorted(
+            ((data.page_rank, url) for url, data in pages.items()),
+            key=lambda x: x[0],
+            reverse=True
+        )
 
-        # Отчет по ошибкам
-        if self.error_urls or self.not_found_urls:
-            errors_data = []
-            
-            # 404 ошибки
-            for error in self.not_found_urls:
-                sources = self.error_sources.get(error['url'], [])
-                errors_data.append({
-                    'URL': error['url'],
-                    'Тип ошибки': '404 Не найдено',
-                    'Основной источник': error['source'],
-                    'Все источники': ' | '.join(set(sources)) if sources else error['source'],
-                    'Количество источников': len(set(sources)) if sources else 1
-                })
-            
-            # Другие ошибки
-            for error in self.error_urls:
-                sources = self.error_sources.get(error['url'], [])
-                errors_data.append({
-                    'URL': error['url'],
-                    'Тип ошибки': f"Ошибка {error.get('status', 'неизвестно')}",
-                    'Основной источник': error['source'],
-                    'Все источники': ' | '.join(set(sources)) if sources else error['source'],
-                    'Количество источников': len(set(sources)) if sources else 1
-                })
+        for rank_position, (_, url) in enumerate(sorted_urls, 1):
+            data = pages[url]
+            yield {
+                'Позиция': rank_position,
+                'URL': url,
+                'PageRank': data.page_rank,
+                'Входящие внутренние ссылки': data.internal_links_count,
+                'Исходящие внутренние ссылки': len(data.outlinks),
+                'Внешние ссылки': len(data.inlinks),
+                'Заголовок': data.title,
+                'Статус': data.status_code,
+                'Количество слов': data.word_count,
+                'Время ответа (сек)': f"{data.response_time:.2f}"
+            }
+
+    def iter_internal_link_rows(self, snapshot: ExportSnapshot) -> Iterator[Dict]:
+        """Отчет по внутренним ссылкам (по убыванию PageRank цели)"""
+        pages = snapshot.pages
+        for source_id, target_id in snapshot.links_by_target_rank():
+            source_url = snapshot.urls[source_id]
+            target_url = snapshot.urls[target_id]
+            source = pages.get(source_url)
+            target = pages.get(target_url)
+            yield {
+                'Источник': source_url,
+                'Цель': target_url,
+                'PageRank источника': source.page_rank if source else 0,
+                'PageRank цели': target.page_rank if target else 0,
+                'Заголовок источника': source.title if source else '',
+                'Заголовок цели': target.title if target else ''
+            }
+
+    def iter_redirect_rows(self, snapshot: ExportSnapshot) -> Iterator[Dict]:
+        """Отчет по редиректам"""
+        for redirect_data in snapshot.redirects:
+            yield {
+                'С URL': redirect_data['from'],
+                'На URL': redirect_data['to'],
+                'Цепочка редиректов': redirect_data['chain']
+            }
+
+    def iter_error_rows(self, snapshot: ExportSnapshot) -> Iterator[Dict]:
+        """Отчет по ошибкам"""
+        errors_data = []
+
+        # 404 ошибки
+        for error in snapshot.not_found_urls:
+            sources = snapshot.error_sources.get(error['url'], [])
+            errors_data.append({
+                'URL': error['url'],
+                'Тип ошибки': '404 Не найдено',
+                'Основной источник': error['source'],
+                'Все источники': ' | '.join(set(sources)) if sources else error['source'],
+                'Количество источников': len(set(sources)) if sources else 1
+            })
 
-            if errors_data:
-                df_errors = pd.DataFrame(errors_data)
-                df_errors = df_errors.sort_values('Количество источников', ascending=False)
-                if is_autosave:
-                    timestamp = time.strftime("%Y%m%d_%H%M%S")
-                    filename = f'seo_отчет_ошибки_autosave_{timestamp}.xlsx'
-                else:
-                    filename = 'seo_отчет_ошибки.xlsx'
-                df_errors.to_excel(filename, index=False)
+        # Другие ошибки
+        for error in snapshot.error_urls:
+            sources = snapshot.error_sources.get(error['url'], [])
+            errors_data.append({
+                'URL': error['url'],
+                'Тип ошибки': f"Ошибка {error.get('status', 'неизвестно')}",
+                'Основной источник': error['source'],
+                'Все источники': ' | '.join(set(sources)) if sources else error['source'],
+                'Количество источников': len(set(sources)) if sources else 1
+            })
 
-        # Экспорт в XML (Sitemap)
-        if not is_autosave:
-            self.export_to_xml()
+        # Страницы, закрытые X-Robots-Tag
+        for blocked in snapshot.blocked_urls:
+            errors_data.append({
+                'URL': blocked['url'],
+                'Тип ошибки': f"X-Robots-Tag: {blocked['x_robots_tag']}",
+                'Основной источник': blocked['source'],
+                'Все источники': blocked['source'],
+                'Количество источников': 1
+            })
 
-        # Экспорт структуры сайта
-        if not is_autosave:
-            self.export_site_structure(is_autosave=False)
+        yield from sorted(errors_data, key=lambda row: row['Количество источников'], reverse=True)
 
-    def export_to_xml(self):
-        """Экспорт в XML sitemap формат"""
-        urlset = ET.Element("urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
-        
-        # Сортируем по PageRank для приоритизации
-        sorted_pages = sorted(
-            self.pages_data.items(), 
-            key=lambda x: x[1].page_rank, 
+    def export_to_xml(self, snapshot: ExportSnapshot) -> List[str]:
+        """Экспорт в XML sitemap: файлы по 50 000 URL (gzip) и индекс sitemap"""
+        # Сортируем по PageRank для приоритизации (только успешные страницы)
+        sorted_urls = sorted(
+            ((data.page_rank, url) for url, data in snapshot.pages.items() if data.status_code == 200),
+            key=lambda x: x[0],
             reverse=True
         )
-        
-        for url, data in sorted_pages:
-            if data.status_code == 200:  # Только успешные страницы
-                url_elem = ET.SubElement(urlset, "url")
-                ET.SubElement(url_elem, "loc").text = url
-                
-                # Приоритет на основе PageRank (нормализуем к диапазону 0.1-1.0)
-                max_rank = max(d.page_rank for d in self.pages_data.values())
-                priority = max(0.1, min(1.0, data.page_rank / max_rank))
-                ET.SubElement(url_elem, "priority").text = f"{priority:.1f}"
-                
-                # Частота изменений на основе уровня вложенности
-                depth = len([p for p in urlparse(url).path.split('/') if p])
-                if depth <= 1:
-                    changefreq = "daily"
-                elif depth <= 2:
-                    changefreq = "weekly"
-                else:
-                    changefreq = "monthly"
-                ET.SubElement(url_elem, "changefreq").text = changefreq
-
-        tree = ET.ElementTree(urlset)
-        tree.write("sitemap.xml", encoding='utf-8', xml_declaration=True)
-
-    def export_site_structure(self, is_autosave: bool = False):
-        """Экспорт структуры сайта"""
-        structure_data = []
-        
-        for url, data in self.pages_data.items():
+        # Максимум для нормализации приоритета считаем один раз
+        max_rank = max((data.page_rank for data in snapshot.pages.values()), default=0)
+
+        writer = SitemapWriter(
+            self.config['sitemap_file'],
+            base_url=urljoin(self.start_url, '/'),
+            compress=self.config['sitemap_gzip'],
+            max_urls=self.config['sitemap_max_urls']
+        )
+        for page_rank, url in sorted_urls:
+            # Приоритет на основе PageRank (нормализуем к диапазону 0.1-1.0)
+            priority = max(0.1, min(1.0, page_rank / max_rank)) if max_rank > 0 else 0.1
+            
+            # Частота изменений на основе уровня вложенности
+            depth = len([p for p in urlparse(url).path.split('/') if p])
+            if depth <= 1:
+                changefreq = "daily"
+            elif depth <= 2:
+                changefreq = "weekly"
+            else:
+                changefreq = "monthly"
+            writer.add(url, changefreq=changefreq, priority=priority)
+        return writer.close()
+
+    def iter_structure_rows(self, snapshot: ExportSnapshot) -> Iterator[Dict]:
+        """Отчет по структуре сайта"""
+        def sort_key(item):
+            path_parts = [p for p in urlparse(item[1]).path.split('/') if p]
+            return len(path_parts), -item[0]
+
+        pages = snapshot.pages
+        sorted_urls = sorted(((data.page_rank, url) for url, data in pages.items()), key=sort_key)
+        for _, url in sorted_urls:
+            data = pages[url]
             parsed = urlparse(url)
             path_parts = [p for p in parsed.path.split('/') if p]
             
-            structure_data.append({
+            yield {
                 'URL': url,
                 'Уровень вложенности': len(path_parts),
                 'Путь': parsed.path,
@@ -1075,17 +1860,7 @@ class SEOFrogScanner:
                 'Входящие ссылки': data.internal_links_count,
                 'Заголовок': data.title,
                 'Статус': data.status_code
-            })
-        
-        if structure_data:
-            df_structure = pd.DataFrame(structure_data)
-            df_structure = df_structure.sort_values(['Уровень вложенности', 'PageRank'], ascending=[True, False])
-            if is_autosave:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = f'seo_отчет_структура_сайта_autosave_{timestamp}.xlsx'
-            else:
-                filename = 'seo_отчет_структура_сайта.xlsx'
-            df_structure.to_excel(filename, index=False)
+            }
 
     def get_page_issues(self, data: PageSEOData) -> str:
         """Получение списка проблем страницы"""
@@ -1114,6 +1889,8 @@ class SEOFrogScanner:
         # Контентные проблемы
         if data.duplicate_content:
             issues.append("Дублированный контент")
+        elif data.near_duplicate:
+            issues.append("Почти дублированный контент")
         
         if data.word_count < self.config['min_word_count']:
             issues.append(f"Мало контента (<{self.config['min_word_count']} слов)")
@@ -1121,12 +1898,15 @@ class SEOFrogScanner:
         # Технические проблемы
         if data.response_time > self.config['max_response_time']:
             issues.append("Медленный ответ")
+
+        if data.truncated:
+            issues.append(f"Страница больше {self.config['max_page_bytes']} байт (обрезана)")
         
         if data.page_rank < 0.0001:  # Очень низкий PageRank
             issues.append("Низкий PageRank")
         
         # Проблемы с изображениями
-        images_without_alt = sum(1 for img in data.images if not img.get('alt'))
+        images_without_alt = sum(1 for img in data.images if not img.alt)
         if images_without_alt > 0:
             issues.append(f"Изображения без Alt ({images_without_alt})")
         
@@ -1172,81 +1952,123 @@ class SEOFrogScanner:
     async def auto_save_check(self):
         """Проверяет необходимость автосохранения"""
         if len(self.pages_data) - self.last_save_count >= self.save_interval:
-            self.add_log(f"🔄 Автосохранение каждые {self.save_interval} страниц...", "info")
-            await self.export_results(is_autosave=True)
+            saved = self.write_autosave()
             self.last_save_count = len(self.pages_data)
-            self.add_log(f"✅ Автосохранение завершено ({len(self.pages_data)} страниц)", "success")
-            
-            # Очищаем старые автосохранения
-            self.cleanup_old_autosaves()
+            self.add_log(f"💾 Автосохранение: +{saved} записей ({len(self.pages_data)} страниц)", "success")
+
+            # xlsx пишутся в фоне по срезу данных, сканирование не ждет; пока идет прошлый экспорт, новый не начинаем
+            if self.config['autosave_reports'] and (self.export_task is None or self.export_task.done()):
+                self.export_task = asyncio.create_task(self.export_results(is_autosave=True))
+
+    def write_autosave(self) -> int:
+        """Дописывает в журнал автосохранения только записи, появившиеся с прошлого сохранения"""
+        if self.autosave_log is None:
+            return 0
+        records = [('page', url, asdict(self.pages_data[url])) for url in self.autosave_pages]
+        records.extend(self.collect_new_records(self.autosave_marks))
+        self.autosave_pages = []
+        return self.autosave_log.append(records)
+
+    def collect_new_records(self, marks: Dict[str, int]) -> List[Tuple[str, str, Dict]]:
+        """Записи 404, ошибок, X-Robots-Tag и редиректов, появившиеся после отметок marks; отметки сдвигаются"""
+        records = [('not_found', error['url'], error) for error in self.not_found_urls[marks['not_found']:]]
+        records.extend(('error', error['url'], error) for error in self.error_urls[marks['error']:])
+        records.extend(('blocked', blocked['url'], blocked) for blocked in self.blocked_urls[marks['blocked']:])
+        records.extend(
+            ('redirect', url, redirect) for url, redirect in islice(self.redirects.items(), marks['redirect'], None)
+        )
+        marks['not_found'] = len(self.not_found_urls)
+        marks['error'] = len(self.error_urls)
+        marks['blocked'] = len(self.blocked_urls)
+        marks['redirect'] = len(self.redirects)
+        return records
+
+    async def export_autosave(self) -> List[str]:
+        """Собирает из журнала автосохранения тот же набор отчетов и sitemap, что и завершенное сканирование"""
+        self.init_page_store()
+        records = {'page': {}, 'not_found': {}, 'error': {}, 'blocked': {}, 'redirect': {}}
+        for record_type, url, data in AutosaveLog.iter_records(self.config['autosave_file']):
+            records[record_type][url] = data
+
+        for url, page in records['page'].items():
+            self.restore_page(url, page)
+        self.not_found_urls = list(records['not_found'].values())
+        self.error_urls = list(records['error'].values())
+        self.blocked_urls = list(records['blocked'].values())
+        for error in self.not_found_urls + self.error_urls:
+            self.error_sources[error['url']].append(error['source'])
+        self.redirects = records['redirect']
+
+        self.build_internal_links_graph()
+        if self.config['calculate_pagerank'] and self.pages_data:
+            self.calculate_internal_pagerank()
+        # Журнал содержит все сканирование, поэтому экспорт полный: со структурой сайта и sitemap
+        files = await self.export_results()
+        self.shutdown_export_executor()
+        return files
 
     def estimate_total_urls(self):
-        """Оценивает общее количество URL на основе найденных ссылок"""
+        """Оценивает общее количество URL по счетчикам очереди (O(1) на вызов)"""
+        visited = len(self.visited_urls)
+        queued = self.frontier.qsize() if self.frontier else 0
+        # Каждая найденная внутренняя ссылка один раз попадает в таблицу URL
+        discovered = max(len(self.url_table), visited + queued)
+        
+        self.progress_data['scanned'] = visited
+        self.progress_data['queued'] = queued
+        self.progress_data['discovered'] = discovered
+        self.progress_data['found'] = len(self.pages_data)
+        self.progress_data['errors'] = len(self.error_urls) + len(self.not_found_urls)
+        
         if not self.pages_data:
             self.estimated_total_urls = 100  # Базовая оценка
             return
         
-        # Подсчитываем все уникальные ссылки из всех страниц
-        all_links = set()
-        for page_data in self.pages_data.values():
-            all_links.update(page_data.outlinks)
-        
-        # Добавляем уже посещенные URL
-        all_links.update(self.visited_urls)
-        
         # Оценка: если мы нашли много ссылок, но посетили мало, значит их больше
-        if len(all_links) > len(self.visited_urls) * 2:
-            self.estimated_total_urls = max(self.estimated_total_urls, len(all_links) * 1.5)
+        if discovered > visited * 2:
+            self.estimated_total_urls = max(self.estimated_total_urls, int(discovered * 1.5))
         else:
             # Если ссылок мало, возможно мы близки к завершению
-            self.estimated_total_urls = max(self.estimated_total_urls, len(all_links) * 1.2)
-        
-        # Обновляем прогресс
-        self.progress_data['scanned'] = len(self.visited_urls)
-        self.progress_data['found'] = len(self.pages_data)
-        self.progress_data['errors'] = len(self.error_urls) + len(self.not_found_urls)
+            self.estimated_total_urls = max(self.estimated_total_urls, int(discovered * 1.2))
 
-    def cleanup_old_autosaves(self):
-        """Очищает старые файлы автосохранения, оставляя только последние 3"""
+    def cleanup_old_autosaves(self, keep: int = 3):
+        """Очищает старые файлы автосохранения, оставляя последние keep автосохранений каждого отчета"""
         import glob
         import os
         
-        # Паттерны для поиска файлов автосохранения
-        patterns = [
-            'seo_отчет_основной_autosave_*.xlsx',
-            'seo_отчет_изображения_autosave_*.xlsx',
-            'seo_отчет_дубликаты_autosave_*.xlsx',
-            'seo_отчет_pagerank_autosave_*.xlsx',
-            'seo_отчет_внутренние_ссылки_autosave_*.xlsx',
-            'seo_отчет_редиректы_autosave_*.xlsx',
-            'seo_отчет_ошибки_autosave_*.xlsx',
-            'seo_отчет_структура_сайта_autosave_*.xlsx'
-        ]
-        
-        for pattern in patterns:
-            files = glob.glob(pattern)
-            if len(files) > 3:
-                # Сортируем по времени создания и удаляем старые
-                files.sort(key=os.path.getctime, reverse=True)
-                for old_file in files[3:]:
+        extension = self.config['report_format']
+        names = ['основной', 'изображения', 'дубликаты', 'pagerank', 'внутренние_ссылки',
+                 'редиректы', 'ошибки', 'структура_сайта']
+        
+        for name in names:
+            # Разбитый CSV-отчет - несколько файлов с одной меткой времени (_2, _3...), удаляются только вместе
+            prefix = f'seo_отчет_{name}_autosave_'
+            saves = defaultdict(list)
+            for path in glob.glob(f'{prefix}*.{extension}'):
+                timestamp = path[len(prefix):len(prefix) + len('YYYYmmdd_HHMMSS')]
+                saves[timestamp].append(path)
+            
+            for timestamp in sorted(saves, reverse=True)[keep:]:
+                for old_file in saves[timestamp]:
                     try:
                         os.remove(old_file)
                         self.add_log(f"🗑️ Удален старый автосохраненный файл: {old_file}", "info")
                     except Exception as e:
                         self.add_log(f"❌ Ошибка при удалении {old_file}: {e}", "error")
 
-    async def run(self):
-        """Запуск сканирования"""
+    async def run(self, resume: bool = False):
+        """Запуск сканирования (resume=True - продолжить с последней контрольной точки)"""
+        self.resume = resume
         self.console.clear()
         self.add_log(f"Начало сканирования домена: {self.main_domain}", "info")
         self.add_log(f"Режим: только основной домен {'✓' if self.config['main_domain_only'] else '✗'}", "info")
         
         timeout = aiohttp.ClientTimeout(total=60, connect=10)
         connector = aiohttp.TCPConnector(
-            limit=10, 
+            limit=self.get_max_concurrency(),
             force_close=True, 
             enable_cleanup_closed=True,
-            limit_per_host=5
+            limit_per_host=self.get_max_concurrency()
         )
         
         try:
@@ -1279,30 +2101,31 @@ class SEOFrogScanner:
                 self.console.print(f"[blue]🏆 Средний PageRank: {avg_pagerank:.4f}, Максимальный: {max_pagerank:.4f}[/blue]")
             
             self.console.print("\n[blue]📁 Созданные отчеты:[/blue]")
+            extension = self.config['report_format']
             reports = [
-                "seo_отчет_основной.xlsx",
-                "seo_отчет_pagerank.xlsx", 
-                "seo_отчет_структура_сайта.xlsx",
-                "seo_отчет_внутренние_ссылки.xlsx",
-                "sitemap.xml"
+                f"seo_отчет_основной.{extension}",
+                f"seo_отчет_pagerank.{extension}", 
+                f"seo_отчет_структура_сайта.{extension}",
+                f"seo_отчет_внутренние_ссылки.{extension}",
+                self.config['sitemap_file']
             ]
             
             # Показываем информацию об автосохранениях
             if self.last_save_count > 0:
-                self.console.print(f"[yellow]💾 Автосохранения: {self.last_save_count // self.save_interval} раз (каждые {self.save_interval} страниц)[/yellow]")
+                self.console.print(f"[yellow]💾 Автосохранения: {self.last_save_count // self.save_interval} раз (каждые {self.save_interval} страниц) в {self.config['autosave_file']}[/yellow]")
             
             # Условные отчеты
             if any(len(data.images) > 0 for data in self.pages_data.values()):
-                reports.append("seo_отчет_изображения.xlsx")
+                reports.append(f"seo_отчет_изображения.{extension}")
             
             if any(data.duplicate_content for data in self.pages_data.values()):
-                reports.append("seo_отчет_дубликаты.xlsx")
+                reports.append(f"seo_отчет_дубликаты.{extension}")
             
             if self.redirects:
-                reports.append("seo_отчет_редиректы.xlsx")
+                reports.append(f"seo_отчет_редиректы.{extension}")
             
-            if self.error_urls or self.not_found_urls:
-                reports.append("seo_отчет_ошибки.xlsx")
+            if self.error_urls or self.not_found_urls or self.blocked_urls:
+                reports.append(f"seo_отчет_ошибки.{extension}")
             
             reports.append(self.error_log_file)
             
@@ -1311,6 +2134,7 @@ class SEOFrogScanner:
         
         except KeyboardInterrupt:
             self.console.print("\n[yellow]⚠️ Сканирование прервано пользователем[/yellow]")
+            self.console.print("[blue]▶️ Продолжить сканирование: python seo_scanner.py <url> --resume[/blue]")
             if self.pages_data:
                 self.console.print("[blue]💾 Сохраняем частичные результаты...[/blue]")
                 await self.export_results()
@@ -1319,12 +2143,30 @@ class SEOFrogScanner:
             self.log_error(error_msg)
             self.console.print(f"[red]❌ {error_msg}[/red]")
         finally:
+            self.shutdown_export_executor()
             await connector.close()
 
 # Пример использования
 if __name__ == "__main__":
-    website_url = input("Введите URL сайта для SEO анализа: ")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SEO Frog Scanner")
+    parser.add_argument('url', nargs='?', help="URL сайта для SEO анализа")
+    parser.add_argument('--resume', action='store_true', help="Продолжить прерванное сканирование")
+    parser.add_argument('--export-autosave', action='store_true',
+                        help="Собрать отчеты и sitemap из журнала автосохранения без сканирования")
+    args = parser.parse_args()
+
+    website_url = args.url or input("Введите URL сайта для SEO анализа: ")
     scanner = SEOFrogScanner(website_url)
+
+    if args.export_autosave:
+        files = asyncio.run(scanner.export_autosave())
+        print(f"📁 Отчеты собраны из {scanner.config['autosave_file']}: {len(scanner.pages_data)} страниц")
+        for path in files:
+            print(f"  • {path}")
+        scanner.close()
+        raise SystemExit
     
     # Можно настроить дополнительные параметры
     print(f"\n🔧 Текущие настройки:")
@@ -1334,4 +2176,5 @@ if __name__ == "__main__":
     print(f"  • Минимум слов на странице: {scanner.config['min_word_count']}")
     
     # Запуск сканирования
-    asyncio.run(scanner.run())
\ No newline at end of file
+    asyncio.run(scanner.run(resume=args.resume))
+    scanner.close()
\ No newline at end of file
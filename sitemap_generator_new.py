@@ -1,6 +1,4 @@
 from datetime import datetime
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import itertools
 import requests
 from bs4 import BeautifulSoup
@@ -16,6 +14,8 @@ import asyncio
 from aiohttp import ClientTimeout
 from functools import lru_cache
 
+from sitemap_writer import SitemapWriter
+
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -205,15 +205,12 @@ async def async_generate_sitemap():
         
         valid_urls = await check_urls_async(urls_to_check, cache)
         
-        # Создаем sitemap
-        urlset = ET.Element('urlset', xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
+        # Создаем sitemap потоково: файлы по 50 000 URL и индекс sitemap_filters.xml
+        writer = SitemapWriter('sitemap_filters.xml', base_url=urljoin(base_url, '/'))
+        lastmod = datetime.now().strftime('%Y-%m-%d')
         for url in valid_urls:
-            add_url(urlset, url, '0.8' if url != base_url else '1.0')
-        
-        # Сохраняем результаты
-        xml_str = minidom.parseString(ET.tostring(urlset)).toprettyxml(indent="    ")
-        with open('sitemap_filters.xml', 'w', encoding='utf-8') as f:
-            f.write(xml_str)
+            writer.add(url, lastmod=lastmod, priority=0.8 if url != base_url else 1.0)
+        writer.close()
         
         save_cache(cache)
         
@@ -226,17 +223,5 @@ async def async_generate_sitemap():
         logger.error(f"Критическая ошибка: {e}")
         raise
 
-def add_url(urlset, loc, priority):
-    url = ET.SubElement(urlset, 'url')
-    
-    loc_elem = ET.SubElement(url, 'loc')
-    loc_elem.text = loc
-    
-    lastmod = ET.SubElement(url, 'lastmod')
-    lastmod.text = datetime.now().strftime('%Y-%m-%d')
-    
-    priority_elem = ET.SubElement(url, 'priority')
-    priority_elem.text = priority
-
 if __name__ == '__main__':
     asyncio.run(async_generate_sitemap()) 
\ No newline at end of file
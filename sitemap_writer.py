@@ -0,0 +1,98 @@
+import gzip
+import os
+from datetime import date
+from typing import List, Optional
+from urllib.parse import urljoin
+from xml.sax.saxutils import escape
+
+# Ограничения протокола sitemaps.org на один файл
+SITEMAP_MAX_URLS = 50_000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024  # Без сжатия
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+URLSET_HEADER = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+URLSET_FOOTER = '</urlset>\n'
+
+
+class SitemapWriter:
+    """Потоковая запись sitemap: элементы <url> сразу пишутся в файл, дерево XML не строится.
+
+    URL раскладываются по файлам sitemap-1.xml.gz, sitemap-2.xml.gz... не
+    больше max_urls URL и max_bytes байт (без сжатия) в каждом, а по пути
+    path записывается индекс sitemap со ссылками на них. В индексе адреса
+    файлов строятся от base_url - каталога сайта, где будут лежать файлы.
+    """
+
+    def __init__(self, path: str = 'sitemap.xml', base_url: Optional[str] = None, compress: bool = True,
+                 max_urls: int = SITEMAP_MAX_URLS, max_bytes: int = SITEMAP_MAX_BYTES):
+        self.path = path
+        self.base_url = base_url
+        self.compress = compress
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.parts: List[str] = []
+        self.file = None
+        self.urls_in_part = 0
+        self.bytes_in_part = 0
+        self.total_urls = 0
+
+    def part_path(self, number: int) -> str:
+        root, ext = os.path.splitext(self.path)
+        return f"{root}-{number}{ext}{'.gz' if self.compress else ''}"
+
+    def start_part(self):
+        self.finish_part()
+        path = self.part_path(len(self.parts) + 1)
+        self.file = gzip.open(path, 'wb') if self.compress else open(path, 'wb')
+        self.parts.append(path)
+        self.urls_in_part = 0
+        self.bytes_in_part = 0
+        self.write(URLSET_HEADER.encode('utf-8'))
+
+    def finish_part(self):
+        if self.file is not None:
+            self.write(URLSET_FOOTER.encode('utf-8'))
+            self.file.close()
+            self.file = None
+
+    def write(self, data: bytes):
+        self.file.write(data)
+        self.bytes_in_part += len(data)
+
+    def add(self, loc: str, lastmod: Optional[str] = None, changefreq: Optional[str] = None,
+            priority: Optional[float] = None):
+        """Добавляет URL в текущий файл, начиная новый при достижении лимитов"""
+        entry = [f"  <url>\n    <loc>{escape(loc)}</loc>\n"]
+        if lastmod:
+            entry.append(f"    <lastmod>{lastmod}</lastmod>\n")
+        if changefreq:
+            entry.append(f"    <changefreq>{changefreq}</changefreq>\n")
+        if priority is not None:
+            entry.append(f"    <priority>{priority:.1f}</priority>\n")
+        entry.append("  </url>\n")
+        data = ''.join(entry).encode('utf-8')
+
+        if (self.file is None or self.urls_in_part >= self.max_urls
+                or self.bytes_in_part + len(data) + len(URLSET_FOOTER) > self.max_bytes):
+            self.start_part()
+        self.write(data)
+        self.urls_in_part += 1
+        self.total_urls += 1
+
+    def close(self) -> List[str]:
+        """Закрывает последний файл и пишет индекс, возвращает список файлов sitemap"""
+        if self.file is None and not self.parts:
+            # Пустой sitemap тоже должен быть корректным
+            self.start_part()
+        self.finish_part()
+
+        today = date.today().isoformat()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n')
+            for part in self.parts:
+                name = os.path.basename(part)
+                loc = urljoin(self.base_url, name) if self.base_url else name
+                f.write(f"  <sitemap>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{today}</lastmod>\n  </sitemap>\n")
+            f.write('</sitemapindex>\n')
+        return [self.path] + self.parts
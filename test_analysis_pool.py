@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки разбора HTML в пуле процессов
+"""
+
+import asyncio
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from html_extractors import EXTRACTORS, analyze_html, etree
+from seo_scanner import SEOFrogScanner
+
+PAGE = """<html><head><title>Памятники из гранита</title>
+<meta name="description" content="Каталог памятников"></head>
+<body><h1>Памятники</h1><p>Гранитный памятник, цена 15 000 руб.</p>
+<img src="/img/1.jpg" alt="Памятник"><a href="/catalog">Каталог</a><a href="https://other.example.org/">Внешняя</a>
+</body></html>"""
+
+# Путь -> (тело, Content-Type); у /utf8 charset в заголовке не указан
+PAGES = {
+    '/utf8': (PAGE.encode('utf-8'), 'text/html'),
+    '/cp1251': (PAGE.encode('cp1251'), 'text/html; charset=windows-1251'),
+    '/catalog': (PAGE.encode('utf-8'), 'text/html; charset=utf-8'),
+}
+
+
+def backends():
+    return [backend for backend in EXTRACTORS if backend != 'lxml' or etree is not None]
+
+
+async def handler(request):
+    body, content_type = PAGES[request.path]
+    return web.Response(body=body, headers={'Content-Type': content_type})
+
+
+async def start_server():
+    app = web.Application()
+    app.router.add_get('/{name:.*}', handler)
+    server = TestServer(app, host='localhost')
+    await server.start_server()
+    return server
+
+
+def test_worker_result_matches_in_process():
+    async def run():
+        server = await start_server()
+        try:
+            results = []
+            loop = asyncio.get_running_loop()
+            async with aiohttp.ClientSession() as session:
+                for path in ('/utf8', '/cp1251'):
+                    async with session.get(server.make_url(path)) as response:
+                        body = await response.read()
+                        charset = response.charset
+                        text = await response.text()
+                    url = str(server.make_url(path))
+                    for backend in backends():
+                        with ProcessPoolExecutor(1) as executor:
+                            worker = await loop.run_in_executor(executor, analyze_html, url, body, charset, backend)
+                        results.append((path, backend, charset, text, worker, analyze_html(url, body, charset, backend)))
+            return results
+        finally:
+            await server.close()
+
+    for path, backend, charset, text, worker, local in asyncio.run(run()):
+        # Без charset в заголовке тело декодируется как UTF-8, так же как response.text()
+        assert charset == (None if path == '/utf8' else 'windows-1251')
+        assert worker.title == "Памятники из гранита" and worker.title in text, (path, backend)
+        # Результат воркера совпадает с разбором в основном процессе и переживает pickle
+        assert asdict(worker) == asdict(local), (path, backend)
+        assert asdict(pickle.loads(pickle.dumps(worker))) == asdict(local)
+        assert worker.word_count > 0 and worker.text_content == ""
+
+
+def test_scanner_with_process_pool_matches_in_process():
+    async def crawl(server, workers, backend):
+        scanner = SEOFrogScanner(str(server.make_url('/')))
+        scanner.config['analysis_workers'] = workers
+        scanner.config['html_parser'] = backend
+        scanner.init_rate_limiter()
+        scanner.init_concurrency_controller()
+        scanner.init_analysis_executor()
+        pool_used = scanner.analysis_executor is not None
+        try:
+            async with aiohttp.ClientSession() as session:
+                for path in PAGES:
+                    url = scanner.normalize_url(str(server.make_url(path)))
+                    await scanner.process_url(session, None, url, 1, scanner.start_url)
+        finally:
+            scanner.shutdown_analysis_executor()
+        # Время ответа зависит от запуска, остальные поля должны совпасть
+        pages = {url: asdict(data) for url, data in scanner.pages_data.items()}
+        for data in pages.values():
+            data.pop('response_time')
+        return pages, pool_used
+
+    async def run():
+        server = await start_server()
+        try:
+            return [(backend, await crawl(server, 1, backend), await crawl(server, 0, backend)) for backend in backends()]
+        finally:
+            await server.close()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            results = asyncio.run(run())
+        finally:
+            os.chdir(cwd)
+
+    for backend, (pooled, pool_used), (local, local_pool_used) in results:
+        assert (pool_used, local_pool_used) == (True, False)
+        assert len(pooled) == len(PAGES)
+        assert pooled == local, backend
+        assert {data['title'] for data in pooled.values()} == {"Памятники из гранита"}
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка разбора HTML в пуле процессов")
+    print("=" * 50)
+    for test in (test_worker_result_matches_in_process, test_scanner_with_process_pool_matches_in_process):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки журнала автосохранения
+"""
+
+import asyncio
+import os
+import tempfile
+
+from crawl_store import AutosaveLog
+from seo_scanner import PageSEOData, SEOFrogScanner
+
+
+def test_records_are_appended():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'autosave.jsonl')
+        log = AutosaveLog(path, reset=True)
+        assert log.append([('page', '/a', {'title': 'Страница A'})]) == 1
+        assert log.append([
+            ('not_found', '/b', {'url': '/b', 'source': '/a'}),
+            ('page', '/a', {'title': 'Страница A, версия 2'}),
+        ]) == 2
+        log.close()
+
+        # Повторное открытие без reset дописывает в конец
+        log = AutosaveLog(path)
+        log.append([('page', '/c', {'title': 'C'})])
+        log.close()
+
+        assert list(AutosaveLog.iter_records(path)) == [
+            ('page', '/a', {'title': 'Страница A'}),
+            ('not_found', '/b', {'url': '/b', 'source': '/a'}),
+            ('page', '/a', {'title': 'Страница A, версия 2'}),
+            ('page', '/c', {'title': 'C'}),
+        ]
+
+
+def test_truncated_last_line_is_skipped():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'autosave.jsonl')
+        log = AutosaveLog(path, reset=True)
+        log.append([('page', '/a', {'title': 'A'})])
+        log.close()
+        # Аварийное завершение посреди записи
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "page", "url": "/b", "da')
+
+        assert list(AutosaveLog.iter_records(path)) == [('page', '/a', {'title': 'A'})]
+
+
+def test_export_autosave_writes_full_report_set():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            # Сканирование прервалось после автосохранения, итоговых отчетов нет
+            scanner = SEOFrogScanner("https://example.com/")
+            scanner.save_interval = 10 ** 9
+            scanner.autosave_log = AutosaveLog(scanner.config['autosave_file'], reset=True)
+            home = scanner.url_table.intern("https://example.com/")
+            for path in ('', 'catalog', 'catalog/item'):
+                url = f"https://example.com/{path}"
+                page = PageSEOData(url=url, status_code=200, content_type="text/html",
+                                   title=f"Страница {path}", content_hash=f"hash-{path}", outlinks=(home,))
+                asyncio.run(scanner.add_page(url, page))
+            scanner.not_found_urls.append({'url': "https://example.com/old", 'source': "https://example.com/"})
+            scanner.write_autosave()
+            scanner.autosave_log.close()
+            scanner.close()
+
+            restored = SEOFrogScanner("https://example.com/")
+            files = asyncio.run(restored.export_autosave())
+            restored.close()
+            created = sorted(os.listdir('.'))
+        finally:
+            os.chdir(cwd)
+
+    # Тот же набор, что после завершенного сканирования, включая структуру сайта и sitemap
+    extension = restored.config['report_format']
+    expected = [f"seo_отчет_{name}.{extension}" for name in
+                ('основной', 'pagerank', 'внутренние_ссылки', 'ошибки', 'структура_сайта')]
+    sitemaps = [name for name in files if name.startswith('sitemap')]
+    assert sorted(set(files) - set(sitemaps)) == sorted(expected)
+    assert restored.config['sitemap_file'] in sitemaps
+    assert set(files) <= set(created)
+    assert not [name for name in created if '_autosave_' in name]
+    assert len(restored.pages_data) == 3
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка журнала автосохранения")
+    print("=" * 50)
+    for test in (test_records_are_appended, test_truncated_last_line_is_skipped,
+                 test_export_autosave_writes_full_report_set):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки контрольных точек и продолжения сканирования
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from crawl_scheduler import SpillingFrontier
+from crawl_store import CrawlCheckpoint
+from seo_scanner import PageSEOData, SEOFrogScanner
+
+START = "https://example.com/"
+
+
+def test_checkpoint_appends_deltas():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'checkpoint.db')
+        checkpoint = CrawlCheckpoint(path)
+        checkpoint.reset()
+        not_found = {'url': '/x', 'source': '/a'}
+        redirect = {'from': '/r', 'to': '/b', 'chain': '301 -> 200'}
+
+        checkpoint.save([('/a', 0, 1, None), ('/b', 1, 2, '/a')], [], [], [('not_found', '/x', not_found)],
+                        {'start_url': START, 'frontier_seq': 2})
+        checkpoint.save([], ['/a'], [('/a', {'outlinks': ['/b']})], [('redirect', '/r', redirect)],
+                        {'start_url': START, 'frontier_seq': 2})
+        checkpoint.close()
+
+        checkpoint = CrawlCheckpoint(path)
+        assert checkpoint.load_frontier() == [(1, 2, '/b', '/a')]
+        assert list(checkpoint.iter_visited()) == ['/a']
+        assert list(checkpoint.iter_pages()) == [('/a', {'outlinks': ['/b']})]
+        assert list(checkpoint.iter_records()) == [('not_found', '/x', not_found), ('redirect', '/r', redirect)]
+        assert checkpoint.load_meta() == {'start_url': START, 'frontier_seq': 2}
+        checkpoint.close()
+
+        # Ошибки дописываются по одной строке, граф ссылок отдельно не хранится
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM records").fetchone()[0] == 2
+            tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert 'links' not in tables
+
+
+def make_page(url, outlinks):
+    return PageSEOData(url=url, status_code=200, content_type="text/html", title=url, outlinks=outlinks)
+
+
+def new_scanner(tmp, resume=False):
+    scanner = SEOFrogScanner(START)
+    scanner.resume = resume
+    scanner.checkpoint = CrawlCheckpoint(os.path.join(tmp, 'checkpoint.db'))
+    scanner.frontier = SpillingFrontier(spill_dir=os.path.join(tmp, 'frontier'))
+    return scanner
+
+
+def test_resume_restores_crawl_state():
+    async def crawl(scanner):
+        scanner.checkpoint.reset()
+        scanner.enqueue_url(START, 0)
+        # Начальная страница загружена, ее ссылки в очереди
+        scanner.visited_urls.add(START)
+        await scanner.add_page(START, make_page(START, [START + "a", START + "b"]))
+        scanner.enqueue_url(START + "a", 1, START)
+        scanner.enqueue_url(START + "b", 1, START)
+        scanner.checkpoint_done.append(START)
+        # Страница a загружена, ее ссылка ведет на 404
+        scanner.visited_urls.add(START + "a")
+        await scanner.add_page(START + "a", make_page(START + "a", [START, START + "missing"]))
+        scanner.not_found_urls.append({'url': START + "missing", 'source': START + "a"})
+        scanner.error_sources[START + "missing"].append(START + "a")
+        scanner.blocked_urls.append({'url': START + "hidden", 'x_robots_tag': 'none', 'source': START + "a"})
+        scanner.checkpoint_done.append(START + "a")
+        scanner.save_checkpoint()
+        # Сбой: изменения после контрольной точки теряются
+        scanner.error_urls.append({'url': START + "lost", 'status': 500, 'source': START})
+        scanner.checkpoint.close()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            first = new_scanner(tmp)
+            asyncio.run(crawl(first))
+
+            resumed = new_scanner(tmp, resume=True)
+            frontier_rows = resumed.load_checkpoint()
+            assert [url for _, _, url, _ in frontier_rows] == [START + "b"]
+            assert START in resumed.visited_urls and START + "a" in resumed.visited_urls
+            assert list(resumed.pages_data) == [START, START + "a"]
+            assert {url: page.internal_links_count for url, page in resumed.pages_data.items()} == \
+                {url: page.internal_links_count for url, page in first.pages_data.items()}
+            assert resumed.not_found_urls == first.not_found_urls
+            assert resumed.error_urls == []
+            assert resumed.blocked_urls == first.blocked_urls
+            assert dict(resumed.error_sources) == {START + "missing": [START + "a"]}
+            assert resumed.frontier_seq == first.frontier_seq
+
+            # Следующая контрольная точка не повторяет восстановленные записи
+            resumed.save_checkpoint()
+            assert len(list(resumed.checkpoint.iter_records())) == 2
+            resumed.checkpoint.close()
+            first.frontier.close()
+            resumed.frontier.close()
+        finally:
+            os.chdir(cwd)
+
+
+def test_resume_keeps_url_ids():
+    async def crawl(scanner):
+        scanner.checkpoint.reset()
+        scanner.enqueue_url(START, 0)
+        scanner.visited_urls.add(START)
+        # Ссылки получают id в порядке обнаружения, а не загрузки
+        await scanner.add_page(START, make_page(START, [START + "c", START + "a"]))
+        scanner.enqueue_url(START + "c", 1, START)
+        scanner.enqueue_url(START + "a", 1, START)
+        scanner.checkpoint_done.append(START)
+        scanner.visited_urls.add(START + "a")
+        await scanner.add_page(START + "a", make_page(START + "a", [START + "b", START]))
+        scanner.checkpoint_done.append(START + "a")
+        scanner.save_checkpoint()
+        scanner.checkpoint.close()
+
+    cwd = os.getcwd()
+    for store in ('memory', 'disk'):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                first = new_scanner(tmp)
+                first.config['visited_store'] = store
+                first.init_url_sets()
+                asyncio.run(crawl(first))
+                urls = list(first.url_table.iter_from(0))
+                edges = list(first.internal_links_graph.edges())
+                first.close()
+                first.frontier.close()
+                assert urls == [START, START + "c", START + "a", START + "b"]
+
+                resumed = new_scanner(tmp, resume=True)
+                resumed.config['visited_store'] = store
+                resumed.init_url_sets()
+                resumed.load_checkpoint()
+                assert list(resumed.url_table.iter_from(0)) == urls
+                assert list(resumed.internal_links_graph.edges()) == edges
+
+                # Новые URL продолжают нумерацию, в контрольную точку пишутся только они
+                resumed.url_table.id_of(START + "d")
+                resumed.save_checkpoint()
+                assert list(resumed.checkpoint.iter_urls()) == urls + [START + "d"]
+                resumed.checkpoint.close()
+                resumed.close()
+                resumed.frontier.close()
+            finally:
+                os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка контрольных точек сканирования")
+    print("=" * 50)
+    for test in (test_checkpoint_appends_deltas, test_resume_restores_crawl_state, test_resume_keeps_url_ids):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки очереди сканирования со сбросом на диск
+"""
+
+import asyncio
+import os
+import tempfile
+
+from crawl_scheduler import SpillingFrontier
+
+
+def test_spilled_items_keep_depth_order():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            frontier = SpillingFrontier(spill_dir=tmp, memory_limit=4, spill_limit=0, segment_size=5)
+            items = [(depth, seq, f"https://example.com/{depth}/{seq}", None)
+                     for seq, depth in enumerate([2, 1, 3, 1, 2, 0, 3, 1, 2, 1, 0, 2, 3, 1])]
+            for item in items:
+                frontier.put_nowait(item)
+            # В памяти не больше memory_limit элементов, остальное на диске
+            assert len(frontier.heap) == 4
+            assert frontier.qsize() == len(items)
+            assert os.listdir(tmp)
+
+            result = []
+            while not frontier.empty():
+                result.append(await frontier.get())
+                frontier.task_done()
+            await asyncio.wait_for(frontier.join(), 1)
+
+            # Внутри глубины сохраняется порядок постановки в очередь
+            assert [item[0] for item in result] == sorted(item[0] for item in items)
+            for depth in range(4):
+                seqs = [item[1] for item in result if item[0] == depth]
+                assert seqs == sorted(seqs)
+
+            frontier.close()
+            assert not os.listdir(tmp)
+
+    asyncio.run(run())
+
+
+def test_producers_wait_for_room_without_deadlock():
+    async def run():
+        frontier = SpillingFrontier(memory_limit=3, spill_limit=5, producers=4)
+        frontier.put_nowait((0, 0, "https://example.com/", None))
+        processed = []
+        seq = 0
+
+        async def worker():
+            nonlocal seq
+            while True:
+                await frontier.wait_for_room()
+                depth, _, url, _ = await frontier.get()
+                processed.append(url)
+                await asyncio.sleep(0)
+                if len(processed) < 100:
+                    for _ in range(5):
+                        seq += 1
+                        frontier.put_nowait((depth + 1, seq, f"https://example.com/{seq}", url))
+                frontier.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(4)]
+        await asyncio.wait_for(frontier.join(), 10)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        frontier.close()
+        assert len(processed) == seq + 1
+
+    asyncio.run(run())
+
+
+def test_spill_dir_created_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Каталог создается при создании очереди, а не при каждом сбросе
+        spill_dir = os.path.join(tmp, 'frontier', 'segments')
+        frontier = SpillingFrontier(spill_dir=spill_dir, memory_limit=1, spill_limit=0)
+        assert os.path.isdir(spill_dir)
+        for seq in range(3):
+            frontier.put_nowait((0, seq, f"https://example.com/{seq}", None))
+        assert len(os.listdir(spill_dir)) == 1
+        frontier.close()
+        assert os.path.isdir(spill_dir)
+
+    # Временный каталог удаляется при закрытии и создается заново при следующем сбросе
+    frontier = SpillingFrontier(memory_limit=1, spill_limit=0)
+    for seq in range(2):
+        frontier.put_nowait((0, seq, f"https://example.com/{seq}", None))
+    first_dir = frontier.spill_dir
+    frontier.close()
+    assert not os.path.exists(first_dir)
+    for seq in range(2, 4):
+        frontier.put_nowait((0, seq, f"https://example.com/{seq}", None))
+    assert os.path.isdir(frontier.spill_dir)
+    frontier.close()
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка очереди сканирования")
+    print("=" * 50)
+    for test in (test_spilled_items_keep_depth_order, test_producers_wait_for_room_without_deadlock,
+                 test_spill_dir_created_once):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки очереди сканирования и пула воркеров на локальном сайте
+"""
+
+import asyncio
+import io
+import os
+import tempfile
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from rich.console import Console
+from rich.live import Live
+
+from crawl_scheduler import SpillingFrontier
+from seo_scanner import SEOFrogScanner
+
+# Путь -> ссылки страницы; /shared находят сразу три страницы первого уровня
+SITE = {
+    '/': ['/a', '/b', '/c', 'https://other.example.org/'],
+    '/a': ['/shared', '/a1', '/'],
+    '/b': ['/shared', '/b1', '/a'],
+    '/c': ['/shared', '/c1'],
+    '/shared': ['/', '/shared/deep'],
+    '/a1': [],
+    '/b1': [],
+    '/c1': [],
+    '/shared/deep': ['/a1'],
+}
+DEPTHS = {'/': 0, '/a': 1, '/b': 1, '/c': 1, '/shared': 2, '/a1': 2, '/b1': 2, '/c1': 2, '/shared/deep': 3}
+
+
+def crawl(concurrency):
+    """Сканирует сайт через scan_site, возвращает сканер, запросы и активных воркеров после завершения"""
+    requests = []
+    active = {'now': 0, 'max': 0}
+
+    async def handler(request):
+        requests.append(request.path)
+        active['now'] += 1
+        active['max'] = max(active['max'], active['now'])
+        try:
+            # Задержка, чтобы страницы одного уровня загружались одновременно
+            await asyncio.sleep(0.02)
+            links = ''.join(f'<a href="{href}">{href}</a>' for href in SITE[request.path])
+            return web.Response(text=f"<html><title>{request.path}</title><body>{links}</body></html>",
+                                content_type='text/html')
+        finally:
+            active['now'] -= 1
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/{name:.*}', handler)
+        server = TestServer(app, host='localhost')
+        await server.start_server()
+        try:
+            scanner = SEOFrogScanner(str(server.make_url('/')))
+            scanner.config.update({
+                'adaptive_concurrency': False,
+                'concurrency': concurrency,
+                'host_requests_per_second': 0,
+                'analysis_workers': 0,
+                'checkpoint_interval': 0,
+                'incremental_recrawl': False,
+                'live_pagerank_interval': 0,
+            })
+            live = Live(console=Console(file=io.StringIO()))
+            async with aiohttp.ClientSession() as session:
+                await asyncio.wait_for(scanner.scan_site(session, live), 10)
+            workers = [task for task in asyncio.all_tasks() if 'crawl_worker' in repr(task.get_coro())]
+            return scanner, workers
+        finally:
+            await server.close()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            scanner, workers = asyncio.run(run())
+            scanner.close()
+        finally:
+            os.chdir(cwd)
+    return scanner, requests, active['max'], workers
+
+
+def test_enqueue_url_filters():
+    async def run():
+        scanner = SEOFrogScanner("https://example.com/")
+        scanner.init_url_sets()
+        scanner.frontier = SpillingFrontier()
+        scanner.config['max_depth'] = 2
+        assert scanner.enqueue_url("https://example.com/a", 1)
+        # Один URL в разном написании планируется один раз
+        assert not scanner.enqueue_url("https://example.com/a/", 2)
+        assert not scanner.enqueue_url("https://example.com/b", 3)
+        assert not scanner.enqueue_url("https://blog.example.com/", 1)
+        scanner.visited_urls.add(scanner.normalize_url("https://example.com/c"))
+        assert not scanner.enqueue_url("https://example.com/c", 1)
+        assert scanner.enqueue_url("https://www.example.com/d", 2, "https://example.com/a")
+
+        items = [await scanner.frontier.get() for _ in range(scanner.frontier.qsize())]
+        assert [(depth, url, source) for depth, _, url, source in items] == [
+            (1, scanner.normalize_url("https://example.com/a"), None),
+            (2, scanner.normalize_url("https://www.example.com/d"), "https://example.com/a"),
+        ]
+        scanner.frontier.close()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            asyncio.run(run())
+        finally:
+            os.chdir(cwd)
+
+
+def test_single_worker_crawls_breadth_first():
+    scanner, requests, max_active, workers = crawl(concurrency=1)
+    assert max_active == 1
+    # Каждый уровень загружается целиком до следующего
+    depths = [DEPTHS[path] for path in requests]
+    assert depths == sorted(depths)
+    assert Counter(requests) == Counter(list(SITE))
+
+
+def test_worker_pool_deduplicates_and_stops():
+    scanner, requests, max_active, workers = crawl(concurrency=4)
+    # Страницы одного уровня загружались одновременно
+    assert max_active > 1
+    # /shared нашли три страницы одновременно, но загружен он один раз; внешние ссылки не сканируются
+    assert Counter(requests) == Counter(list(SITE))
+    assert len(scanner.pages_data) == len(SITE)
+
+    # Ссылки страниц попали в очередь и в граф: /shared/deep найден только через /shared
+    shared = next(data for url, data in scanner.pages_data.items() if url.endswith('/shared'))
+    outlinks = {url.rsplit('/', 1)[1] for url in shared.outlinks}
+    assert 'deep' in outlinks
+
+    # Очередь разобрана, воркеры остановлены
+    assert scanner.frontier.qsize() == 0
+    assert workers == []
+    assert not scanner.in_flight_urls
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка очереди сканирования и пула воркеров")
+    print("=" * 50)
+    for test in (test_enqueue_url_filters, test_single_worker_crawls_breadth_first,
+                 test_worker_pool_deduplicates_and_stops):
+        test()
+        print(f"✅ {test.__name__}")
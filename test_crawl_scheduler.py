@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки планировщика вежливости и регулятора нагрузки на сервер
+"""
+
+import asyncio
+import time
+from urllib.robotparser import RobotFileParser
+
+from crawl_scheduler import AdaptiveConcurrencyController, HostRateLimiter, TokenBucket
+
+
+def timed_acquires(acquire, count):
+    """Время каждого из count последовательных запросов токена от начала"""
+    async def run():
+        start = time.monotonic()
+        times = []
+        for _ in range(count):
+            await acquire()
+            times.append(time.monotonic() - start)
+        return times
+    return asyncio.run(run())
+
+
+def test_token_bucket_refill_and_burst():
+    # Без запаса: запросы идут через 1/rate секунд
+    times = timed_acquires(TokenBucket(rate=20).acquire, 3)
+    assert times[0] < 0.02
+    assert 0.09 <= times[2] < 0.3
+
+    # Запас capacity уходит сразу, дальше снова по скорости
+    times = timed_acquires(TokenBucket(rate=10, capacity=3).acquire, 4)
+    assert times[2] < 0.02
+    assert 0.09 <= times[3] < 0.3
+
+    # rate = 0 - без ограничений
+    assert timed_acquires(TokenBucket(rate=0).acquire, 100)[-1] < 0.05
+
+
+def test_hosts_are_limited_separately():
+    limiter = HostRateLimiter(requests_per_second=5)
+
+    async def run():
+        start = time.monotonic()
+        await limiter.acquire("https://example.com/a")
+        await limiter.acquire("https://www.other.com/a")
+        other_host = time.monotonic() - start
+        await limiter.acquire("https://www.example.com/b")
+        return other_host, time.monotonic() - start
+
+    other_host, same_host = asyncio.run(run())
+    assert other_host < 0.02
+    assert 0.18 <= same_host < 0.5
+    # www. и регистр не создают отдельный хост
+    assert set(limiter.buckets) == {"example.com", "other.com"}
+
+
+def make_robots(*lines):
+    parser = RobotFileParser()
+    parser.parse(["User-agent: *", *lines])
+    return parser
+
+
+def test_robots_can_only_slow_down():
+    limiter = HostRateLimiter(requests_per_second=10)
+    assert limiter.configure_from_robots("https://example.com/", make_robots("Crawl-delay: 2"), "*") == 0.5
+    assert limiter.get_host_rate("example.com") == 0.5
+
+    # Из Crawl-delay и Request-rate берется более строгое ограничение
+    robots = make_robots("Crawl-delay: 2", "Request-rate: 1/5")
+    assert limiter.configure_from_robots("https://www.other.com/", robots, "*") == 0.2
+    assert limiter.get_host_rate("other.com") == 0.2
+
+    # Настройка медленнее robots.txt остается в силе, без директив скорость не меняется
+    slow = HostRateLimiter(requests_per_second=0.1)
+    assert slow.configure_from_robots("https://example.com/", make_robots("Crawl-delay: 2"), "*") == 0.1
+    assert slow.configure_from_robots("https://plain.com/", make_robots("Disallow: /private"), "*") is None
+    assert slow.get_host_rate("plain.com") == 0.1
+
+    # Уже созданная корзина хоста получает новую скорость
+    asyncio.run(limiter.acquire("https://third.com/"))
+    limiter.set_host_rate("www.Third.com", 1)
+    assert limiter.buckets["third.com"].rate == 1
+
+
+def make_controller(initial, min_limit=1, max_limit=8, adaptive=True):
+    return AdaptiveConcurrencyController(initial, min_limit, max_limit, latency_limit=1.0, adaptive=adaptive)
+
+
+def test_additive_increase_once_per_generation():
+    controller = make_controller(2, max_limit=4)
+    controller.record(0.1)
+    assert controller.limit == 2
+    controller.record(0.1)
+    assert controller.limit == 3
+
+    # Следующее решение - только после limit новых ответов
+    for _ in range(3):
+        controller.record(0.1)
+    assert controller.limit == 4
+    for _ in range(8):
+        controller.record(0.1)
+    assert controller.limit == 4
+
+
+def test_multiplicative_decrease_on_errors_and_latency():
+    controller = make_controller(8, min_limit=3)
+    for _ in range(8):
+        controller.record(0.1, failed=True)
+    assert controller.limit == 4
+    # Окно очищено: старые ошибки не снижают лимит повторно
+    assert controller.error_ratio == 0.0
+
+    for _ in range(4):
+        controller.record(5.0)
+    assert controller.limit == 3  # Не ниже min_limit
+
+    fixed = make_controller(4, adaptive=False)
+    for _ in range(8):
+        fixed.record(5.0, failed=True)
+    assert fixed.limit == 4
+
+
+def test_acquire_waits_for_release_or_higher_limit():
+    async def run():
+        controller = make_controller(1, max_limit=3)
+        await controller.acquire()
+        second = asyncio.create_task(controller.acquire())
+        third = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert not second.done() and not third.done()
+
+        # Рост лимита будит ожидающего без освобождения слота
+        controller.record(0.1)
+        await asyncio.wait_for(second, 1)
+        assert controller.limit == 2 and controller.active == 2
+        assert not third.done()
+
+        controller.release()
+        await asyncio.wait_for(third, 1)
+        assert controller.active == 2
+
+        controller.release()
+        controller.release()
+        assert controller.active == 0
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка планировщика вежливости и регулятора нагрузки")
+    print("=" * 50)
+    for test in (test_token_bucket_refill_and_burst, test_hosts_are_limited_separately, test_robots_can_only_slow_down,
+                 test_additive_increase_once_per_generation, test_multiplicative_decrease_on_errors_and_latency,
+                 test_acquire_waits_for_release_or_higher_limit):
+        test()
+        print(f"✅ {test.__name__}")
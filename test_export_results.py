@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки фонового экспорта отчетов по срезу данных
+"""
+
+import asyncio
+import csv
+import os
+import tempfile
+import threading
+import time
+
+from seo_scanner import PageSEOData, SEOFrogScanner
+
+
+def in_tempdir(action):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            return action()
+        finally:
+            os.chdir(cwd)
+
+
+def make_scanner(pages=5):
+    scanner = SEOFrogScanner("https://example.com/")
+    scanner.config['report_format'] = 'csv'
+    scanner.config['calculate_pagerank'] = False
+    scanner.save_interval = 10 ** 9
+    for i in range(pages):
+        asyncio.run(scanner.add_page(*make_page(scanner, i, f"Страница {i}")))
+    return scanner
+
+
+def make_page(scanner, i, title):
+    """URL и данные страницы со ссылкой на главную"""
+    url = f"https://example.com/{i}"
+    outlinks = (scanner.url_table.intern("https://example.com/0"),)
+    return url, PageSEOData(url=url, status_code=200, content_type="text/html", title=title, outlinks=outlinks)
+
+
+def read_report(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_snapshot_is_not_affected_by_later_changes():
+    def run():
+        scanner = make_scanner()
+        snapshot = scanner.take_export_snapshot(is_autosave=True)
+        rows_before = list(scanner.iter_main_rows(snapshot))
+        links_before = list(scanner.iter_internal_link_rows(snapshot))
+
+        # Сканирование продолжается: меняются старые страницы и появляются новые
+        scanner.pages_data["https://example.com/1"].title = "Изменена"
+        asyncio.run(scanner.add_page(*make_page(scanner, 7, "Новая")))
+        scanner.not_found_urls.append({'url': "https://example.com/404", 'source': "https://example.com/0"})
+
+        assert list(scanner.iter_main_rows(snapshot)) == rows_before
+        assert list(scanner.iter_internal_link_rows(snapshot)) == links_before
+        assert list(scanner.iter_error_rows(snapshot)) == []
+        assert [row['Заголовок'] for row in rows_before] == [f"Страница {i}" for i in range(5)]
+
+    in_tempdir(run)
+
+
+def test_background_export_uses_snapshot():
+    def run():
+        scanner = make_scanner()
+        started = threading.Event()
+        release = threading.Event()
+        write_report_file = scanner.write_report_file
+
+        def slow_write_report_file(snapshot, name, iter_rows):
+            started.set()
+            release.wait(5)
+            return write_report_file(snapshot, name, iter_rows)
+
+        scanner.write_report_file = slow_write_report_file
+
+        async def crawl():
+            scanner.export_task = asyncio.create_task(scanner.export_results(is_autosave=True))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            # Пока отчеты пишутся, сканер продолжает менять данные
+            scanner.pages_data["https://example.com/1"].title = "Изменена"
+            await scanner.add_page(*make_page(scanner, 7, "Новая"))
+            release.set()
+            await scanner.export_task
+
+        try:
+            asyncio.run(crawl())
+        finally:
+            scanner.shutdown_export_executor()
+        [report] = [name for name in os.listdir('.') if name.startswith('seo_отчет_основной_autosave_')]
+        assert [row['Заголовок'] for row in read_report(report)] == [f"Страница {i}" for i in range(5)]
+
+    in_tempdir(run)
+
+
+def test_final_export_waits_for_background_export():
+    def run():
+        scanner = make_scanner()
+        events = []
+        write_report_file = scanner.write_report_file
+
+        def recording_write_report_file(snapshot, name, iter_rows):
+            kind = 'autosave' if snapshot.timestamp else 'final'
+            events.append(('start', kind))
+            if kind == 'autosave':
+                time.sleep(0.05)
+            files = write_report_file(snapshot, name, iter_rows)
+            events.append(('end', kind))
+            return files
+
+        scanner.write_report_file = recording_write_report_file
+
+        async def finish():
+            scanner.export_task = asyncio.create_task(scanner.export_results(is_autosave=True))
+            await asyncio.sleep(0)
+            await scanner.export_results()
+            return scanner.export_task.done()
+
+        try:
+            assert asyncio.run(finish())
+        finally:
+            scanner.shutdown_export_executor()
+        # Итоговый экспорт начинается только после всех записей фонового
+        first_final = events.index(('start', 'final'))
+        assert events[:first_final].count(('end', 'autosave')) == events.count(('start', 'autosave')) > 0
+        assert ('start', 'autosave') not in events[first_final:]
+        assert os.path.exists('seo_отчет_основной.csv')
+
+    in_tempdir(run)
+
+
+def test_cancelled_export_does_not_block_event_loop():
+    def run():
+        scanner = make_scanner()
+        release = threading.Event()
+        write_report_file = scanner.write_report_file
+
+        def blocked_write_report_file(snapshot, name, iter_rows):
+            release.wait(5)
+            return write_report_file(snapshot, name, iter_rows)
+
+        scanner.write_report_file = blocked_write_report_file
+
+        async def cancel():
+            task = asyncio.create_task(scanner.export_results(is_autosave=True))
+            await asyncio.sleep(0.05)
+            started = time.monotonic()
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return time.monotonic() - started
+
+        # Потоки записи освобождаются по таймеру, чтобы тест не завис при регрессии
+        timer = threading.Timer(2, release.set)
+        timer.start()
+        try:
+            elapsed = asyncio.run(cancel())
+        finally:
+            release.set()
+            timer.cancel()
+            scanner.shutdown_export_executor()
+        assert elapsed < 1, elapsed
+
+    in_tempdir(run)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка фонового экспорта отчетов")
+    print("=" * 50)
+    for test in (test_snapshot_is_not_affected_by_later_changes, test_background_export_uses_snapshot,
+                 test_final_export_waits_for_background_export, test_cancelled_export_does_not_block_event_loop):
+        test()
+        print(f"✅ {test.__name__}")
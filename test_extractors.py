@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки совпадения потоковых извлекателей HTML с BeautifulSoup
+"""
+
+import random
+from dataclasses import asdict
+
+from html_extractors import EXTRACTORS, analyze_html, etree
+
+# Корректно размеченная страница со всеми данными, которые собирает analyze_page
+WELL_FORMED_PAGE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <title>  Памятники из гранита &amp; мрамора  </title>
+    <meta name="description" content="  Каталог памятников с ценами  ">
+    <meta name="robots" content="index, follow">
+    <meta property="og:title" content="Памятники">
+    <meta property="og:image" content="/og.png">
+    <meta name="twitter:card" content="summary">
+    <link rel="canonical" href="https://example.com/catalog">
+    <link rel="alternate" hreflang="en" href="https://example.com/en/catalog">
+    <link rel="alternate" hreflang="ru" href="https://example.com/catalog">
+    <script type="application/ld+json">{"@type": "Product", "name": "Памятник"}</script>
+    <script>var ignored = "<div>не текст</div>";</script>
+    <style>.a { color: red; }</style>
+</head>
+<body>
+    <nav><ul><li><a href="/">Главная</a></li><li><span>Каталог</span></li></ul></nav>
+    <main>
+        <h1>Памятники <span>из гранита</span></h1>
+        <section>
+            <h2>Вертикальные</h2>
+            <div class="card"><p>Гранитный памятник, 120 см.</p><span>Цена: 15 000 ₽</span></div>
+            <div class="card"><p>Мраморный памятник <!-- скидка --> 100 см.</p></div>
+            <h2>Горизонтальные</h2>
+            <article><p>Плита &laquo;Классика&raquo;</p></article>
+        </section>
+        <img src="/img/1.jpg" alt="Памятник 1" title="Первый">
+        <img src="/img/2.jpg">
+        <img alt="без src">
+        <a href="/catalog/vertikalnye/">Вертикальные</a>
+        <a href=" /catalog/plity ">Плиты</a>
+        <a href="#top">Наверх</a>
+        <a href="mailto:info@example.com">Почта</a>
+        <a href="https://other.example.org/">Внешняя</a>
+        <a>Без href</a>
+    </main>
+</body>
+</html>
+"""
+
+# Разметка с незакрытыми и перепутанными тегами
+MALFORMED_PAGE = """<html><head><title>Незакрытые теги</title></head>
+<body>
+<div><p>Первый абзац<p>Второй абзац</div>
+<span>Текст <b>жирный</span> хвост</b>
+<div><div>Вложенный <span>текст</div> после</div>
+<h1>Заголовок без закрытия
+<template><p>Шаблон</p></template>
+<ruby>漢<rt>kan</rt></ruby>
+<a href="/a">A</a><a href="/b">B
+"""
+
+
+# Ошибки разметки, на которых html.parser и libxml2 строят разные деревья
+BROKEN_TAG_PAGES = {
+    'лишний </br>': "<title>Страница</title><p>раз</br>два</p><p>три</p>",
+    'лишний </img>': "<title>Страница</title><p>раз</img> два <img src='/1.png' alt='один'></img></p>",
+    'незакрытый <title>': "<html><head><title>Без закрытия</head><body><p>текст страницы</p><a href='/y'>y</a>",
+    'незакрытый <textarea>': "<title>Форма</title><body><textarea>поле <b>не</b> текст<p>абзац</p><a href='/z'>z</a>",
+    'тег внутри <title>': "<title><span><b>Вложенный &amp; заголовок</b></span></title><p>текст</p>",
+    'комментарий в <title>': "<title><!-- только комментарий --></title><p>текст</p>",
+}
+
+# Фрагменты для случайной разметки: незакрытые, лишние и перепутанные теги
+MARKUP_PIECES = [
+    "<p>", "</p>", "<br>", "</br>", "<br/>", "</img>", "<img src='/i.png' alt='a'>", "<title>", "</title>",
+    "<textarea>", "</textarea>", "<div>", "</div>", "<span>", "</span>", "<b>", "</b>", "<h1>", "</h1>",
+    "<h2>", "</h2>", "<a href='/l'>", "</a>", "<script>", "</script>", "<nav>", "</nav>", "<!-- c -->",
+    "слово", " ", "текст два", "&amp;", "<meta name='description' content='d'>", "<head>", "</head>",
+    "<body>", "</body>", "<li>", "</li>", "<td>", "</td>", "<template>", "</template>",
+]
+
+
+def assert_same_as_bs4(html: str, backend: str):
+    """Сравнивает результат бэкенда с эталонным путем BeautifulSoup"""
+    expected = asdict(EXTRACTORS['bs4'](html))
+    actual = asdict(EXTRACTORS[backend](html))
+    for field_name, expected_value in expected.items():
+        assert actual[field_name] == expected_value, (
+            f"{backend}: поле {field_name} отличается\n"
+            f"  bs4:  {expected_value!r}\n"
+            f"  {backend}: {actual[field_name]!r}"
+        )
+
+
+def test_nested_text_counted_once():
+    html = "<body><nav><div>Меню сайта</div></nav>" + "<div>" * 50 + "<p>один два</p> три" + "</div>" * 50
+    html += "<script>var x = 'не текст';</script></body>"
+    for backend in EXTRACTORS:
+        if backend == 'lxml' and etree is None:
+            continue
+        # Текст вложенных блоков не дублируется в каждом предке, навигация и скрипты пропускаются
+        assert EXTRACTORS[backend](html).text_content == "один два три", backend
+        page = analyze_html("https://example.com/", html.encode('utf-8'), 'utf-8', backend)
+        assert page.word_count == 3
+        # Хеш контента тот же, что у плоской страницы с тем же текстом
+        flat = analyze_html("https://example.com/", "<p>один два три</p>".encode('utf-8'), 'utf-8', backend)
+        assert page.content_hash == flat.content_hash
+
+
+def test_stdlib_matches_bs4():
+    assert_same_as_bs4(WELL_FORMED_PAGE, 'stdlib')
+
+
+def test_stdlib_matches_bs4_on_malformed_html():
+    assert_same_as_bs4(MALFORMED_PAGE, 'stdlib')
+
+
+def test_stdlib_matches_bs4_on_broken_tags():
+    for name, html in BROKEN_TAG_PAGES.items():
+        assert_same_as_bs4(html, 'stdlib')
+        # Число слов и хеш контента, которые попадают в отчеты, тоже совпадают
+        expected = analyze_html("https://example.com/", html.encode('utf-8'), 'utf-8', 'bs4')
+        actual = analyze_html("https://example.com/", html.encode('utf-8'), 'utf-8', 'stdlib')
+        assert (actual.word_count, actual.content_hash) == (expected.word_count, expected.content_hash), name
+
+
+def test_stdlib_matches_bs4_on_random_markup():
+    rng = random.Random(2024)
+    for _ in range(500):
+        html = ''.join(rng.choice(MARKUP_PIECES) for _ in range(rng.randint(3, 25)))
+        assert_same_as_bs4(html, 'stdlib')
+
+
+def test_lxml_matches_bs4():
+    if etree is None:
+        print("lxml не установлен, пропускаем")
+        return
+    # libxml2 сам исправляет некорректную разметку, поэтому сравниваем только корректную
+    assert_same_as_bs4(WELL_FORMED_PAGE, 'lxml')
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка потоковых извлекателей HTML")
+    print("=" * 50)
+    for test in (test_nested_text_counted_once, test_stdlib_matches_bs4,
+                 test_stdlib_matches_bs4_on_malformed_html, test_stdlib_matches_bs4_on_broken_tags,
+                 test_stdlib_matches_bs4_on_random_markup, test_lxml_matches_bs4):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки поиска почти дубликатов по SimHash
+"""
+
+import os
+import random
+import tempfile
+
+from near_duplicates import SimHashIndex, hamming_distance, simhash
+from seo_scanner import PageSEOData, SEOFrogScanner
+
+random.seed(42)
+VOCABULARY = [f"слово{i}" for i in range(2000)]
+
+
+def product_text(price: str, words=None):
+    """Текст карточки товара, в котором меняется только цена"""
+    words = list(words or [random.choice(VOCABULARY) for _ in range(400)])
+    words[200:202] = ["цена", price]
+    return words
+
+
+def test_price_change_keeps_fingerprint_close():
+    words = product_text("1990")
+    variant = product_text("2490", words)
+    other = product_text("1990")
+
+    assert simhash(words) == simhash(list(words))
+    assert hamming_distance(simhash(words), simhash(variant)) <= 4
+    assert hamming_distance(simhash(words), simhash(other)) > 10
+
+
+def test_index_groups_similar_pages():
+    index = SimHashIndex(max_distance=4)
+    base = product_text("1990")
+    assert index.add("/product-1", simhash(base)) == []
+    assert index.add("/product-1-red", simhash(product_text("2490", base))) == ["/product-1"]
+    assert index.add("/product-2", simhash(product_text("990"))) == []
+    # Точная копия попадает в ту же группу
+    assert index.add("/product-1?utm=1", simhash(base)) == ["/product-1"]
+
+    assert index.clusters() == [["/product-1", "/product-1?utm=1", "/product-1-red"]]
+
+
+def test_duplicates_report_modes():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            scanner = SEOFrogScanner("https://example.com/")
+        finally:
+            os.chdir(cwd)
+
+    base = product_text("1990")
+    pages = {
+        "/product-1": (base, "h1"),
+        "/product-1?utm=1": (base, "h1"),
+        "/product-1-red": (product_text("2490", base), "h2"),
+        # Пустые страницы без текста и отпечатка SimHash
+        "/empty-1": ([], "empty"),
+        "/empty-2": ([], "empty"),
+    }
+    for url, (words, content_hash) in pages.items():
+        fingerprint = f"{simhash(words):016x}" if words else ""
+        page = PageSEOData(url=url, status_code=200, content_type="text/html", content_hash=content_hash,
+                           simhash=fingerprint, word_count=len(words))
+        scanner.pages_data[url] = page
+        scanner.register_content_hash(url, page)
+
+    # По умолчанию - прежний отчет по точному хешу
+    assert scanner.config['duplicates_report_mode'] == 'exact'
+    rows = scanner.take_export_snapshot().duplicates
+    assert {row['URL']: row['Группа дубликатов'] for row in rows} == {
+        "/product-1": 1, "/product-1?utm=1": 1, "/empty-1": 2, "/empty-2": 2
+    }
+
+    # Группы похожих страниц не теряют пустые страницы
+    scanner.config['duplicates_report_mode'] = 'clusters'
+    rows = scanner.take_export_snapshot().duplicates
+    assert {row['URL']: row['Группа дубликатов'] for row in rows} == {
+        "/product-1": 1, "/product-1?utm=1": 1, "/product-1-red": 1, "/empty-1": 2, "/empty-2": 2
+    }
+    assert [row['Точный дубликат'] for row in rows if row['Группа дубликатов'] == 2] == ['Нет', 'Да']
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка поиска почти дубликатов")
+    print("=" * 50)
+    for test in (test_price_change_keeps_fingerprint_close, test_index_groups_similar_pages, test_duplicates_report_modes):
+        test()
+        print(f"✅ {test.__name__}")
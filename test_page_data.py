@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки компактной записи данных страницы
+"""
+
+import copy
+import json
+from dataclasses import asdict
+
+from seo_scanner import PageSEOData, ImageData
+
+
+def test_collections_are_compact_tuples():
+    page = PageSEOData(url="https://example.com/", status_code=200, content_type="text/html")
+    assert not hasattr(page, '__dict__')
+    # Пустые коллекции - общий пустой кортеж
+    empty = tuple()
+    assert page.h1 is empty and page.images is empty and page.open_graph is empty
+
+    page = PageSEOData(
+        url="https://example.com/", status_code=200, content_type="text/html",
+        h1=["Заголовок"], images=[{'src': "/a.png", 'alt': "", 'title': ""}],
+        open_graph={'og:title': "Памятники"}
+    )
+    assert page.h1 == ("Заголовок",)
+    assert page.images == (ImageData("/a.png"),)
+    assert dict(page.open_graph) == {'og:title': "Памятники"}
+
+
+def test_json_round_trip():
+    page = PageSEOData(
+        url="https://example.com/", status_code=200, content_type="text/html",
+        images=[ImageData("/a.png", "alt", "title")], hreflang={'en': "https://example.com/en/"},
+        outlinks=["https://example.com/a"], page_rank=0.5
+    )
+    # Так страница сохраняется в контрольной точке, кэше и журнале автосохранения
+    restored = PageSEOData(**json.loads(json.dumps(asdict(page))))
+    assert restored == page
+    assert copy.copy(page) == page
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка данных страницы")
+    print("=" * 50)
+    for test in (test_collections_are_compact_tuples, test_json_round_trip):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки ограничения размера загружаемой страницы (max_page_bytes)
+"""
+
+import asyncio
+import os
+import tempfile
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from seo_scanner import SEOFrogScanner
+
+MAX_PAGE_BYTES = 4096
+
+
+def make_page(size: int) -> bytes:
+    """HTML-страница ровно из size байт"""
+    page = "<html><head><title>Страница</title></head><body><p>текст</p></body></html>".encode('utf-8')
+    return page + b' ' * (size - len(page))
+
+
+BODIES = {
+    '/big': (make_page(MAX_PAGE_BYTES * 40), 'text/html'),
+    '/exact': (make_page(MAX_PAGE_BYTES), 'text/html'),
+    '/file.pdf': (b'%PDF' + b'0' * MAX_PAGE_BYTES * 40, 'application/pdf'),
+}
+
+
+def crawl(paths):
+    async def handler(request):
+        body, content_type = BODIES[request.path]
+        return web.Response(body=body, content_type=content_type)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/{name:.*}', handler)
+        server = TestServer(app, host='localhost')
+        await server.start_server()
+        try:
+            scanner = SEOFrogScanner(str(server.make_url('/')))
+            scanner.config['max_page_bytes'] = MAX_PAGE_BYTES
+            scanner.init_rate_limiter()
+            scanner.init_concurrency_controller()
+
+            # Запоминаем, для каких ответов читалось тело и сколько байт прочитано
+            reads = {}
+            read_body = scanner.read_body
+
+            async def recording_read_body(response):
+                body, truncated = await read_body(response)
+                reads[response.url.path] = (len(body), truncated)
+                return body, truncated
+
+            scanner.read_body = recording_read_body
+            async with aiohttp.ClientSession() as session:
+                for path in paths:
+                    url = scanner.normalize_url(str(server.make_url(path)))
+                    await scanner.process_url(session, None, url, 1, scanner.start_url)
+            return scanner, reads
+        finally:
+            await server.close()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            return asyncio.run(run())
+        finally:
+            os.chdir(cwd)
+
+
+def page_by_path(scanner, path):
+    return next(data for url, data in scanner.pages_data.items() if url.endswith(path))
+
+
+def test_body_over_limit_is_truncated():
+    scanner, reads = crawl(['/big'])
+    assert reads == {'/big': (MAX_PAGE_BYTES, True)}
+    page = page_by_path(scanner, '/big')
+    assert page.truncated
+    assert page.title == "Страница"
+
+    # Обрезка видна в основном отчете и в списке проблем
+    row = next(scanner.iter_main_rows(scanner.take_export_snapshot()))
+    assert row['Обрезана'] == 'Да'
+    assert f"Страница больше {MAX_PAGE_BYTES} байт (обрезана)" in row['Проблемы']
+
+
+def test_body_at_limit_is_not_truncated():
+    scanner, reads = crawl(['/exact'])
+    assert reads == {'/exact': (MAX_PAGE_BYTES, False)}
+    assert not page_by_path(scanner, '/exact').truncated
+
+    row = next(scanner.iter_main_rows(scanner.take_export_snapshot()))
+    assert row['Обрезана'] == 'Нет'
+    assert "обрезана" not in row['Проблемы']
+
+
+def test_non_html_body_is_not_downloaded():
+    scanner, reads = crawl(['/file.pdf', '/exact'])
+    # Тело читается только у HTML-страниц, PDF в отчет не попадает
+    assert list(reads) == ['/exact']
+    assert [url.rsplit('/', 1)[1] for url in scanner.pages_data] == ['exact']
+
+
+def test_unlimited_body():
+    async def handler(request):
+        return web.Response(body=BODIES['/big'][0], content_type='text/html')
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/{name:.*}', handler)
+        server = TestServer(app, host='localhost')
+        await server.start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(server.make_url('/big')) as response:
+                    return await scanner.read_body(response)
+        finally:
+            await server.close()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            scanner = SEOFrogScanner("http://localhost/")
+            scanner.config['max_page_bytes'] = 0
+            body, truncated = asyncio.run(run())
+        finally:
+            os.chdir(cwd)
+    # 0 - без ограничений
+    assert (body, truncated) == (BODIES['/big'][0], False)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка ограничения размера страницы")
+    print("=" * 50)
+    for test in (test_body_over_limit_is_truncated, test_body_at_limit_is_not_truncated,
+                 test_non_html_body_is_not_downloaded, test_unlimited_body):
+        test()
+        print(f"✅ {test.__name__}")
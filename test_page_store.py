@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки хранилища страниц в SQLite
+"""
+
+import os
+import sqlite3
+import tempfile
+from dataclasses import asdict
+
+from page_store import PageStore
+from seo_scanner import PageSEOData, SEOFrogScanner, page_from_record
+
+
+def make_page(i):
+    return PageSEOData(url=f"https://example.com/{i}", status_code=200, content_type="text/html", title=f"Страница {i}")
+
+
+def test_eviction_keeps_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(os.path.join(tmp, 'pages.db'), page_from_record, cache_size=2, commit_every=2)
+        for i in range(5):
+            store[f"/{i}"] = make_page(i)
+        assert len(store) == 5 and len(store.cache) == 2
+
+        # Изменение объекта из кэша переживает вытеснение
+        store["/0"].internal_links_count = 7
+        for i in range(1, 5):
+            store[f"/{i}"]
+        assert "/0" not in store.cache
+        assert store["/0"].internal_links_count == 7
+
+        # Повторное присваивание не меняет порядок и число страниц
+        store["/3"] = make_page(33)
+        assert len(store) == 5
+        assert list(store) == [f"/{i}" for i in range(5)]
+        assert [page.title for page in store.values()][3] == "Страница 33"
+        assert "/9" not in store and store.get("/9") is None
+        store.close()
+
+
+def test_snapshot_and_queryable_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pages.db')
+        store = PageStore(path, page_from_record, cache_size=3)
+        for i in range(10):
+            page = make_page(i)
+            page.page_rank = i / 10
+            store[f"/{i}"] = page
+
+        snapshot = store.snapshot()
+        store["/0"].title = "Изменена после среза"
+        assert len(snapshot) == 10
+        assert snapshot["/0"].title == "Страница 0"
+        assert [url for url, _ in snapshot.items()] == list(store)
+        assert snapshot["/5"] == store["/5"]
+        snapshot.close()
+        assert not os.path.exists(snapshot.path)
+        store.close()
+
+        # После сканирования файл - обычная база SQLite
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute("SELECT url FROM pages WHERE page_rank >= 0.5 ORDER BY page_rank DESC").fetchall()
+        assert [url for (url,) in rows] == ["/9", "/8", "/7", "/6", "/5"]
+
+
+def test_iteration_follows_insertion_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(os.path.join(tmp, 'pages.db'), page_from_record, cache_size=2, commit_every=2)
+        queries = []
+        for i in range(6):
+            # Новый URL не проверяется запросом к базе
+            store.conn.set_trace_callback(queries.append)
+            store[f"/{i}"] = make_page(i)
+            store.conn.set_trace_callback(None)
+            # Повторное чтение и изменение меняют порядок вытеснения, но не порядок обхода
+            store["/0"]
+            if i == 3:
+                store["/2"].title = "Изменена"
+                store["/1"] = make_page(11)
+        assert not [query for query in queries if query.startswith("SELECT")]
+        assert len(store) == 6
+
+        expected = [f"/{i}" for i in range(6)]
+        assert list(store) == expected
+        assert [page.title for page in store.values()] == \
+            ["Страница 0", "Страница 11", "Изменена", "Страница 3", "Страница 4", "Страница 5"]
+        snapshot = store.snapshot()
+        assert list(snapshot) == expected
+        snapshot.close()
+
+        # Страница, вытесненная на диск, сохраняет свое место при повторном присваивании
+        store["/4"] = make_page(44)
+        assert list(store) == expected and len(store) == 6
+        store.close()
+
+
+def test_pages_stay_readable_until_close():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            scanner = SEOFrogScanner("https://example.com/")
+            scanner.config['page_store'] = 'disk'
+            scanner.config['page_cache_size'] = 2
+            scanner.init_page_store()
+            for i in range(5):
+                scanner.restore_page(f"https://example.com/{i}", asdict(make_page(i)))
+
+            # Как и в режиме 'memory', данные доступны после сканирования
+            assert scanner.pages_data["https://example.com/0"].title == "Страница 0"
+            assert len(list(scanner.pages_data.values())) == 5
+
+            scanner.close()
+            scanner.close()
+            try:
+                scanner.pages_data["https://example.com/0"]
+                assert False, "закрытое хранилище должно отказывать"
+            except RuntimeError as e:
+                assert "закрыто" in str(e)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка хранилища страниц")
+    print("=" * 50)
+    for test in (test_eviction_keeps_changes, test_snapshot_and_queryable_file, test_iteration_follows_insertion_order,
+                 test_pages_stay_readable_until_close):
+        test()
+        print(f"✅ {test.__name__}")
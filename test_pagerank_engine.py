@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки разреженного расчета PageRank
+"""
+
+import os
+import random
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+from pagerank import build_csr, power_iteration, CsrGraphWriter, open_csr_graph, read_graph_urls
+from seo_scanner import PageSEOData, SEOFrogScanner
+
+# Страница 3 без исходящих ссылок, у страницы 1 повторная ссылка
+ADJACENCY = [[1, 2], [2, 2], [0], [], [2, 3]]
+
+
+def reference_pagerank(adjacency, damping, iterations=1000):
+    """Плотный расчет по определению, с равномерным распределением ранга висячих страниц"""
+    n = len(adjacency)
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        new_ranks = np.full(n, (1 - damping) / n)
+        for source, links in enumerate(adjacency):
+            links = set(links)
+            if links:
+                for target in links:
+                    new_ranks[target] += damping * ranks[source] / len(links)
+            else:
+                new_ranks += damping * ranks[source] / n
+        ranks = new_ranks
+    return ranks
+
+
+def test_matches_dense_reference():
+    offsets, targets = build_csr(ADJACENCY, len(ADJACENCY))
+    assert offsets.tolist() == [0, 2, 3, 4, 4, 6]
+
+    result = power_iteration(offsets, targets, damping=0.85, max_iterations=1000, tolerance=1e-12)
+    assert result.converged
+    assert abs(result.ranks.sum() - 1.0) < 1e-9
+    assert np.allclose(result.ranks, reference_pagerank(ADJACENCY, 0.85), atol=1e-9)
+
+
+def test_stops_at_max_iterations():
+    offsets, targets = build_csr(ADJACENCY, len(ADJACENCY))
+    result = power_iteration(offsets, targets, max_iterations=3, tolerance=0)
+    assert result.iterations == 3
+    assert not result.converged
+
+
+def test_memmapped_graph_in_blocks():
+    offsets, targets = build_csr(ADJACENCY, len(ADJACENCY))
+    expected = power_iteration(offsets, targets, tolerance=1e-12, max_iterations=1000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        graph_dir = os.path.join(tmp, 'graph')
+        writer = CsrGraphWriter(graph_dir)
+        for node in range(len(ADJACENCY)):
+            writer.add_node(f"https://example.com/{node}", targets[offsets[node]:offsets[node + 1]])
+        writer.close()
+
+        disk_offsets, disk_targets = open_csr_graph(graph_dir)
+        assert read_graph_urls(graph_dir) == [f"https://example.com/{node}" for node in range(len(ADJACENCY))]
+        assert isinstance(disk_targets, np.memmap)
+
+        # Блоки по одному ребру - результат тот же, что и за один проход
+        result = power_iteration(disk_offsets, disk_targets, tolerance=1e-12, max_iterations=1000, block_edges=1)
+        assert np.allclose(result.ranks, expected.ranks, atol=1e-12)
+        del disk_offsets, disk_targets
+
+
+def add_linked_pages(scanner, start, count, links, rng):
+    """Добавляет страницы start..start+count со ссылками на случайные страницы сайта"""
+    urls = [f"https://example.com/{i}" for i in range(start + count)]
+    for url in urls[start:]:
+        outlinks = [urls[rng.randrange(len(urls))] for _ in range(links)]
+        scanner.pages_data[url] = PageSEOData(url=url, status_code=200, content_type="text/html", outlinks=outlinks)
+        scanner.page_ids.add(url)
+        scanner.link_page(url, scanner.pages_data[url])
+
+
+def make_linked_scanner(graph_dir, pages=1000, links=300):
+    """Сканер с готовым графом ссылок: pages страниц по links случайных ссылок"""
+    scanner = SEOFrogScanner("https://example.com/")
+    scanner.config['pagerank_graph_dir'] = graph_dir
+    scanner.config['pagerank_block_edges'] = 10_000
+    add_linked_pages(scanner, 0, pages, links, random.Random(5))
+    return scanner
+
+
+def peak_bytes(action):
+    tracemalloc.start()
+    try:
+        result = action()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_disk_graph_keeps_edges_out_of_memory():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            # По умолчанию граф считается в памяти и в рабочий каталог ничего не пишется
+            memory = make_linked_scanner(None)
+            assert memory.config['pagerank_graph_dir'] is None
+            edges = len(memory.internal_links_graph)
+            memory_ranks, memory_peak = peak_bytes(memory.calculate_internal_pagerank)
+            assert 'seo_link_graph' not in os.listdir(tmp)
+
+            graph_dir = os.path.join(tmp, 'graph')
+            disk = make_linked_scanner(graph_dir)
+            disk_ranks, disk_peak = peak_bytes(disk.calculate_internal_pagerank)
+            assert all(abs(disk_ranks[url] - rank) < 1e-9 for url, rank in memory_ranks.items())
+
+            # Копия ребер в памяти - минимум 4 байта на ребро; с каталогом графа ее нет,
+            # остаются только данные по страницам (у среза - копии страниц)
+            assert memory_peak > 4 * edges
+            assert disk_peak < edges
+            snapshot, snapshot_peak = peak_bytes(disk.take_export_snapshot)
+            assert snapshot_peak < 2 * edges
+            assert isinstance(snapshot.link_targets, np.memmap) and len(snapshot.link_targets) == edges
+            assert sorted(os.listdir(graph_dir)) == ['export-1.bin', 'offsets.npy', 'targets.bin', 'urls.txt']
+            del snapshot
+            disk.close()
+            memory.close()
+        finally:
+            os.chdir(cwd)
+
+
+def run_live_pagerank(scanner):
+    """Запускает фоновый расчет и дожидается его, не применяя результат"""
+    scanner.schedule_live_pagerank()
+    scanner.live_pagerank_future.result()
+
+
+def test_live_pagerank_warm_start():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for graph_dir in (None, os.path.join(tmp, 'graph')):
+                rng = random.Random(11)
+                warm = SEOFrogScanner("https://example.com/")
+                warm.config.update(pagerank_graph_dir=graph_dir, live_pagerank_interval=10, pagerank_tolerance=1e-12)
+                add_linked_pages(warm, 0, 40, 6, rng)
+                run_live_pagerank(warm)
+                snapshot_urls = list(warm.pages_data)
+
+                # Пока шел фоновый расчет, сайт вырос
+                add_linked_pages(warm, 40, 10, 6, rng)
+                new_urls = list(warm.pages_data)[40:]
+                warm.schedule_live_pagerank()
+                # Результат применен к страницам снимка, новые страницы его не получили
+                assert all(warm.pages_data[url].page_rank != 1.0 for url in snapshot_urls)
+                assert all(warm.pages_data[url].page_rank == 1.0 for url in new_urls)
+                assert warm.top_pagerank_pages[0] in snapshot_urls
+                warm.live_pagerank_future.result()
+                warm.apply_live_pagerank()
+
+                # Новым страницам достается средний ранг известных
+                add_linked_pages(warm, 50, 5, 6, rng)
+                page_ids, _ = warm.get_page_positions(list(warm.pages_data))
+                initial = warm.get_warm_start(page_ids)
+                known = warm.pagerank_by_id[page_ids[:50]]
+                assert np.allclose(initial[50:], known.mean())
+                assert np.array_equal(initial[:50], known)
+
+                # Итоговый расчет с прошлого вектора сходится к тем же рангам, что и с нуля
+                cold = SEOFrogScanner("https://example.com/")
+                cold.config.update(pagerank_graph_dir=graph_dir, pagerank_tolerance=1e-12)
+                rng = random.Random(11)
+                add_linked_pages(cold, 0, 40, 6, rng)
+                add_linked_pages(cold, 40, 10, 6, rng)
+                add_linked_pages(cold, 50, 5, 6, rng)
+                warm_ranks = warm.calculate_internal_pagerank()
+                cold_ranks = cold.calculate_internal_pagerank()
+                assert warm_ranks.keys() == cold_ranks.keys()
+                assert all(abs(warm_ranks[url] - rank) < 1e-8 for url, rank in cold_ranks.items())
+                warm.close()
+                cold.close()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка расчета PageRank")
+    print("=" * 50)
+    for test in (test_matches_dense_reference, test_stops_at_max_iterations, test_memmapped_graph_in_blocks,
+                 test_disk_graph_keeps_edges_out_of_memory, test_live_pagerank_warm_start):
+        test()
+        print(f"✅ {test.__name__}")
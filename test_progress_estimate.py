@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки оценки общего количества URL по счетчикам очереди
+"""
+
+import asyncio
+import os
+import tempfile
+
+from crawl_scheduler import SpillingFrontier
+from seo_scanner import PageSEOData, SEOFrogScanner
+
+
+def make_scanner(frontier):
+    scanner = SEOFrogScanner("https://example.com/")
+    scanner.init_url_sets()
+    scanner.frontier = frontier
+    return scanner
+
+
+def drain(scanner, count):
+    """Забирает count URL из очереди так же, как воркер: URL посещен и стал страницей"""
+    async def run():
+        for _ in range(count):
+            _, _, url, _ = await scanner.frontier.get()
+            scanner.visited_urls.add(url)
+            scanner.pages_data[url] = PageSEOData(url=url, status_code=200, content_type="text/html")
+            scanner.frontier.task_done()
+    asyncio.run(run())
+
+
+def progress(scanner):
+    scanner.estimate_total_urls()
+    return {key: scanner.progress_data[key] for key in ('scanned', 'queued', 'discovered', 'found')}
+
+
+def in_tempdir(action):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            return action(tmp)
+        finally:
+            os.chdir(cwd)
+
+
+def test_estimate_without_pages():
+    def run(tmp):
+        scanner = make_scanner(None)
+        # До создания очереди и без страниц - базовая оценка
+        assert progress(scanner) == {'scanned': 0, 'queued': 0, 'discovered': 0, 'found': 0}
+        assert scanner.estimated_total_urls == 100
+
+        scanner.frontier = SpillingFrontier()
+        scanner.enqueue_url(scanner.start_url, 0)
+        assert progress(scanner) == {'scanned': 0, 'queued': 1, 'discovered': 1, 'found': 0}
+        assert scanner.estimated_total_urls == 100
+
+    in_tempdir(run)
+
+
+def test_estimate_with_partly_drained_frontier():
+    def run(tmp):
+        scanner = make_scanner(SpillingFrontier())
+        for i in range(10):
+            scanner.enqueue_url(f"https://example.com/{i}", 1)
+        # Повторно найденный URL не считается дважды
+        scanner.enqueue_url("https://example.com/3", 2)
+
+        drain(scanner, 4)
+        assert progress(scanner) == {'scanned': 4, 'queued': 6, 'discovered': 10, 'found': 4}
+        # Найдено больше чем вдвое против посещенных - запас 1.5
+        assert scanner.estimated_total_urls == 15
+
+        drain(scanner, 4)
+        assert progress(scanner) == {'scanned': 8, 'queued': 2, 'discovered': 10, 'found': 8}
+        # Оценка не уменьшается, когда очередь разбирается
+        assert scanner.estimated_total_urls == 15
+
+        drain(scanner, 2)
+        scanner.enqueue_url("https://example.com/new", 2)
+        assert progress(scanner) == {'scanned': 10, 'queued': 1, 'discovered': 11, 'found': 10}
+        assert scanner.estimated_total_urls == 15
+
+    in_tempdir(run)
+
+
+def test_estimate_counts_spilled_urls():
+    def run(tmp):
+        frontier = SpillingFrontier(spill_dir=os.path.join(tmp, 'spill'), memory_limit=3, spill_limit=0)
+        scanner = make_scanner(frontier)
+        for i in range(80):
+            scanner.enqueue_url(f"https://example.com/{i}", 1)
+        # Большая часть очереди на диске, но счетчики учитывают все URL
+        assert len(frontier.heap) == 3
+        assert progress(scanner) == {'scanned': 0, 'queued': 80, 'discovered': 80, 'found': 0}
+        assert scanner.estimated_total_urls == 100
+
+        drain(scanner, 10)
+        assert progress(scanner) == {'scanned': 10, 'queued': 70, 'discovered': 80, 'found': 10}
+        assert scanner.estimated_total_urls == 120
+
+        drain(scanner, 70)
+        assert progress(scanner) == {'scanned': 80, 'queued': 0, 'discovered': 80, 'found': 80}
+        assert scanner.estimated_total_urls == 120
+        frontier.close()
+
+    in_tempdir(run)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка оценки общего количества URL")
+    print("=" * 50)
+    for test in (test_estimate_without_pages, test_estimate_with_partly_drained_frontier,
+                 test_estimate_counts_spilled_urls):
+        test()
+        print(f"✅ {test.__name__}")
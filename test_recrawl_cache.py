@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки повторного сканирования с условными запросами
+"""
+
+import asyncio
+import os
+import tempfile
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from crawl_store import RecrawlCache
+from seo_scanner import SEOFrogScanner
+
+LAST_MODIFIED = "Sat, 17 Oct 2026 05:00:00 GMT"
+PAGE = """<html><head><title>Главная страница</title><meta name="description" content="Описание"></head>
+<body><h1>Заголовок</h1><p>Текст страницы</p><a href="/about">О нас</a></body></html>"""
+
+
+def test_cache_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.db')
+        cache = RecrawlCache(path, commit_every=2)
+        assert cache.get("/a") is None
+        cache.put("/a", '"v1"', LAST_MODIFIED, "hash", {'title': "Страница"})
+        cache.put("/a", '"v2"', None, "hash2", {'title': "Страница 2"})
+        cache.close()
+
+        cache = RecrawlCache(path)
+        assert cache.get("/a") == {
+            'etag': '"v2"', 'last_modified': None, 'body_hash': "hash2", 'page': {'title': "Страница 2"}
+        }
+        cache.close()
+
+
+def test_conditional_headers():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            scanner = SEOFrogScanner("https://example.com/")
+        finally:
+            os.chdir(cwd)
+    assert scanner.get_conditional_headers(None) is scanner.headers
+
+    headers = scanner.get_conditional_headers({'etag': '"v1"', 'last_modified': LAST_MODIFIED})
+    assert headers['If-None-Match'] == '"v1"'
+    assert headers['If-Modified-Since'] == LAST_MODIFIED
+    assert 'If-None-Match' not in scanner.headers
+
+    headers = scanner.get_conditional_headers({'etag': None, 'last_modified': LAST_MODIFIED})
+    assert 'If-None-Match' not in headers and headers['If-Modified-Since'] == LAST_MODIFIED
+
+
+def crawl_runs(handler, runs):
+    """Сканирует начальную страницу runs раз с общим кэшем, возвращает [(сканер, ссылки)]"""
+    async def crawl(tmp):
+        app = web.Application()
+        app.router.add_get('/{name:.*}', handler)
+        server = TestServer(app, host='localhost')
+        await server.start_server()
+        scanners = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for _ in range(runs):
+                    scanner = SEOFrogScanner(str(server.make_url('/')))
+                    scanner.recrawl_cache = RecrawlCache(os.path.join(tmp, 'cache.db'))
+                    scanner.init_rate_limiter()
+                    scanner.init_concurrency_controller()
+                    links = await scanner.process_url(session, None, scanner.start_url)
+                    scanner.recrawl_cache.close()
+                    scanners.append((scanner, links))
+        finally:
+            await server.close()
+        return scanners
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            return asyncio.run(crawl(tmp))
+        finally:
+            os.chdir(cwd)
+
+
+def test_not_modified_reuses_cached_page():
+    requests = []
+
+    async def handler(request):
+        requests.append(request.headers.copy())
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text=PAGE, content_type='text/html',
+                            headers={'ETag': '"v1"', 'Last-Modified': LAST_MODIFIED})
+
+    (first, first_links), (second, second_links) = crawl_runs(handler, 2)
+
+    # Первый запрос без валидаторов, второй - с сохраненными ETag и Last-Modified
+    assert 'If-None-Match' not in requests[0] and 'If-Modified-Since' not in requests[0]
+    assert requests[1]['If-None-Match'] == '"v1"'
+    assert requests[1]['If-Modified-Since'] == LAST_MODIFIED
+
+    # Ответ 304: страница взята из кэша без повторного анализа
+    assert first.unchanged_pages == 0 and second.unchanged_pages == 1
+    assert second.status_counts[304] == 1
+    url = first.start_url
+    cached, fresh = second.pages_data[url], first.pages_data[url]
+    assert cached.title == fresh.title == "Главная страница"
+    assert cached.outlinks == fresh.outlinks
+    assert second_links == first_links == {first.normalize_url(url + "about")}
+
+
+def test_rotated_validators_are_refreshed():
+    requests = []
+    # Второй ответ - тело то же, но сервер сменил ETag и Last-Modified
+    validators = [('"v1"', LAST_MODIFIED), ('"v2"', "Sun, 18 Oct 2026 05:00:00 GMT")]
+
+    async def handler(request):
+        requests.append(request.headers.copy())
+        if len(requests) > len(validators):
+            if request.headers.get('If-None-Match') == validators[-1][0]:
+                return web.Response(status=304)
+            etag, last_modified = '"v3"', None
+        else:
+            etag, last_modified = validators[len(requests) - 1]
+        return web.Response(text=PAGE, content_type='text/html',
+                            headers={'ETag': etag, 'Last-Modified': last_modified or ''})
+
+    (first, _), (second, _), (third, _) = crawl_runs(handler, 3)
+
+    # Второй запуск: тело то же, но валидаторы новые - их нужно запомнить
+    assert requests[1]['If-None-Match'] == '"v1"'
+    assert second.status_counts[200] == 1 and second.unchanged_pages == 1
+    # Третий запуск спрашивает с новыми валидаторами и получает 304
+    assert requests[2]['If-None-Match'] == '"v2"'
+    assert requests[2]['If-Modified-Since'] == "Sun, 18 Oct 2026 05:00:00 GMT"
+    assert third.status_counts[304] == 1 and third.unchanged_pages == 1
+    assert third.pages_data[third.start_url].title == first.pages_data[first.start_url].title
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка повторного сканирования")
+    print("=" * 50)
+    for test in (test_cache_round_trip, test_conditional_headers, test_not_modified_reuses_cached_page,
+                 test_rotated_validators_are_refreshed):
+        test()
+        print(f"✅ {test.__name__}")
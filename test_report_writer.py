@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки потоковой записи отчетов
+"""
+
+import csv
+import os
+import tempfile
+
+from openpyxl import load_workbook
+
+from report_writer import write_report
+from seo_scanner import SEOFrogScanner
+
+
+def make_rows(count):
+    return ({'URL': f"https://example.com/{i}", 'Номер': i} for i in range(count))
+
+
+def test_xlsx_rolls_over_to_new_sheet():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'report.xlsx')
+        # На листе заголовок и не больше 3 строк данных
+        assert write_report(path, make_rows(7), 'xlsx', max_rows=4) == [path]
+
+        workbook = load_workbook(path, read_only=True)
+        sheets = [list(sheet.values) for sheet in workbook.worksheets]
+        workbook.close()
+        assert [len(rows) for rows in sheets] == [4, 4, 2]
+        assert all(rows[0] == ('URL', 'Номер') for rows in sheets)
+        assert [row[1] for rows in sheets for row in rows[1:]] == list(range(7))
+
+
+def test_csv_rolls_over_to_new_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'report.csv')
+        files = write_report(path, make_rows(5), 'csv', max_rows=3)
+        assert files == [path, os.path.join(tmp, 'report_2.csv'), os.path.join(tmp, 'report_3.csv')]
+
+        numbers = []
+        for name in files:
+            with open(name, encoding='utf-8-sig', newline='') as f:
+                rows = list(csv.reader(f))
+            assert rows[0] == ['URL', 'Номер']
+            numbers.extend(int(row[1]) for row in rows[1:])
+        assert numbers == list(range(5))
+
+
+def test_no_rows_no_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'report.xlsx')
+        assert write_report(path, make_rows(0)) == []
+        assert not os.path.exists(path)
+
+
+def test_autosave_rotation_keeps_split_reports_whole():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            scanner = SEOFrogScanner("https://example.com/")
+            scanner.config['report_format'] = 'csv'
+            timestamps = [f"20261017_05100{i}" for i in range(5)]
+            for timestamp in timestamps:
+                # Каждое автосохранение разбивается на 3 файла
+                write_report(f'seo_отчет_основной_autosave_{timestamp}.csv', make_rows(5), 'csv', max_rows=3)
+                scanner.cleanup_old_autosaves()
+
+            expected = sorted(
+                f'seo_отчет_основной_autosave_{timestamp}{part}.csv'
+                for timestamp in timestamps[-3:] for part in ('', '_2', '_3')
+            )
+            assert sorted(name for name in os.listdir(tmp) if 'autosave' in name) == expected
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка потоковой записи отчетов")
+    print("=" * 50)
+    for test in (test_xlsx_rolls_over_to_new_sheet, test_csv_rolls_over_to_new_file, test_no_rows_no_file,
+                 test_autosave_rotation_keeps_split_reports_whole):
+        test()
+        print(f"✅ {test.__name__}")
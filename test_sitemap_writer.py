@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки потоковой записи sitemap
+"""
+
+import gzip
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+
+from sitemap_writer import SitemapWriter, SITEMAP_NS
+
+NS = {'sm': SITEMAP_NS}
+
+
+def test_split_into_gzip_parts_with_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sitemap.xml')
+        writer = SitemapWriter(path, base_url="https://example.com/", max_urls=2)
+        for i in range(5):
+            writer.add(f"https://example.com/page?id={i}&sort=asc", changefreq="weekly", priority=0.5)
+        files = writer.close()
+
+        parts = [os.path.join(tmp, f"sitemap-{n}.xml.gz") for n in (1, 2, 3)]
+        assert files == [path] + parts
+
+        index = ET.parse(path).getroot()
+        assert [loc.text for loc in index.findall('sm:sitemap/sm:loc', NS)] == [
+            f"https://example.com/sitemap-{n}.xml.gz" for n in (1, 2, 3)
+        ]
+
+        locs = []
+        for part in parts:
+            with gzip.open(part) as f:
+                urlset = ET.parse(f).getroot()
+            assert urlset.tag == f"{{{SITEMAP_NS}}}urlset"
+            locs.extend(loc.text for loc in urlset.findall('sm:url/sm:loc', NS))
+            assert urlset.find('sm:url/sm:priority', NS).text == "0.5"
+        # Спецсимволы экранированы, порядок URL сохранен
+        assert locs == [f"https://example.com/page?id={i}&sort=asc" for i in range(5)]
+
+
+def test_byte_limit_starts_new_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sitemap.xml')
+        writer = SitemapWriter(path, compress=False, max_bytes=400)
+        for i in range(6):
+            writer.add(f"https://example.com/{i}")
+        files = writer.close()
+
+        assert len(files) > 2
+        for part in files[1:]:
+            assert os.path.getsize(part) <= 400
+            ET.parse(part)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка потоковой записи sitemap")
+    print("=" * 50)
+    for test in (test_split_into_gzip_parts_with_index, test_byte_limit_starts_new_file):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки таблицы URL и графа ссылок по id
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+
+import numpy as np
+
+from seo_scanner import ExportSnapshot, PageSEOData, SEOFrogScanner
+from url_graph import InboundIndex, LinkGraph, UrlIdSet, UrlTable
+from visited_store import DiskUrlStore
+
+
+def test_url_table_ids():
+    table = UrlTable()
+    assert [table.id_of(url) for url in ("/a", "/b", "/a", "/c")] == [0, 1, 0, 2]
+    assert table.get_id("/d") is None and "/d" not in table
+    assert len(table) == 3
+
+    # intern отдает строку из таблицы, а не переданную копию
+    url = "".join(["/", "b"])
+    assert table.intern(url) is table.url_of(1)
+    assert list(table.iter_from(1)) == ["/b", "/c"]
+
+    snapshot = table.snapshot()
+    table.id_of("/d")
+    assert snapshot == ["/a", "/b", "/c"] and table.url_of(3) == "/d"
+
+
+def test_disk_url_table_matches_memory():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DiskUrlStore(os.path.join(tmp, 'urls.db'))
+        disk, memory = store.url_table(cache_size=2), UrlTable()
+        urls = [f"/{i % 7}" for i in range(20)]
+        assert [disk.id_of(url) for url in urls] == [memory.id_of(url) for url in urls]
+        assert list(disk.iter_from(3)) == list(memory.iter_from(3))
+        assert disk.get_id("/9") is None and len(disk) == 7
+        store.close()
+
+
+def test_url_id_set():
+    table = UrlTable()
+    visited = UrlIdSet(table)
+    visited.update(["/c", "/a", "/c"])
+    assert len(visited) == 2
+    assert "/a" in visited and "/b" not in visited
+    # Проверка вхождения не добавляет URL в таблицу
+    assert table.get_id("/b") is None
+
+    table.id_of("/b")
+    assert not visited.has_id(table.get_id("/b")) and not visited.has_id(1000)
+    visited.add_id(table.get_id("/b"))
+    # Обход - в порядке id, а не добавления
+    assert list(visited) == ["/c", "/a", "/b"]
+
+
+def test_inbound_index():
+    index = InboundIndex()
+    index.add(5, 1)
+    index.add(5, 2)
+    index.add(5, 1)
+    index.add(7, 3)
+    assert len(index) == 2
+    assert list(index.pop(5)) == [1, 2, 1]
+    assert list(index.pop(5)) == [] and len(index) == 1
+
+
+def test_link_graph_to_csr():
+    graph = LinkGraph()
+    for source, target in [(0, 1), (0, 2), (2, 0), (4, 1), (4, 2), (4, 0)]:
+        graph.add_edge(source, target)
+    assert len(graph) == 6
+    assert list(graph.sources()) == [0, 2, 4]
+    assert graph.out_degree(3) == 0 and graph.out_degree(10) == 0
+    assert list(graph.edges()) == [(0, 1), (0, 2), (2, 0), (4, 1), (4, 2), (4, 0)]
+
+    # Строки CSR идут в порядке переданных sources, узлы без ссылок дают пустую строку
+    offsets, targets = graph.to_csr([4, 3, 0])
+    assert offsets.tolist() == [0, 3, 3, 5]
+    assert targets.dtype == np.uint32 and targets.tolist() == [1, 2, 0, 1, 2]
+
+    offsets, targets = graph.to_csr([])
+    assert offsets.tolist() == [0] and len(targets) == 0
+
+
+def test_links_by_target_rank():
+    graph = LinkGraph()
+    rng = random.Random(3)
+    edges = [(rng.randrange(40), rng.randrange(40)) for _ in range(500)]
+    for source, target in edges:
+        graph.add_edge(source, target)
+    sources = list(graph.sources())
+    offsets, targets = graph.to_csr(sources)
+    # Повторяющиеся значения PageRank проверяют порядок при равенстве
+    ranks = np.array([rng.choice([0.5, 1.0, 1.5, 2.0]) for _ in range(40)])
+    snapshot = ExportSnapshot(
+        pages={}, urls=[], link_sources=np.array(sources, dtype=np.uint32), link_offsets=offsets,
+        link_targets=targets, ranks_by_id=ranks, duplicates=[], redirects=[], not_found_urls=[], error_urls=[],
+        blocked_urls=[], error_sources={}, timestamp=""
+    )
+
+    ordered = list(snapshot.links_by_target_rank(chunk_size=7))
+    # Цели по убыванию PageRank (при равенстве - по id), ребра цели - в порядке графа
+    expected = sorted(graph.edges(), key=lambda edge: (-ranks[edge[1]], edge[1]))
+    assert ordered == expected
+
+
+def make_site(rng, count=30):
+    """Страницы со ссылками на себя, повторными ссылками и ссылками на незагруженные URL"""
+    urls = [f"https://example.com/{i}" for i in range(count)]
+    unloaded = [f"https://example.com/missing-{i}" for i in range(3)]
+    return {
+        url: [rng.choice(urls + unloaded) for _ in range(rng.randint(0, 8))] + ([url] if i % 7 == 0 else [])
+        for i, url in enumerate(urls)
+    }
+
+
+def crawl_graph(site, order, page_store):
+    """Добавляет страницы в порядке order и возвращает (счетчики, ребра) после инкрементального
+    построения и после полного пересчета"""
+    async def crawl(scanner):
+        for url in order:
+            page = PageSEOData(url=url, status_code=200, content_type="text/html", outlinks=list(site[url]))
+            await scanner.add_page(url, page)
+
+    def state(scanner):
+        counts = {url: page.internal_links_count for url, page in scanner.pages_data.items()}
+        edges = sorted((scanner.url_table.url_of(source), scanner.url_table.url_of(target))
+                       for source, target in scanner.internal_links_graph.edges())
+        return counts, edges
+
+    scanner = SEOFrogScanner("https://example.com/")
+    scanner.config['page_store'] = page_store
+    scanner.config['page_cache_size'] = 3
+    scanner.init_page_store()
+    asyncio.run(crawl(scanner))
+    incremental = state(scanner)
+    scanner.build_internal_links_graph()
+    full = state(scanner)
+    pending = len(scanner.pending_inlinks)
+    scanner.close()
+    return incremental, full, pending
+
+
+def test_incremental_inlinks_match_full_recount():
+    rng = random.Random(7)
+    site = make_site(rng)
+    # Ожидаемые значения считаются напрямую по ссылкам
+    expected_counts = {url: 0 for url in site}
+    expected_edges = set()
+    for source, outlinks in site.items():
+        for target in outlinks:
+            if target in site:
+                expected_counts[target] += 1
+                expected_edges.add((source, target))
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for page_store in ('memory', 'disk'):
+                for _ in range(3):
+                    order = list(site)
+                    rng.shuffle(order)
+                    incremental, full, pending = crawl_graph(site, order, page_store)
+                    assert incremental == full
+                    assert full[0] == expected_counts
+                    assert full[1] == sorted(expected_edges)
+                    # Ждут только ссылки на так и не загруженные URL
+                    assert pending == len({url for links in site.values() for url in links if url not in site})
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка таблицы URL и графа ссылок")
+    print("=" * 50)
+    for test in (test_url_table_ids, test_disk_url_table_matches_memory, test_url_id_set, test_inbound_index,
+                 test_link_graph_to_csr, test_links_by_target_rank, test_incremental_inlinks_match_full_recount):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки дискового множества URL с фильтром Блума
+"""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from visited_store import BloomFilter, ScalableBloomFilter, DiskUrlStore
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    urls = [f"https://example.com/filters/{i}" for i in range(1000)]
+    for url in urls:
+        bloom.add(url)
+    assert all(url in bloom for url in urls)
+
+    # Доля ложных срабатываний должна быть близка к заданной
+    false_positives = sum(f"https://example.com/other/{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_disk_url_set_is_exact():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DiskUrlStore(os.path.join(tmp, 'urls.db'), commit_every=10)
+        # Маленький фильтр дает много ложных срабатываний, их должна отсеять таблица
+        visited = store.url_set('visited', capacity=10, error_rate=0.5)
+        urls = [f"https://example.com/page{i}" for i in range(100)]
+        visited.update(urls)
+        visited.add(urls[0])
+
+        assert len(visited) == 100
+        assert all(url in visited for url in urls)
+        assert not any(f"https://example.com/missing{i}" in visited for i in range(100))
+        assert sorted(visited) == sorted(urls)
+
+        # Новое множество с тем же именем начинается пустым
+        assert len(store.url_set('visited')) == 0
+        store.close()
+
+
+def test_scalable_bloom_grows_with_keys():
+    small = ScalableBloomFilter(1000, 0.01)
+    for i in range(100):
+        small.add(f"https://example.com/{i}")
+    large = ScalableBloomFilter(1000, 0.01)
+    urls = [f"https://example.com/{i}" for i in range(20000)]
+    for url in urls:
+        large.add(url)
+
+    # Небольшой сайт не платит за фильтр на миллионы URL
+    assert small.num_bytes < 2000
+    assert len(large.layers) > 1
+    assert all(url in large for url in urls)
+    assert sum(f"https://example.com/other/{i}" in large for i in range(10000)) < 300
+
+
+def test_disk_url_table_ids():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DiskUrlStore(os.path.join(tmp, 'urls.db'), commit_every=10)
+        # Кэш на 3 URL: остальные ищутся на диске
+        table = store.url_table(cache_size=3)
+        urls = [f"https://example.com/page{i}" for i in range(50)]
+        assert [table.id_of(url) for url in urls] == list(range(50))
+        assert [table.id_of(url) for url in reversed(urls)] == list(reversed(range(50)))
+        assert len(table) == 50 and len(table.cache) == 3
+        assert table.get_id("https://example.com/missing") is None
+        assert table.url_of(7) == urls[7] and urls[0] in table
+
+        # Потоки отчетов читают URL по id через свои соединения
+        snapshot = table.snapshot()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            assert list(executor.map(snapshot.__getitem__, range(50))) == urls
+        snapshot.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка дискового множества URL")
+    print("=" * 50)
+    for test in (test_bloom_filter_has_no_false_negatives, test_disk_url_set_is_exact,
+                 test_scalable_bloom_grows_with_keys, test_disk_url_table_ids):
+        test()
+        print(f"✅ {test.__name__}")
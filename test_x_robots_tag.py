@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Тестовый скрипт для проверки страниц, закрытых заголовком X-Robots-Tag
+"""
+
+import asyncio
+import os
+import tempfile
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from seo_scanner import SEOFrogScanner
+
+PAGE = "<html><head><title>Страница</title></head><body><a href=\"/next\">Дальше</a></body></html>"
+HEADERS = {
+    '/hidden': 'noindex, nofollow',
+    '/none': 'none',
+    '/bot-only': 'googlebot: none',
+    '/noindex': 'noindex',
+}
+
+
+def crawl(paths):
+    async def handler(request):
+        headers = {'X-Robots-Tag': HEADERS[request.path]} if request.path in HEADERS else {}
+        return web.Response(text=PAGE, content_type='text/html', headers=headers)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/{name:.*}', handler)
+        server = TestServer(app, host='localhost')
+        await server.start_server()
+        try:
+            scanner = SEOFrogScanner(str(server.make_url('/')))
+            scanner.init_rate_limiter()
+            scanner.init_concurrency_controller()
+            async with aiohttp.ClientSession() as session:
+                for path in paths:
+                    url = scanner.normalize_url(str(server.make_url(path)))
+                    await scanner.process_url(session, None, url, 1, scanner.start_url)
+            return scanner
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+def test_blocked_pages_are_reported():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            scanner = crawl(['/hidden', '/none', '/bot-only', '/noindex'])
+            with open(scanner.error_log_file, encoding='utf-8') as f:
+                error_log = f.read()
+        finally:
+            os.chdir(cwd)
+
+    # Закрыты только страницы с noindex и nofollow одновременно (или none) для всех роботов
+    blocked = {row['url'].rsplit('/', 1)[1]: row['x_robots_tag'] for row in scanner.blocked_urls}
+    assert blocked == {'hidden': 'noindex, nofollow', 'none': 'none'}
+    assert len(scanner.pages_data) == 2
+    assert "X-Robots-Tag, страница пропущена" in error_log
+
+    # Пропущенные страницы попадают в отчет по ошибкам
+    rows = list(scanner.iter_error_rows(scanner.take_export_snapshot()))
+    assert sorted(row['Тип ошибки'] for row in rows) == ['X-Robots-Tag: noindex, nofollow', 'X-Robots-Tag: none']
+    assert {row['Основной источник'] for row in rows} == {scanner.start_url}
+
+    # И в журнал автосохранения и контрольную точку, по одному разу
+    marks = {'not_found': 0, 'error': 0, 'blocked': 0, 'redirect': 0}
+    assert [record_type for record_type, _, _ in scanner.collect_new_records(marks)] == ['blocked', 'blocked']
+    assert scanner.collect_new_records(marks) == []
+
+
+if __name__ == "__main__":
+    print("🧪 Проверка страниц, закрытых X-Robots-Tag")
+    print("=" * 50)
+    for test in (test_blocked_pages_are_reported,):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,167 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class UrlTable:
+    """Таблица URL: каждый нормализованный URL хранится один раз и получает целочисленный id"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.urls: List[str] = []
+
+    def id_of(self, url: str) -> int:
+        """Возвращает id URL, добавляя его в таблицу при первом обращении"""
+        url_id = self.ids.get(url)
+        if url_id is None:
+            url_id = len(self.urls)
+            self.ids[url] = url_id
+            self.urls.append(url)
+        return url_id
+
+    def get_id(self, url: str) -> Optional[int]:
+        """id URL или None, если URL еще не встречался"""
+        return self.ids.get(url)
+
+    def intern(self, url: str) -> str:
+        """Возвращает единственный экземпляр строки URL из таблицы"""
+        return self.urls[self.id_of(url)]
+
+    def url_of(self, url_id: int) -> str:
+        return self.urls[url_id]
+
+    def iter_from(self, start: int) -> Iterator[str]:
+        """URL с id от start в порядке id"""
+        return iter(self.urls[start:])
+
+    def snapshot(self) -> List[str]:
+        """Копия списка URL по id для потоков отчетов"""
+        return list(self.urls)
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.ids
+
+
+class UrlIdSet:
+    """Множество URL в виде битовой карты по id из UrlTable (1 байт на URL таблицы)"""
+
+    def __init__(self, url_table: UrlTable):
+        self.url_table = url_table
+        self.flags = bytearray()
+        self.count = 0
+
+    def add(self, url: str):
+        self.add_id(self.url_table.id_of(url))
+
+    def add_id(self, url_id: int):
+        if url_id >= len(self.flags):
+            self.flags.extend(bytes(max(url_id + 1, 2 * len(self.flags)) - len(self.flags)))
+        if not self.flags[url_id]:
+            self.flags[url_id] = 1
+            self.count += 1
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def has_id(self, url_id: int) -> bool:
+        return url_id < len(self.flags) and self.flags[url_id] == 1
+
+    def __contains__(self, url: str) -> bool:
+        url_id = self.url_table.get_id(url)
+        return url_id is not None and self.has_id(url_id)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        for url_id, flag in enumerate(self.flags):
+            if flag:
+                yield self.url_table.url_of(url_id)
+
+
+class InboundIndex:
+    """Обратный индекс ссылок на еще не загруженные URL: id цели -> id источников.
+
+    Источник повторяется столько раз, сколько раз страница ссылается на цель.
+    """
+
+    def __init__(self):
+        self.sources: Dict[int, array] = {}
+
+    def add(self, target: int, source: int):
+        sources = self.sources.get(target)
+        if sources is None:
+            sources = self.sources[target] = array('I')
+        sources.append(source)
+
+    def pop(self, target: int) -> array:
+        """Забирает все ожидающие ссылки на target"""
+        return self.sources.pop(target, None) or array('I')
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+
+class LinkGraph:
+    """Граф ссылок по id URL: у каждой страницы компактный массив array('I') целей"""
+
+    def __init__(self):
+        self.adjacency: List[Optional[array]] = []
+        self.num_edges = 0
+
+    def add_edge(self, source: int, target: int):
+        """Добавляет ребро (проверка на повтор - на стороне вызывающего кода)"""
+        if source >= len(self.adjacency):
+            self.adjacency.extend([None] * (source + 1 - len(self.adjacency)))
+        targets = self.adjacency[source]
+        if targets is None:
+            targets = self.adjacency[source] = array('I')
+        targets.append(target)
+        self.num_edges += 1
+
+    def targets(self, source: int) -> array:
+        if source < len(self.adjacency) and self.adjacency[source] is not None:
+            return self.adjacency[source]
+        return array('I')
+
+    def out_degree(self, source: int) -> int:
+        return len(self.targets(source))
+
+    def sources(self) -> Iterator[int]:
+        for source, targets in enumerate(self.adjacency):
+            if targets:
+                yield source
+
+    def edges(self) -> Iterator[Tuple[int, int]]:
+        for source in self.sources():
+            for target in self.adjacency[source]:
+                yield source, target
+
+    def __len__(self) -> int:
+        return self.num_edges
+
+    def to_csr(self, sources: List[int], path: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Исходящие ребра узлов sources в CSR-виде: offsets по позициям в sources и id целей.
+
+        Если задан path, цели пишутся в файл по одному узлу и отображаются в
+        память (np.memmap), без второй копии ребер в RAM.
+        """
+        degrees = np.fromiter((self.out_degree(source) for source in sources), dtype=np.int64, count=len(sources))
+        offsets = np.zeros(len(sources) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=offsets[1:])
+        if path is None:
+            targets = np.frombuffer(b''.join(self.targets(source).tobytes() for source in sources), dtype=np.uint32)
+            return offsets, targets
+
+        if offsets[-1] == 0:
+            # Пустой файл отобразить в память нельзя
+            return offsets, np.zeros(0, dtype=np.uint32)
+        with open(path, 'wb') as f:
+            for source in sources:
+                self.targets(source).tofile(f)
+        return offsets, np.memmap(path, dtype=np.uint32, mode='r')
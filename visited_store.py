@@ -0,0 +1,256 @@
+import hashlib
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Optional
+
+
+class BloomFilter:
+    """Фильтр Блума: отвечает "точно нет" или "возможно да" за фиксированный объем памяти"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        # Оптимальные размер битового массива и число хеш-функций для заданной доли ложных срабатываний
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def positions(self, key: str) -> Iterator[int]:
+        # Двойное хеширование: k позиций из двух 64-битных половин одного дайджеста
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+
+
+class ScalableBloomFilter:
+    """Растущий фильтр Блума: когда слой заполнен, добавляется новый вдвое большей емкости.
+
+    Память пропорциональна реальному числу ключей, а не заранее заданному
+    максимуму. Доля ложных срабатываний слоев убывает вдвое, поэтому общая
+    остается не больше error_rate.
+    """
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.01):
+        self.initial_capacity = max(1, initial_capacity)
+        self.error_rate = error_rate
+        self.clear()
+
+    def add(self, key: str):
+        """Добавляет новый ключ (повторное добавление занимает место в слое)"""
+        layer = self.layers[-1]
+        if self.count_in_layer >= layer.capacity:
+            layer = BloomFilter(layer.capacity * 2, self.error_rate / 2 ** (len(self.layers) + 1))
+            self.layers.append(layer)
+            self.count_in_layer = 0
+        layer.add(key)
+        self.count_in_layer += 1
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in layer for layer in self.layers)
+
+    @property
+    def num_bytes(self) -> int:
+        return sum(len(layer.bits) for layer in self.layers)
+
+    def clear(self):
+        self.layers: List[BloomFilter] = [BloomFilter(self.initial_capacity, self.error_rate / 2)]
+        self.count_in_layer = 0
+
+
+class DiskUrlStore:
+    """Файл SQLite с множествами URL; запись фиксируется пакетами"""
+
+    def __init__(self, path: str, commit_every: int = 1000):
+        self.path = path
+        self.commit_every = commit_every
+        self.pending_writes = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+
+    def url_set(self, table: str, capacity: int = 100_000, error_rate: float = 0.01) -> 'DiskUrlSet':
+        """Возвращает пустое множество URL в таблице table (capacity - начальная емкость фильтра Блума)"""
+        return DiskUrlSet(self, table, capacity, error_rate)
+
+    def url_table(self, cache_size: int = 100_000) -> 'DiskUrlTable':
+        """Возвращает пустую таблицу URL -> id"""
+        return DiskUrlTable(self, cache_size)
+
+    def written(self):
+        self.pending_writes += 1
+        if self.pending_writes >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending_writes = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+class DiskUrlSet:
+    """Множество URL на диске с фильтром Блума в памяти перед ним.
+
+    Отрицательный ответ фильтра не требует обращения к диску, положительный
+    подтверждается точным поиском в таблице. Фильтр растет с числом URL,
+    около 1.2 байта на URL при доле ложных срабатываний 1%.
+    """
+
+    def __init__(self, store: DiskUrlStore, table: str, capacity: int = 100_000, error_rate: float = 0.01):
+        self.store = store
+        self.table = table
+        self.count = 0
+        self.bloom = ScalableBloomFilter(capacity, error_rate)
+        self.store.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (url TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.clear()
+
+    def add(self, url: str):
+        inserted = self.store.conn.execute(
+            f"INSERT OR IGNORE INTO {self.table} (url) VALUES (?)", (url,)
+        ).rowcount
+        if inserted:
+            self.bloom.add(url)
+            self.count += 1
+            self.store.written()
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        if url not in self.bloom:
+            return False
+        # Незафиксированные записи видны в том же соединении
+        row = self.store.conn.execute(f"SELECT 1 FROM {self.table} WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        for (url,) in self.store.conn.execute(f"SELECT url FROM {self.table}"):
+            yield url
+
+    def clear(self):
+        """Очищает множество перед новым сканированием"""
+        self.store.conn.execute(f"DELETE FROM {self.table}")
+        self.store.commit()
+        self.bloom.clear()
+        self.count = 0
+
+
+class DiskUrlTable:
+    """Таблица URL -> id в файле DiskUrlStore с LRU-кэшем последних URL, интерфейс как у url_graph.UrlTable.
+
+    id выдаются подряд с 0, как в UrlTable, но строки URL в памяти не
+    копятся: intern() возвращает URL как есть, url_of() читает его с диска.
+    """
+
+    def __init__(self, store: DiskUrlStore, cache_size: int = 100_000):
+        self.store = store
+        self.cache_size = max(1, cache_size)
+        self.cache: OrderedDict = OrderedDict()  # URL -> id
+        self.count = 0
+        self.store.conn.execute("CREATE TABLE IF NOT EXISTS url_ids (id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE)")
+        self.store.conn.execute("DELETE FROM url_ids")
+        self.store.commit()
+
+    def remember(self, url: str, url_id: int):
+        self.cache[url] = url_id
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def get_id(self, url: str) -> Optional[int]:
+        """id URL или None, если URL еще не встречался"""
+        url_id = self.cache.get(url)
+        if url_id is not None:
+            self.cache.move_to_end(url)
+            return url_id
+        row = self.store.conn.execute("SELECT id FROM url_ids WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        self.remember(url, row[0])
+        return row[0]
+
+    def id_of(self, url: str) -> int:
+        """Возвращает id URL, добавляя его в таблицу при первом обращении"""
+        url_id = self.get_id(url)
+        if url_id is None:
+            url_id = self.count
+            self.store.conn.execute("INSERT INTO url_ids (id, url) VALUES (?, ?)", (url_id, url))
+            self.count += 1
+            self.store.written()
+            self.remember(url, url_id)
+        return url_id
+
+    def intern(self, url: str) -> str:
+        return url
+
+    def url_of(self, url_id: int) -> str:
+        row = self.store.conn.execute("SELECT url FROM url_ids WHERE id = ?", (url_id,)).fetchone()
+        if row is None:
+            raise IndexError(url_id)
+        return row[0]
+
+    def iter_from(self, start: int) -> Iterator[str]:
+        """URL с id от start в порядке id"""
+        rows = self.store.conn.execute("SELECT url FROM url_ids WHERE id >= ? ORDER BY id", (start,)).fetchall()
+        for (url,) in rows:
+            yield url
+
+    def snapshot(self) -> 'DiskUrlList':
+        """URL по id для чтения из потоков отчетов (id только добавляются, поэтому копия не нужна)"""
+        self.store.commit()
+        return DiskUrlList(self.store.path)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, url: str) -> bool:
+        return self.get_id(url) is not None
+
+
+class DiskUrlList:
+    """Только чтение URL по id из файла DiskUrlStore; у каждого потока свое соединение"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.connections: List[sqlite3.Connection] = []
+        self.lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def __getitem__(self, url_id: int) -> str:
+        row = self.connection().execute("SELECT url FROM url_ids WHERE id = ?", (url_id,)).fetchone()
+        if row is None:
+            raise IndexError(url_id)
+        return row[0]
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []